@@ -286,6 +286,15 @@ class DatabaseTool(BaseTool):
                 c.execute("SELECT value FROM preferences WHERE key = ?", (kwargs["key"],))
                 result = c.fetchone()
                 return result[0] if result else kwargs.get("default", "USD")
+            elif action == "get_preferences":
+                keys = list(kwargs["keys"])
+                found = {}
+                if keys:
+                    placeholders = ",".join("?" * len(keys))
+                    c.execute(f"SELECT key, value FROM preferences WHERE key IN ({placeholders})", keys)
+                    found = dict(c.fetchall())
+                defaults = kwargs.get("defaults", {})
+                return json.dumps({key: found.get(key, defaults.get(key)) for key in keys})
             elif action == "log_query":
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 c.execute("INSERT INTO query_history (query, timestamp) VALUES (?, ?)", (kwargs["query"], timestamp))
@@ -295,6 +304,10 @@ class DatabaseTool(BaseTool):
             elif action == "log_notification":
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 c.execute("INSERT INTO notifications (message, timestamp) VALUES (?, ?)", (kwargs["message"], timestamp))
+            elif action == "log_notifications":
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                c.executemany("INSERT INTO notifications (message, timestamp) VALUES (?, ?)",
+                              [(message, timestamp) for message in kwargs["messages"]])
             elif action == "get_notifications":
                 c.execute("SELECT message, timestamp FROM notifications ORDER BY timestamp DESC LIMIT 5")
                 return json.dumps(c.fetchall())
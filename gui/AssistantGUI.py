@@ -19,7 +19,6 @@ from config import JARVIS_DIR
 from gui.user_setting import UserDialog
 from gui.AssistantOpenGLWidget import AssistantOpenGLWidget
 from config import SESSION_PATH
-import pyaudio
 import pvporcupine
 import json
 import threading
@@ -44,10 +43,12 @@ from config import  loggers
 import numpy as np
 
 
-import cv2
 from PyQt5.QtCore import Qt
 from gui.Objects.AgentWorker import AgentWorker
+from gui.Objects.AgentService import AgentService
+from gui.Objects.CameraHub import get_camera_hub
 from gui.Objects.wakeword import WakeWordWorker
+from gui.Objects.AudioHub import AudioCaptureHub
 from gui.Objects.SpeechRecognition import SpeechRecognitionWorker
 from gui.Objects.AlertChecker import AlertCheck
 from gui.Objects.TTSWorker import TTSWorker
@@ -177,6 +178,10 @@ class AssistantGUI(QMainWindow):
         self.login_page = login_page
         self.porcupine = None
         self.audio_stream = None
+        # Shared microphone capture for the wake word, VAD and recorder.
+        self.audio_hub = AudioCaptureHub(sample_rate=16000)
+        # Shared camera for face capture and the consciousness probes.
+        self.camera_hub = get_camera_hub()
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
 
@@ -204,7 +209,8 @@ class AssistantGUI(QMainWindow):
     def setup_threads(self):
         # 🗣️ Speech Recognition
         self.speech_thread = QThread()
-        self.speech_worker = SpeechRecognitionWorker(self.recognizer, self.microphone, self.stop_recognition)
+        self.speech_worker = SpeechRecognitionWorker(self.recognizer, self.microphone, self.stop_recognition,
+                                                     audio_hub=self.audio_hub)
         self.speech_worker.moveToThread(self.speech_thread)
 
 
@@ -220,12 +226,15 @@ class AssistantGUI(QMainWindow):
 
         # 👁️‍🗨️ Consciousness
         self.consciousness_thread = QThread()
-        self.consciousness_worker = ConsciousnessWorker(self.stop_recognition)
+        self.consciousness_worker = ConsciousnessWorker(self.stop_recognition, camera_hub=self.camera_hub)
         self.consciousness_worker.moveToThread(self.consciousness_thread)
 
         # 🧠 Agent
         self.agent_thread = QThread()
-        self.agent_worker = AgentWorker()
+        # Keeps the memory store and agent graph alive between requests.
+        self.agent_service = AgentService()
+        self.agent_service.start()
+        self.agent_worker = AgentWorker(self.agent_service)
         self.agent_worker.moveToThread(self.agent_thread)
 
         # 👂 Wake Word
@@ -342,13 +351,8 @@ class AssistantGUI(QMainWindow):
                 keyword_paths=[model_path] if model_path else None,
                 keywords=["jarvis"] if not model_path else None,
             )
-            self.audio_stream = pyaudio.PyAudio().open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.porcupine.sample_rate,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length,
-            )
+            # Porcupine always takes 16 kHz frames of 512 samples, which is what the hub captures.
+            self.audio_stream = self.audio_hub
         except Exception as e:
             log.info(f"Failed to initialize Porcupine: {e}")
             self.porcupine = None
@@ -531,10 +535,14 @@ class AssistantGUI(QMainWindow):
         """Handle transcription results."""
         log.info(f"Transcription: {transcription}")
         self.display_text(f"You said: {transcription}")
-        if not self.agent_thread.isRunning():
-            print("Agent is started!")
-            self.agent_worker.set_text(transcription)
-            self.agent_thread.start()
+        if self.agent_thread.isRunning():
+            # A newer request supersedes the one in flight; its response is dropped.
+            self.agent_worker.cancel()
+            self.agent_thread.quit()
+            self.agent_thread.wait()
+        print("Agent is started!")
+        self.agent_worker.set_text(transcription)
+        self.agent_thread.start()
 
     def start_tts(self, text):
         """Starts the TTS (Text-to-Speech) thread."""
@@ -584,43 +592,24 @@ class AssistantGUI(QMainWindow):
             return None
 
     def get_face(self):
-        # Open the default camera (index 0)
-        cap = cv2.VideoCapture(0)
         max_attempts = 3
 
         for attempt in range(max_attempts):
-            if cap.isOpened():
-                ret, frame = cap.read()
-
-                if ret and frame is not None:
-                    # Show the captured image
-                    preview_dialog = ImagePreviewDialog(frame, self)
-                    preview_dialog.show()
-
-                    # Release camera before returning
-                    cap.release()
-
-                    # Return the numpy array
-                    return np.array(frame)
-                else:
-                    QMessageBox.critical(
-                        self,
-                        "Camera Error",
-                        f"Failed to capture frame, attempt {attempt + 1}/{max_attempts}"
-                    )
-                    log.critical(f"Failed to capture frame, attempt {attempt + 1}/{max_attempts}")
-            else:
-                QMessageBox.critical(
-                    self,
-                    "Camera Error",
-                    f"Cannot open camera, attempt {attempt + 1}/{max_attempts}"
-                )
-                log.critical(f"Cannot open camera, attempt {attempt + 1}/{max_attempts}")
-                cap.release()
-                cap = cv2.VideoCapture(0)  # Try reopening
-
-            # Small delay between attempts
-            cv2.waitKey(100)
+            # The shared camera hub keeps the device open between captures.
+            frame = self.camera_hub.read(timeout=2.0)
+            if frame is not None:
+                # Show the captured image
+                preview_dialog = ImagePreviewDialog(frame, self)
+                preview_dialog.show()
+
+                # Return the numpy array
+                return np.array(frame)
+            QMessageBox.critical(
+                self,
+                "Camera Error",
+                f"Failed to capture frame, attempt {attempt + 1}/{max_attempts}"
+            )
+            log.critical(f"Failed to capture frame, attempt {attempt + 1}/{max_attempts}")
 
         QMessageBox.critical(
             self,
@@ -628,12 +617,12 @@ class AssistantGUI(QMainWindow):
             "Failed to capture image after all attempts"
         )
         log.critical("Failed to capture image after all attempts")
-        cap.release()
         return None
 
     def open_home_dialog(self):
         from gui.Home import HomeDialog
         dialog = HomeDialog(self)
+        dialog.settings_changed.connect(self.agent_service.invalidate)
         dialog.exec_()
         # If the session file is removed, go back to login
         if not os.path.exists(os.path.join(SESSION_PATH, "session.json")):
@@ -646,6 +635,7 @@ class AssistantGUI(QMainWindow):
     def home_application(self):
         """Open the home page dialog."""
         dialog = HomeDialog(self)
+        dialog.settings_changed.connect(self.agent_service.invalidate)
         dialog.exec_()
 
     def call_application(self):
@@ -684,6 +674,10 @@ class AssistantGUI(QMainWindow):
             self.wake_word_thread.quit()
             self.wake_word_thread.wait()
 
+        self.audio_hub.stop()
+        self.agent_service.stop()
+        self.camera_hub.stop()
+
         splash.update_message("Closing speech thread",16*4)
         self.speech_thread.quit()
         self.speech_thread.wait()
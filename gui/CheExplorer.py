@@ -1,10 +1,5 @@
-import sqlite3
 import json
 
-try:
-    from mendeleev import element as mendeleev_element
-except ImportError:
-    mendeleev_element = None
 import numpy as np
 import pandas as pd
 import pyperclip
@@ -16,7 +11,7 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QH
                              QFormLayout, QSlider, QComboBox, QSpinBox, QDoubleSpinBox, QCheckBox, QTableWidget,
                              QTableWidgetItem, QFileDialog, QInputDialog, QTextBrowser, QMessageBox,
                              QStackedWidget,)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont
 from crewai import Agent, Task, Crew, Process
 from reportlab.lib.pagesizes import letter
@@ -48,6 +43,8 @@ try:
 except ImportError:
     OpenAI = None
 from core.Agent_models import get_model_from_database
+from gui.Objects.QueryCache import get_cache_connection, get_query_cache
+from gui.Objects.ElementTable import get_element_table, element_group, periodic_position
 
 
 class QueryThread(QThread):
@@ -71,7 +68,13 @@ class CheExplorer(QMainWindow):
         super().__init__(parent=parent)
         self.setWindowTitle("Chemistry Explorer Ultimate")
         self.setMinimumSize(1600, 1000)
-        self.cache_db = sqlite3.connect("chem_explorer_cache.db", check_same_thread=False)
+        self.cache_db = get_cache_connection("chem_explorer_cache.db")
+        self.query_cache = get_query_cache("chem_explorer_cache.db")
+        # The cache outlives this window, so sweep expired rows on open and while it stays open.
+        self.query_cache.purge_if_due()
+        self.cache_purge_timer = QTimer(self)
+        self.cache_purge_timer.timeout.connect(self.query_cache.purge_if_due)
+        self.cache_purge_timer.start(10 * 60 * 1000)
         self.init_cache()
         self.package_properties = self.get_package_properties()
         self.element_data = self.get_element_data()
@@ -94,9 +97,6 @@ class CheExplorer(QMainWindow):
 
     def init_cache(self):
         cursor = self.cache_db.cursor()
-        cursor.execute("""CREATE TABLE IF NOT EXISTS cache (
-            query TEXT, result TEXT, mode TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY (query, mode))""")
         cursor.execute("""CREATE TABLE IF NOT EXISTS reactions (
             reaction TEXT PRIMARY KEY, result TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)""")
         self.cache_db.commit()
@@ -122,122 +122,15 @@ class CheExplorer(QMainWindow):
         }
 
     def get_element_group(self, elem):
-        if elem.atomic_number in [1, 6, 7, 8, 15, 16, 34]:
-            return "nonmetal"
-        elif elem.atomic_number in [2, 10, 18, 36, 54, 86]:
-            return "noble_gas"
-        elif elem.atomic_number in [3, 11, 19, 37, 55, 87]:
-            return "alkali_metal"
-        elif elem.atomic_number in [4, 12, 20, 38, 56, 88]:
-            return "alkaline_earth"
-        elif elem.atomic_number in [5, 14, 32, 33, 51, 52, 84]:
-            return "metalloid"
-        elif elem.atomic_number in [13, 30, 31, 48, 49, 50, 81, 82, 83]:
-            return "post_transition_metal"
-        elif elem.atomic_number in [9, 17, 35, 53, 85]:
-            return "halogen"
-        elif 57 <= elem.atomic_number <= 71:
-            return "lanthanide"
-        elif 89 <= elem.atomic_number <= 103:
-            return "actinide"
-        else:
-            return "transition_metal"
+        return element_group(elem.atomic_number)
 
     def get_periodic_position(self, atomic_number):
-        periods = [
-            (1, 1, 1), (2, 1, 18),
-            (3, 2, 1), (4, 2, 2), (5, 2, 13), (6, 2, 14), (7, 2, 15), (8, 2, 16), (9, 2, 17), (10, 2, 18),
-            (11, 3, 1), (12, 3, 2), (13, 3, 13), (14, 3, 14), (15, 3, 15), (16, 3, 16), (17, 3, 17), (18, 3, 18),
-            (19, 4, 1), (20, 4, 2), (21, 4, 3), (22, 4, 4), (23, 4, 5), (24, 4, 6), (25, 4, 7), (26, 4, 8),
-            (27, 4, 9), (28, 4, 10), (29, 4, 11), (30, 4, 12), (31, 4, 13), (32, 4, 14), (33, 4, 15), (34, 4, 16),
-            (35, 4, 17), (36, 4, 18),
-            (37, 5, 1), (38, 5, 2), (39, 5, 3), (40, 5, 4), (41, 5, 5), (42, 5, 6), (43, 5, 7), (44, 5, 8),
-            (45, 5, 9), (46, 5, 10), (47, 5, 11), (48, 5, 12), (49, 5, 13), (50, 5, 14), (51, 5, 15), (52, 5, 16),
-            (53, 5, 17), (54, 5, 18),
-            (55, 6, 1), (56, 6, 2), (72, 6, 4), (73, 6, 5), (74, 6, 6), (75, 6, 7), (76, 6, 8), (77, 6, 9),
-            (78, 6, 10), (79, 6, 11), (80, 6, 12), (81, 6, 13), (82, 6, 14), (83, 6, 15), (84, 6, 16), (85, 6, 17),
-            (86, 6, 18),
-            (87, 7, 1), (88, 7, 2), (104, 7, 4), (105, 7, 5), (106, 7, 6), (107, 7, 7), (108, 7, 8), (109, 7, 9),
-            (110, 7, 10), (111, 7, 11), (112, 7, 12), (113, 7, 13), (114, 7, 14), (115, 7, 15), (116, 7, 16),
-            (117, 7, 17),
-            (118, 7, 18)
-        ]
-        for an, row, col in periods:
-            if an == atomic_number:
-                return row, col
-        lanthanides = [(57 + i, 8, 3 + i) for i in range(15)]
-        actinides = [(89 + i, 9, 3 + i) for i in range(15)]
-        for an, row, col in lanthanides + actinides:
-            if an == atomic_number:
-                return row, col
-        return 1, 1
+        return periodic_position(atomic_number)
 
     def get_element_data(self):
-        elements = []
-        if mendeleev_element:
-            for i in range(1, 119):
-                elem = mendeleev_element(i)
-                symbol = elem.symbol
-                group = self.get_element_group(elem)
-                row, col = self.get_periodic_position(i)
-                elements.append((symbol, row, col, group))
-        else:
-            fallback = [
-                ("H", 1, 1, "nonmetal"), ("He", 1, 18, "noble_gas"),
-                ("Li", 2, 1, "alkali_metal"), ("Be", 2, 2, "alkaline_earth"),
-                ("B", 2, 13, "metalloid"), ("C", 2, 14, "nonmetal"),
-                ("N", 2, 15, "nonmetal"), ("O", 2, 16, "nonmetal"),
-                ("F", 2, 17, "halogen"), ("Ne", 2, 18, "noble_gas"),
-                ("Na", 3, 1, "alkali_metal"), ("Mg", 3, 2, "alkaline_earth"),
-                ("Al", 3, 13, "post_transition_metal"), ("Si", 3, 14, "metalloid"),
-                ("P", 3, 15, "nonmetal"), ("S", 3, 16, "nonmetal"),
-                ("Cl", 3, 17, "halogen"), ("Ar", 3, 18, "noble_gas"),
-                ("K", 4, 1, "alkali_metal"), ("Ca", 4, 2, "alkaline_earth"),
-                ("Sc", 4, 3, "transition_metal"), ("Ti", 4, 4, "transition_metal"),
-                ("V", 4, 5, "transition_metal"), ("Cr", 4, 6, "transition_metal"),
-                ("Mn", 4, 7, "transition_metal"), ("Fe", 4, 8, "transition_metal"),
-                ("Co", 4, 9, "transition_metal"), ("Ni", 4, 10, "transition_metal"),
-                ("Cu", 4, 11, "transition_metal"), ("Zn", 4, 12, "post_transition_metal"),
-                ("Ga", 4, 13, "post_transition_metal"), ("Ge", 4, 14, "metalloid"),
-                ("As", 4, 15, "metalloid"), ("Se", 4, 16, "nonmetal"),
-                ("Br", 4, 17, "halogen"), ("Kr", 4, 18, "noble_gas"),
-                ("Rb", 5, 1, "alkali_metal"), ("Sr", 5, 2, "alkaline_earth"),
-                ("Y", 5, 3, "transition_metal"), ("Zr", 5, 4, "transition_metal"),
-                ("Nb", 5, 5, "transition_metal"), ("Mo", 5, 6, "transition_metal"),
-                ("Tc", 5, 7, "transition_metal"), ("Ru", 5, 8, "transition_metal"),
-                ("Rh", 5, 9, "transition_metal"), ("Pd", 5, 10, "transition_metal"),
-                ("Ag", 5, 11, "transition_metal"), ("Cd", 5, 12, "post_transition_metal"),
-                ("In", 5, 13, "post_transition_metal"), ("Sn", 5, 14, "post_transition_metal"),
-                ("Sb", 5, 15, "metalloid"), ("Te", 5, 16, "metalloid"),
-                ("I", 5, 17, "halogen"), ("Xe", 5, 18, "noble_gas"),
-                ("Cs", 6, 1, "alkali_metal"), ("Ba", 6, 2, "alkaline_earth"),
-                ("La", 8, 3, "lanthanide"), ("Ce", 8, 4, "lanthanide"),
-                ("Pr", 8, 5, "lanthanide"), ("Nd", 8, 6, "lanthanide"),
-                ("Pm", 8, 7, "lanthanide"), ("Sm", 8, 8, "lanthanide"),
-                ("Eu", 8, 9, "lanthanide"), ("Gd", 8, 10, "lanthanide"),
-                ("Tb", 8, 11, "lanthanide"), ("Dy", 8, 12, "lanthanide"),
-                ("Ho", 8, 13, "lanthanide"), ("Er", 8, 14, "lanthanide"),
-                ("Tm", 8, 15, "lanthanide"), ("Yb", 8, 16, "lanthanide"),
-                ("Lu", 8, 17, "lanthanide"), ("Hf", 6, 4, "transition_metal"),
-                ("Ta", 6, 5, "transition_metal"), ("W", 6, 6, "transition_metal"),
-                ("Re", 6, 7, "transition_metal"), ("Os", 6, 8, "transition_metal"),
-                ("Ir", 6, 9, "transition_metal"), ("Pt", 6, 10, "transition_metal"),
-                ("Au", 6, 11, "transition_metal"), ("Hg", 6, 12, "post_transition_metal"),
-                ("Tl", 6, 13, "post_transition_metal"), ("Pb", 6, 14, "post_transition_metal"),
-                ("Bi", 6, 15, "post_transition_metal"), ("Po", 6, 16, "metalloid"),
-                ("At", 6, 17, "halogen"), ("Rn", 6, 18, "noble_gas"),
-                ("Fr", 7, 1, "alkali_metal"), ("Ra", 7, 2, "alkaline_earth"),
-                ("Ac", 9, 3, "actinide"), ("Th", 9, 4, "actinide"),
-                ("Pa", 9, 5, "actinide"), ("U", 9, 6, "actinide"),
-                ("Np", 9, 7, "actinide"), ("Pu", 9, 8, "actinide"),
-                ("Am", 9, 9, "actinide"), ("Cm", 9, 10, "actinide"),
-                ("Bk", 9, 11, "actinide"), ("Cf", 9, 12, "actinide"),
-                ("Es", 9, 13, "actinide"), ("Fm", 9, 14, "actinide"),
-                ("Md", 9, 15, "actinide"), ("No", 9, 16, "actinide"),
-                ("Lr", 9, 17, "actinide")
-            ]
-            elements = fallback
-        return elements
+        # Precomputed from mendeleev and shared by every window in the process.
+        self.element_table = get_element_table()
+        return self.element_table.layout()
 
     def init_crewai(self):
         self.query_refiner = Agent(
@@ -590,7 +483,12 @@ class CheExplorer(QMainWindow):
                 compounds = pcp.get_compounds(element_name, 'name')
                 if compounds:
                     return getattr(compounds[0], property_name, "Not available")
-            elif package == "mendeleev" and element:
+            elif package == "mendeleev":
+                value = self.element_table.property(element_name, property_name)
+                if value is not None:
+                    return value
+                if not element:
+                    return "Not available"
                 elem = element(element_name)
                 return getattr(elem, property_name, "Not available")
             return "Not available"
@@ -625,12 +523,9 @@ class CheExplorer(QMainWindow):
         return crew.kickoff()
 
     def deepsearch_mode_process(self, query, property_name, package, is_compound=False):
-        cursor = self.cache_db.cursor()
-        cursor.execute("SELECT result FROM cache WHERE query = ? AND mode = 'deepsearch'",
-                       (f"{query}:{property_name}",))
-        cached = cursor.fetchone()
-        if cached:
-            return cached[0]
+        cached = self.query_cache.get(f"{query}:{property_name}", "deepsearch")
+        if cached is not None:
+            return cached
 
         refine_task = Task(
             description=f"Generate up to 4 refined versions of the query '{query}' for fetching {property_name}. Decide which external sources (Arxiv, Wikipedia, DuckDuckGo) are relevant.",
@@ -657,9 +552,7 @@ class CheExplorer(QMainWindow):
         )
 
         result = crew.kickoff()
-        cursor.execute("INSERT INTO cache (query, result, mode) VALUES (?, ?, 'deepsearch')",
-                       (f"{query}:{property_name}", str(result)))
-        self.cache_db.commit()
+        self.query_cache.put(f"{query}:{property_name}", "deepsearch", result)
         return result
 
     def process_reaction(self, reaction, mode):
@@ -722,14 +615,12 @@ class CheExplorer(QMainWindow):
             self.recent_queries.insert(0, query)
             if len(self.recent_queries) > self.max_recent_queries:
                 self.recent_queries.pop()
-        cursor = self.cache_db.cursor()
         mode = "deepsearch" if self.deepsearch_mode.isChecked() else "think" if self.think_mode.isChecked() else "normal"
-        cursor.execute("SELECT result FROM cache WHERE query = ? AND mode = ?", (query, mode))
-        cached = cursor.fetchone()
-        if cached:
-            self.result_text.setText(cached[0])
+        cached = self.query_cache.get(query, mode)
+        if cached is not None:
+            self.result_text.setText(cached)
             self.progress_bar.setVisible(False)
-            self.plot_query_result(query, cached[0])
+            self.plot_query_result(query, cached)
             self.search_papers_for_query(query, mode)
             return
         parsed = self.agentic_parse_query(query)
@@ -771,10 +662,7 @@ class CheExplorer(QMainWindow):
             result.append(thread_result)
         result_text = "\n".join(str(r) for r in result) or "No results found."
         self.result_text.setText(result_text)
-        cursor = self.cache_db.cursor()
-        cursor.execute("INSERT OR REPLACE INTO cache (query, result, mode) VALUES (?, ?, ?)",
-                       (query, result_text, mode))
-        self.cache_db.commit()
+        self.query_cache.put(query, mode, result_text)
         self.progress_bar.setValue(100)
         self.progress_bar.setVisible(False)
         self.plot_query_result(query, result_text)
@@ -1641,7 +1529,7 @@ class CheExplorer(QMainWindow):
 
     def clear_cache(self):
         cursor = self.cache_db.cursor()
-        cursor.execute("DELETE FROM cache")
+        self.query_cache.clear()
         cursor.execute("DELETE FROM reactions")
         cursor.execute("DELETE FROM comparisons")
         cursor.execute("DELETE FROM tutorials")
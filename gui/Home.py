@@ -2,7 +2,7 @@ from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QLineEdit, QLabel, QScrollArea,
     QPushButton, QWidget, QMessageBox, QGridLayout
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QPixmap
 import os
 from config import JARVIS_DIR
@@ -15,6 +15,7 @@ from core.agents.personal_assistant import YahooFinanceTool, DatabaseTool
 
 class HomeDialog(QDialog):
     """Android-style Apps Widget with grid layout for installed applications."""
+    settings_changed = pyqtSignal()  # Forwarded from the settings dialog
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -161,6 +162,7 @@ class HomeDialog(QDialog):
                 terminal_dialog.exec_()
             elif app_name == "Settings":
                 settings_dialog = AndroidSettingsDialog(self)
+                settings_dialog.settings_changed.connect(self.settings_changed.emit)
                 settings_dialog.exec_()
             elif app_name == "Component Hub":
                 self.component_hub = ComponentHub(self, user_id=self.user_id, alert_checker=self.alert_checker)
@@ -0,0 +1,182 @@
+# Copyright 2025 Dawood Thouseef
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+from queue import Queue, Empty
+
+from config import loggers
+
+log = loggers['AGENTS']
+
+
+class AgentRequest:
+    """A submitted request; ``wait`` blocks for the response text."""
+
+    def __init__(self, text=None, image=None):
+        self.text = text
+        self.image = image
+        self.response = None
+        self.cancelled = False
+        self._done = threading.Event()
+
+    def cancel(self):
+        """Skip the request if it has not started; a running one has its result discarded."""
+        self.cancelled = True
+        self._done.set()
+
+    def set_response(self, response):
+        if not self.cancelled:
+            self.response = response
+        self._done.set()
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return None if self.cancelled else self.response
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+def _model_fingerprint(model):
+    if model is None:
+        return None
+    return tuple(getattr(model, field, None) for field in ("name", "type", "url", "api_key"))
+
+
+class AgentService:
+    """
+    Long-lived owner of the memory store and the JARVIS agent graph.
+
+    Requests are served one at a time from a bounded queue by a single worker
+    thread, reusing the same agent stack. The stack is rebuilt only when the
+    configured language or vision model changes, or after :meth:`invalidate`.
+    ``memory_factory`` and ``agent_factory`` build the stack and can be replaced.
+    """
+
+    def __init__(self, max_pending=8, memory_factory=None, agent_factory=None, config_loader=None):
+        self.requests = Queue(maxsize=max_pending)
+        self.memory_factory = memory_factory or self._default_memory
+        self.agent_factory = agent_factory or self._default_agent
+        self.config_loader = config_loader or self._default_config
+        self.memory = None
+        self.agent = None
+        self._fingerprint = None
+        self._stale = True
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    @staticmethod
+    def _default_memory():
+        from core.memory.memory_agent import MemorySettings
+        memory = MemorySettings()
+        memory._initialize_memory()
+        return memory
+
+    @staticmethod
+    def _default_agent(memory):
+        from core.brain import JARVIS
+        return JARVIS(memory)
+
+    @staticmethod
+    def _default_config():
+        from core.Agent_models import get_model_from_database, get_vision_model_from_database
+        return get_model_from_database(), get_vision_model_from_database()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._serve, name="agent-service", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def invalidate(self):
+        """Rebuild the agent stack before the next request, e.g. after a settings change."""
+        self._stale = True
+
+    def submit(self, text=None, image=None):
+        """Queue a request; raises ``queue.Full`` when too many requests are pending."""
+        self.start()
+        request = AgentRequest(text, image)
+        self.requests.put_nowait(request)
+        return request
+
+    def _ensure_agent(self, fingerprint):
+        if self.agent is not None and not self._stale and fingerprint == self._fingerprint:
+            return self.agent
+        log.info("🧠 Building agent stack.")
+        self.memory = self.memory_factory()
+        self.agent = self.agent_factory(self.memory)
+        self._fingerprint = fingerprint
+        self._stale = False
+        return self.agent
+
+    def _serve(self):
+        while self._running:
+            try:
+                request = self.requests.get(timeout=0.5)
+            except Empty:
+                continue
+            if request.cancelled:
+                continue
+            try:
+                request.set_response(self.handle(request))
+            except Exception as e:
+                err_msg = f"❌ Agent Error: {str(e)}"
+                log.error(err_msg)
+                request.set_response(err_msg)
+
+    def handle(self, request):
+        llm_model, vision_model = self.config_loader()
+        if llm_model is None:
+            return None
+        agent = self._ensure_agent((_model_fingerprint(llm_model), _model_fingerprint(vision_model)))
+
+        if vision_model is None:
+            warning = "⚠️ Vision model not configured. Please set it up in settings."
+            log.warning(warning)
+            return warning
+        if not request.text:
+            from core.agents.vision_agents import vision_agent
+            log.info("🧠 Vision-only task initiated (no text provided).")
+            response = vision_agent(image_inputs=request.image, user_input="Analyze this image and give a brief understanding.")
+            log.info(f"🖼️ Vision Agent Response: {response}")
+            return response
+
+        log.info(f"💬 Processing input: {request.text}")
+        if request.image:
+            response = agent.get_agent(user_input=request.text, image=request.image)
+        else:
+            response = agent.get_agent(user_input=request.text)
+        log.info(f"🤖 Agent Response: {response}")
+        return response
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_agent_service():
+    """The process-wide agent service used when the GUI does not supply one."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AgentService()
+        return _service
@@ -15,16 +15,21 @@ from PyQt5.QtCore import QObject, pyqtSignal
 import litellm
 
 from config import loggers
+from gui.Objects.AgentService import get_agent_service
+from queue import Full
 
 log = loggers['AGENTS']
 
 class AgentWorker(QObject):
     response_signal = pyqtSignal(str) #Signal to emit and play the audio
 
-    def __init__(self):
+    def __init__(self, service=None, timeout=None):
         super().__init__()
         self.text = None
         self.image = None
+        self.service = service or get_agent_service()
+        self.timeout = timeout
+        self.request = None
 
     def set_text(self, text):
         self.text = text
@@ -32,43 +37,22 @@ class AgentWorker(QObject):
     def set_input(self, image):
         self.image = image
 
+    def cancel(self):
+        """Drop the pending request; its response is never emitted."""
+        if self.request is not None:
+            self.request.cancel()
+
     def run(self):
         try:
-            from core.Agent_models import get_model_from_database, get_vision_model_from_database
-            if  get_model_from_database() is not None:
-                from core.memory.memory_agent import MemorySettings
-                memory=MemorySettings()
-                memory._initialize_memory()
-                from core.brain import JARVIS
-                agent=JARVIS(memory)
-                if get_vision_model_from_database() is not None:
-                    from core.agents.vision_agents import vision_agent
-                    if not self.text:
-                        log.info("🧠 Vision-only task initiated (no text provided).")
-                        response = vision_agent(image_inputs=self.image, user_input="Analyze this image and give a brief understanding.")
-                        log.info(f"🖼️ Vision Agent Response: {response}")
-                        self.response_signal.emit(response)
-                else:
-                    warning = "⚠️ Vision model not configured. Please set it up in settings."
-                    log.warning(warning)
-                    self.response_signal.emit(warning)
-                    return
-
-                log.info(f"💬 Processing input: {self.text}")
-                llm_model = get_model_from_database()
-                if not llm_model:
-                    msg = "⚠️ Language model not configured. Please check your assistant settings."
-                    log.warning(msg)
-                    self.response_signal.emit(msg)
-                    return
-
-
-                    # If image is provided, pass both text and image
-                if self.text and self.image and get_vision_model_from_database() is not None:
-                    response = agent.get_agent(user_input=self.text, image=self.image)
-                else:
-                    response = agent.get_agent(user_input=self.text)
-                log.info(f"🤖 Agent Response: {response}")
+            try:
+                self.request = self.service.submit(self.text, self.image)
+            except Full:
+                msg = "⚠️ Still working on earlier requests. Please try again in a moment."
+                log.warning(msg)
+                self.response_signal.emit(msg)
+                return
+            response = self.request.wait(self.timeout)
+            if response is not None:
                 print(f"🤖 Agent Response: {response}")
                 self.response_signal.emit(response)
 
@@ -80,4 +64,7 @@ class AgentWorker(QObject):
         except litellm.exceptions.RateLimitError as e:
             err_msg = f"❌ Agent Error: {str(e['error']['message'])}"
             log.error(err_msg)
-            self.response_signal.emit(err_msg)
\ No newline at end of file
+            self.response_signal.emit(err_msg)
+        finally:
+            self.text = None
+            self.image = None
@@ -1,21 +1,168 @@
 from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from abc import ABC, abstractmethod
 from config import loggers, PLUGIN_DIR
 import psutil, netifaces, json
 from datetime import datetime
 import os
+import time
+import threading
 import importlib.util
+import pandas as pd
+import requests
+import yfinance as yf
 from jarvis_integration.alert_plugins.base import BaseAlertPlugin
 from config import JARVIS_DIR
 
 log = loggers['AGENTS']
 
+
+class QuoteSource(ABC):
+    """
+    Batched, cached price lookups for many tickers.
+
+    Subclasses implement ``_fetch(tickers)`` to get every ticker's price in one
+    batch. Quotes are kept for ``ttl`` seconds so alerts and purchases on the same
+    ticker share one lookup. After a failed batch no request is made for
+    ``backoff`` seconds, doubling on every further failure up to ``max_backoff``.
+    """
+
+    def __init__(self, ttl=30.0, backoff=30.0, max_backoff=600.0):
+        self.ttl = ttl
+        self.min_backoff = backoff
+        self.max_backoff = max_backoff
+        self._backoff = backoff
+        self._retry_at = 0.0
+        self._cache = {}
+        self._names = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _fetch(self, tickers):
+        """Return ``{ticker: price}`` for the tickers that resolved."""
+
+    def _lookup_name(self, ticker):
+        return ticker
+
+    def company(self, ticker):
+        """The company's display name, looked up once per ticker."""
+        with self._lock:
+            name = self._names.get(ticker)
+        if name is None:
+            try:
+                name = self._lookup_name(ticker) or ticker
+            except Exception as e:
+                log.warning(f"Company name lookup for {ticker} failed: {e}")
+                return ticker
+            with self._lock:
+                self._names[ticker] = name
+        return name
+
+    def get_quotes(self, tickers):
+        """Return ``{ticker: {"ticker", "price"}}`` for the tickers that resolved."""
+        tickers = list(dict.fromkeys(tickers))
+        now = time.monotonic()
+        with self._lock:
+            fresh = {t: q for t, (ts, q) in self._cache.items() if t in tickers and now - ts < self.ttl}
+            backing_off = now < self._retry_at
+        missing = [t for t in tickers if t not in fresh]
+        if not missing or backing_off:
+            return fresh
+
+        try:
+            prices = self._fetch(missing)
+        except Exception as e:
+            with self._lock:
+                self._retry_at = now + self._backoff
+                log.error(f"Quote fetch failed for {len(missing)} tickers, retrying in {self._backoff:.0f}s: {e}")
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+            return fresh
+
+        fetched = {t: {"ticker": t, "price": round(float(p), 2)} for t, p in prices.items()}
+        with self._lock:
+            self._backoff = self.min_backoff
+            for ticker, quote in fetched.items():
+                self._cache[ticker] = (now, quote)
+        fresh.update(fetched)
+        return fresh
+
+
+class YFinanceQuoteSource(QuoteSource):
+    """Prices for all tickers from one ``yf.download`` call; names from ``Ticker.info``."""
+
+    def _fetch(self, tickers):
+        frame = yf.download(" ".join(tickers), period="1d", group_by="ticker",
+                            progress=False, auto_adjust=False)
+        if frame is None or frame.empty:
+            raise ValueError("no price data returned")
+        return last_closes(frame, tickers)
+
+    def _lookup_name(self, ticker):
+        return yf.Ticker(ticker).info.get("longName")
+
+
+def last_closes(frame, tickers):
+    """The latest close per ticker from a ``yf.download`` frame."""
+    prices = {}
+    for ticker in tickers:
+        try:
+            if isinstance(frame.columns, pd.MultiIndex):
+                closes = frame[ticker]["Close"]
+            elif len(tickers) == 1:
+                closes = frame["Close"]
+            else:
+                continue
+        except KeyError:
+            continue
+        closes = closes.dropna()
+        if len(closes):
+            prices[ticker] = float(closes.iloc[-1])
+    return prices
+
+
+class YahooQuoteSource(QuoteSource):
+    """
+    Quotes from ``GET {base_url}/v7/finance/quote?symbols=A,B``.
+
+    For test fixture servers that answer in the shape of Yahoo's quote API; the
+    live endpoint needs a crumb and cookie, so AlertCheck uses
+    :class:`YFinanceQuoteSource` by default.
+    """
+
+    def __init__(self, base_url, timeout=5.0, session=None, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def _fetch(self, tickers):
+        response = self.session.get(
+            f"{self.base_url}/v7/finance/quote",
+            params={"symbols": ",".join(tickers)},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        prices = {}
+        for item in response.json().get("quoteResponse", {}).get("result", []):
+            price = item.get("regularMarketPrice")
+            if price is None:
+                continue
+            symbol = item["symbol"]
+            prices[symbol] = price
+            name = item.get("longName") or item.get("shortName")
+            if name:
+                with self._lock:
+                    self._names[symbol] = name
+        return prices
+
+
 class AlertCheck(QObject):
     alert_triggered = pyqtSignal(list)  # Signal to emit alerts (both system + stock)
 
-    def __init__(self, db_tool, yahoo_tool, parent=None):
+    def __init__(self, db_tool, yahoo_tool, parent=None, quote_source=None):
         super().__init__(parent)
         self.db_tool = db_tool
         self.yahoo_tool = yahoo_tool
+        self.quote_source = quote_source or YFinanceQuoteSource()
         self.running = False
         self.plugins = []
         self.cpu_threshold = 90.0
@@ -45,60 +192,83 @@ class AlertCheck(QObject):
         except Exception:
             return "unknown"
 
-    def check_stock_alerts(self, triggered):
+    def check_stock_alerts(self, triggered, notifications=None):
         from core.agents.personal_assistant import EXCHANGE_RATES
-        currency = self.db_tool._run("get_preference", key="currency", default="USD")
-        currency = currency if currency in EXCHANGE_RATES else "USD"
-        rate_to_usd = EXCHANGE_RATES[currency]
-
+        if notifications is None:
+            notifications = []
         alerts = json.loads(self.db_tool._run("get_alerts"))
         purchases = json.loads(self.db_tool._run("get_purchases_for_alerts"))
 
+        purchase_tickers = list(dict.fromkeys(ticker for ticker, _, _, _ in purchases))
+        preference_keys = ["currency"]
+        for ticker in purchase_tickers:
+            preference_keys += [f"{ticker}_target_profit", f"{ticker}_min_profit"]
+        preferences = json.loads(self.db_tool._run(
+            "get_preferences", keys=preference_keys, defaults={"currency": "USD"}
+        ))
+
+        currency = preferences.get("currency") or "USD"
+        currency = currency if currency in EXCHANGE_RATES else "USD"
+
+        quotes = self.quote_source.get_quotes(
+            [ticker for ticker, _, _ in alerts] + purchase_tickers
+        )
+
         for ticker, target_price, alert_currency in alerts:
-            data = json.loads(self.yahoo_tool._run(ticker))
-            if "price" in data:
+            data = quotes.get(ticker)
+            if data:
                 usd_price = data["price"]
                 alert_price_usd = target_price / EXCHANGE_RATES.get(alert_currency, 1)
                 if usd_price >= alert_price_usd:
                     converted = usd_price * EXCHANGE_RATES[currency]
                     triggered.append(
-                        f"📈 {data['company']} ({ticker}) hit {currency}{converted:.2f} (target: {alert_currency}{target_price})"
+                        f"📈 {self.quote_source.company(ticker)} ({ticker}) hit {currency}{converted:.2f} (target: {alert_currency}{target_price})"
                     )
-                    self.db_tool._run("log_notification", message=f"Stock alert for {ticker} at {currency}{converted:.2f}")
+                    notifications.append(f"Stock alert for {ticker} at {currency}{converted:.2f}")
 
         for ticker, buy_price, qty, buy_currency in purchases:
-            data = json.loads(self.yahoo_tool._run(ticker))
-            if "price" in data:
+            data = quotes.get(ticker)
+            if data:
                 usd_price = data["price"]
                 buy_price_usd = buy_price / EXCHANGE_RATES.get(buy_currency, 1)
-                target_profit = float(self.db_tool._run("get_preference", key=f"{ticker}_target_profit", default=0))
-                min_profit = float(self.db_tool._run("get_preference", key=f"{ticker}_min_profit", default=0))
+                target_profit = float(preferences.get(f"{ticker}_target_profit") or 0)
+                min_profit = float(preferences.get(f"{ticker}_min_profit") or 0)
 
                 profit = (usd_price - buy_price_usd) * qty
                 if usd_price >= buy_price_usd + target_profit and profit >= min_profit:
                     converted_profit = profit * EXCHANGE_RATES[currency]
                     triggered.append(
-                        f"💰 {data['company']} ({ticker}) profit: {currency}{converted_profit:.2f} (qty: {qty})"
+                        f"💰 {self.quote_source.company(ticker)} ({ticker}) profit: {currency}{converted_profit:.2f} (qty: {qty})"
                     )
-                    self.db_tool._run("log_notification", message=f"Profit alert for {ticker}: {currency}{converted_profit:.2f}")
+                    notifications.append(f"Profit alert for {ticker}: {currency}{converted_profit:.2f}")
+        return notifications
 
-    def check_system_alerts(self, triggered):
+    def check_system_alerts(self, triggered, notifications=None):
+        if notifications is None:
+            notifications = []
         sensors = self.get_system_sensors()
         network_status = self.get_network_status()
-
+        system_alerts = []
         if sensors.get("cpu", 0) > self.cpu_threshold:
-            triggered.append(f"🔥 CPU usage {sensors['cpu']:.1f}% exceeds {self.cpu_threshold}%")
+            system_alerts.append(f"🔥 CPU usage {sensors['cpu']:.1f}% exceeds {self.cpu_threshold}%")
         if sensors.get("memory", 0) > self.memory_threshold:
-            triggered.append(f"🧠 Memory usage {sensors['memory']:.1f}% exceeds {self.memory_threshold}%")
+            system_alerts.append(f"🧠 Memory usage {sensors['memory']:.1f}% exceeds {self.memory_threshold}%")
         if sensors.get("disk", 0) > self.disk_threshold:
-            triggered.append(f"💾 Disk usage {sensors['disk']:.1f}% exceeds {self.disk_threshold}%")
+            system_alerts.append(f"💾 Disk usage {sensors['disk']:.1f}% exceeds {self.disk_threshold}%")
         if sensors.get("battery", 100) < self.battery_threshold and not sensors.get("power_plugged", True):
-            triggered.append(f"🔋 Battery low: {sensors['battery']}%")
+            system_alerts.append(f"🔋 Battery low: {sensors['battery']}%")
         if network_status == "disconnected":
-            triggered.append("🚫 Network disconnected.")
+            system_alerts.append("🚫 Network disconnected.")
+
+        triggered.extend(system_alerts)
+        stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        notifications.extend(f"{alert} @ {stamp}" for alert in system_alerts)
+        return notifications
 
-        for alert in triggered:
-            self.db_tool._run("log_notification", message=f"{alert} @ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    def log_notifications(self, notifications):
+        """Write all of a cycle's notifications in one transaction."""
+        if notifications:
+            self.db_tool._run("log_notifications", messages=notifications)
 
     def load_plugins(self):
         """Load alert plugins from PLUGIN_DIR and COMPONENTS_DIR/alerts."""
@@ -134,9 +304,11 @@ class AlertCheck(QObject):
         self.running = True
         while self.running:
             triggered = []
+            notifications = []
             try:
-                self.check_stock_alerts(triggered)
-                self.check_system_alerts(triggered)
+                self.check_stock_alerts(triggered, notifications)
+                self.check_system_alerts(triggered, notifications)
+                self.log_notifications(notifications)
                 for plugin in self.plugins:
                     alerts = plugin.check_alerts()
                     if alerts:
@@ -0,0 +1,214 @@
+import threading
+import time
+from config import loggers
+
+log = loggers['AUDIO']
+
+
+class RingBuffer:
+    """
+    Single-producer, single-consumer byte ring buffer.
+
+    The producer only advances ``write_pos`` and the consumer only advances
+    ``read_pos``, so neither side takes a lock. A consumer that falls more than
+    ``capacity`` bytes behind skips ahead to the oldest data still buffered and
+    the skipped bytes are counted in ``overruns``.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self.write_pos = 0
+        self.read_pos = 0
+        self.overruns = 0
+        self._writing_to = 0
+
+    def write(self, data):
+        if len(data) > self.capacity:
+            self.write_pos += len(data) - self.capacity
+            data = data[-self.capacity:]
+        # Announce the region being overwritten before touching it.
+        self._writing_to = self.write_pos + len(data)
+        start = self.write_pos % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._buffer[start:start + first] = data[:first]
+        self._buffer[:len(data) - first] = data[first:]
+        self.write_pos = self._writing_to
+
+    def available(self):
+        return self.write_pos - self.read_pos
+
+    def read(self, size):
+        """Return exactly ``size`` bytes, or None if not enough data is buffered yet."""
+        while True:
+            if self.write_pos - self.read_pos > self.capacity:
+                self.overruns += self.write_pos - self.read_pos - self.capacity
+                self.read_pos = self.write_pos - self.capacity
+            if self.write_pos - self.read_pos < size:
+                return None
+            position = self.read_pos
+            start = position % self.capacity
+            first = min(size, self.capacity - start)
+            data = bytes(self._buffer[start:start + first]) + bytes(self._buffer[:size - first])
+            # The producer may have lapped us while copying; retry from the new tail.
+            if self._writing_to - position > self.capacity:
+                continue
+            self.read_pos = position + size
+            return data
+
+
+class Subscription:
+    """A consumer's view of the shared capture stream, with its own framing."""
+
+    def __init__(self, hub, name, capacity):
+        self.hub = hub
+        self.name = name
+        self.ring = RingBuffer(capacity)
+        self._data_ready = threading.Event()
+
+    def _push(self, data):
+        self.ring.write(data)
+        self._data_ready.set()
+
+    def read(self, num_samples, timeout=None):
+        """Return ``num_samples`` 16-bit mono samples as bytes, or None on timeout."""
+        size = num_samples * self.hub.sample_width
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            data = self.ring.read(size)
+            if data is not None:
+                return data
+            if not self.hub.is_subscribed(self):
+                return None
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self._data_ready.clear()
+            if self.ring.available() >= size:
+                continue
+            self._data_ready.wait(remaining if remaining is not None else 0.5)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class PyAudioSource:
+    """Default capture source: one PyAudio input stream."""
+
+    def __init__(self, sample_rate, frames_per_buffer, input_device_index=None):
+        import pyaudio
+        self._pyaudio = pyaudio.PyAudio()
+        self._stream = self._pyaudio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=sample_rate,
+            input=True,
+            frames_per_buffer=frames_per_buffer,
+            input_device_index=input_device_index,
+        )
+
+    def read(self, num_samples):
+        return self._stream.read(num_samples, exception_on_overflow=False)
+
+    def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._pyaudio.terminate()
+
+
+class AudioCaptureHub:
+    """
+    Opens the microphone once and fans the frames out to every subscriber.
+
+    Consumers such as the wake-word detector, the VAD and the recorder call
+    :meth:`subscribe` and read frames of whatever size they need from their own
+    ring buffer. The device is opened with the first subscription and released
+    when the last one goes away. ``source_factory`` builds the capture source and
+    can be replaced with a simulated one that has ``read(num_samples)`` and ``close()``.
+    """
+
+    sample_width = 2
+
+    def __init__(self, sample_rate=16000, block_size=512, buffer_seconds=2.0, source_factory=None):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.buffer_bytes = int(sample_rate * buffer_seconds) * self.sample_width
+        self.source_factory = source_factory or (lambda: PyAudioSource(sample_rate, block_size))
+        # Replaced wholesale on (un)subscribe so the capture thread iterates without locking.
+        self._subscribers = ()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = threading.Event()
+        self._stats = {"blocks": 0, "cpu_seconds": 0.0, "wall_seconds": 0.0}
+
+    def subscribe(self, name, buffer_seconds=None):
+        capacity = self.buffer_bytes if buffer_seconds is None else int(self.sample_rate * buffer_seconds) * self.sample_width
+        subscription = Subscription(self, name, capacity)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+            if self._thread is not None and self._thread.is_alive() and not self._running.is_set():
+                # The previous capture loop is winding down; let it release the device first.
+                self._thread.join()
+            if self._thread is None or not self._thread.is_alive():
+                self._running.set()
+                self._thread = threading.Thread(target=self._capture_loop, name="audio-capture-hub", daemon=True)
+                self._thread.start()
+        log.info(f"Audio hub: '{name}' subscribed.")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+            if not self._subscribers:
+                self._running.clear()
+        subscription._data_ready.set()
+        log.info(f"Audio hub: '{subscription.name}' unsubscribed.")
+
+    def is_subscribed(self, subscription):
+        return subscription in self._subscribers
+
+    def _capture_loop(self):
+        try:
+            source = self.source_factory()
+        except Exception as e:
+            log.error(f"Audio hub could not open the input device: {e}")
+            self._running.clear()
+            return
+        wall_start, cpu_start = time.monotonic(), time.thread_time()
+        cpu_base, wall_base = self._stats["cpu_seconds"], self._stats["wall_seconds"]
+        try:
+            while self._running.is_set():
+                data = source.read(self.block_size)
+                if not data:
+                    continue
+                for subscription in self._subscribers:
+                    subscription._push(data)
+                self._stats["blocks"] += 1
+                self._stats["cpu_seconds"] = cpu_base + time.thread_time() - cpu_start
+                self._stats["wall_seconds"] = wall_base + time.monotonic() - wall_start
+        except Exception as e:
+            log.error(f"Audio hub capture error: {e}")
+        finally:
+            source.close()
+            stats = self.stats()
+            log.info(f"Audio hub released the input device after {stats['blocks']} blocks "
+                     f"({stats['cpu_percent']:.2f}% CPU in the capture thread).")
+            for subscription in self._subscribers:
+                subscription._data_ready.set()
+
+    def stats(self):
+        """Capture statistics, including the capture thread's CPU use in percent."""
+        stats = dict(self._stats)
+        stats["cpu_percent"] = 100.0 * stats["cpu_seconds"] / stats["wall_seconds"] if stats["wall_seconds"] else 0.0
+        stats["overruns"] = {s.name: s.ring.overruns for s in self._subscribers}
+        return stats
+
+    def stop(self):
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, ()
+            self._running.clear()
+            thread = self._thread
+        for subscription in subscribers:
+            subscription._data_ready.set()
+        if thread is not None:
+            thread.join(timeout=1)
@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+import numpy as np
+from config import loggers
+
+log = loggers['GUI']
+
+
+class OpenCVSource:
+    """
+    Frames from ``cv2.VideoCapture``: a device index or a video file.
+
+    Video files are rewound when they run out so they can stand in for a camera.
+    """
+
+    def __init__(self, source=0):
+        import cv2
+        self._cv2 = cv2
+        self.is_file = isinstance(source, str) and not source.isdigit()
+        self._capture = cv2.VideoCapture(source if self.is_file else int(source))
+        if not self._capture.isOpened():
+            self._capture.release()
+            raise RuntimeError(f"Cannot open video source {source!r}")
+        self.frame_interval = 0.0
+        if self.is_file:
+            fps = self._capture.get(cv2.CAP_PROP_FPS)
+            self.frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+
+    def read(self):
+        ret, frame = self._capture.read()
+        if not ret and self.is_file:
+            self._capture.set(self._cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._capture.read()
+        if self.frame_interval:
+            time.sleep(self.frame_interval)
+        return frame if ret else None
+
+    def close(self):
+        self._capture.release()
+
+
+class SyntheticSource:
+    """Generated BGR frames (a moving bar over a gradient) for running without a camera."""
+
+    def __init__(self, width=640, height=480, fps=30):
+        self.width = width
+        self.height = height
+        self.frame_interval = 1.0 / fps
+        self.index = 0
+        self._background = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+
+    def read(self):
+        time.sleep(self.frame_interval)
+        frame = np.repeat(self._background[:, :, None], 3, axis=2)
+        x = (self.index * 8) % self.width
+        frame[:, x:x + 16] = (0, 0, 255)
+        self.index += 1
+        return frame
+
+    def close(self):
+        pass
+
+
+def default_source_factory():
+    """Camera source from ``CAMERA_SOURCE``: a device index, a video file path or ``synthetic``."""
+    source = os.getenv("CAMERA_SOURCE", "0")
+    if source == "synthetic":
+        return SyntheticSource()
+    return OpenCVSource(source)
+
+
+class CameraLease:
+    """Keeps the camera open until :meth:`release` is called."""
+
+    def __init__(self, hub, name):
+        self.hub = hub
+        self.name = name
+
+    def read(self, timeout=2.0, fresh=False):
+        return self.hub.read(timeout=timeout, fresh=fresh)
+
+    def release(self):
+        self.hub.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CameraCaptureHub:
+    """
+    Opens the camera once and keeps the newest frame ready for every consumer.
+
+    A background grabber reads continuously while the device is open, so
+    :meth:`read` returns the latest frame without paying for device negotiation
+    or draining stale buffered frames. The device stays open while any
+    :meth:`acquire` lease is held, and for ``idle_timeout`` seconds after the last
+    read; after that it is released until the next read. ``source_factory``
+    builds the source and can be replaced with anything that has ``read()``
+    returning a frame (or None) and ``close()``.
+    """
+
+    def __init__(self, source_factory=None, idle_timeout=None):
+        self.source_factory = source_factory or default_source_factory
+        self.idle_timeout = idle_timeout if idle_timeout is not None else float(os.getenv("CAMERA_IDLE_TIMEOUT", "30"))
+        self._leases = ()
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Condition()
+        self._frame = None
+        self._frame_index = 0
+        self._frame_time = 0.0
+        self._last_used = 0.0
+        self._error = None
+        self._thread = None
+        self._running = threading.Event()
+        self._stats = {"opens": 0, "frames": 0, "reads": 0}
+
+    def acquire(self, name):
+        lease = CameraLease(self, name)
+        with self._lock:
+            self._leases = self._leases + (lease,)
+        self._ensure_running()
+        log.info(f"Camera hub: '{name}' acquired the camera.")
+        return lease
+
+    def release(self, lease):
+        with self._lock:
+            self._leases = tuple(l for l in self._leases if l is not lease)
+        self._last_used = time.monotonic()
+        log.info(f"Camera hub: '{lease.name}' released the camera.")
+
+    def is_open(self):
+        return self._running.is_set()
+
+    def _ensure_running(self):
+        with self._lock:
+            self._last_used = time.monotonic()
+            if self._thread is not None and self._thread.is_alive():
+                if self._running.is_set():
+                    return
+                # The grabber is winding down; let it release the device first.
+                self._thread.join()
+            self._error = None
+            self._frame = None
+            self._running.set()
+            self._thread = threading.Thread(target=self._grab_loop, name="camera-capture-hub", daemon=True)
+            self._thread.start()
+
+    def read(self, timeout=2.0, fresh=False):
+        """
+        Return a copy of the newest frame, or None if none arrives within ``timeout``.
+
+        With ``fresh=True`` only a frame grabbed after the call is accepted.
+        """
+        self._stats["reads"] += 1
+        deadline = time.monotonic() + timeout
+        seen = self._frame_index if fresh else -1
+        while True:
+            self._ensure_running()
+            with self._frame_ready:
+                while self._running.is_set() and (self._frame is None or self._frame_index == seen):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._frame_ready.wait(remaining)
+                if self._frame is not None and self._frame_index != seen:
+                    self._last_used = time.monotonic()
+                    return self._frame.copy()
+            # The grabber stopped while we waited: it went idle just before this
+            # read, or the device failed.
+            if self._error or time.monotonic() >= deadline:
+                return None
+
+    def _idle(self):
+        return not self._leases and time.monotonic() - self._last_used > self.idle_timeout
+
+    def _grab_loop(self):
+        try:
+            source = self.source_factory()
+        except Exception as e:
+            self._error = f"could not open the camera: {e}"
+            log.error(f"Camera hub {self._error}")
+            self._running.clear()
+            with self._frame_ready:
+                self._frame_ready.notify_all()
+            return
+        self._stats["opens"] += 1
+        log.info("Camera hub opened the camera.")
+        try:
+            while self._running.is_set() and not self._idle():
+                frame = source.read()
+                if frame is None:
+                    time.sleep(0.01)
+                    continue
+                with self._frame_ready:
+                    self._frame = frame
+                    self._frame_index += 1
+                    self._frame_time = time.monotonic()
+                    self._frame_ready.notify_all()
+                self._stats["frames"] += 1
+        except Exception as e:
+            self._error = f"capture error: {e}"
+            log.error(f"Camera hub {self._error}")
+        finally:
+            self._running.clear()
+            source.close()
+            with self._frame_ready:
+                self._frame = None
+                self._frame_ready.notify_all()
+            log.info("Camera hub released the camera.")
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats["open"] = self.is_open()
+        stats["leases"] = [l.name for l in self._leases]
+        return stats
+
+    def stop(self):
+        with self._lock:
+            self._leases = ()
+            self._running.clear()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=1)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_camera_hub():
+    """The process-wide camera hub used when no hub is passed in."""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = CameraCaptureHub()
+        return _hub
@@ -2,10 +2,13 @@ from PyQt5.QtCore import QObject, pyqtSignal
 from config import loggers
 from core.memory.memory_agent import MemorySettings
 from core.Agent_models import get_model
+from gui.Objects.CameraHub import get_camera_hub
+from gui.Objects.ProbeScheduler import Probe, ProbeScheduler, user_idle_seconds
 
-import cv2, psutil, socket, netifaces, requests
+import cv2, psutil, socket, netifaces, requests, hashlib
+import numpy as np
 from PIL import Image
-from time import time, sleep
+from time import time
 from io import BytesIO
 
 log = loggers['AGENTS']
@@ -15,18 +18,40 @@ class ConsciousnessWorker(QObject):
     update_signal = pyqtSignal(str)  # Proactive messages for GUI
     image_signal = pyqtSignal(list)  # Pass image data to vision model
 
-    def __init__(self, stop_event):
+    def __init__(self, stop_event, camera_hub=None):
         super().__init__()
         self.stop_event = stop_event
         self.memory = MemorySettings()
         self.memory._initialize_memory()
         self.llm = get_model()
         self.last_screenshot_time = 0
-        self.camera = cv2.VideoCapture(0)
+        self.camera_hub = camera_hub or get_camera_hub()
+        self.motion_threshold = 8.0
+        self._last_small_frame = None
+        self._last_emotion = None
+        self._last_screen_signature = None
+        self._last_system_signature = None
+        self._last_network_signature = None
+        self.scheduler = ProbeScheduler(self.build_probes(), idle_seconds=user_idle_seconds)
+
+    def build_probes(self):
+        """Each awareness check as an independently scheduled probe."""
+        return [
+            Probe("system", self.probe_system, interval=60, max_interval=600),
+            Probe("network", self.probe_network, interval=60, max_interval=900),
+            Probe("camera", self.probe_camera, interval=60, max_interval=600),
+            Probe("screenshot", self.probe_screenshot, interval=120, max_interval=1200),
+            Probe("llm", self.probe_llm, interval=60, max_interval=1800,
+                  depends_on=("system", "network", "camera", "screenshot")),
+            Probe("extendable", self.awareness_extendable_tasks, interval=60, idle_scale=False),
+        ]
 
     # ----------------- Internal Awareness ----------------- #
-    def awareness_system(self):
-        cpu = psutil.cpu_percent(interval=1)
+    def awareness_system(self, cpu=None):
+        # Non-blocking: utilisation since the previous sample. A second sample right
+        # after one reads ~0%, so callers that already took one pass it in.
+        if cpu is None:
+            cpu = psutil.cpu_percent(interval=None)
         mem = psutil.virtual_memory().percent
         disk = psutil.disk_usage('/').percent
         battery = psutil.sensors_battery()
@@ -70,38 +95,44 @@ class ConsciousnessWorker(QObject):
             log.error(f"[LLM Suggestion] {e}")
 
     # ----------------- External Awareness ----------------- #
-    def awareness_network(self):
+    def awareness_network(self, net=None):
+        net = net or self._network_status()
+        if "IP" in net:
+            self.memory.add_memory(str(net), source="network")
+        if net.get("Internet") == "Disconnected":
+            self.update_signal.emit("🌐 Internet appears disconnected.")
+        return net
+
+    def _network_status(self):
         try:
             ip = socket.gethostbyname(socket.gethostname())
             gateway = netifaces.gateways().get('default', {}).get(netifaces.AF_INET, [None])[0]
             connected = requests.get("http://www.google.com", timeout=2).status_code == 200
-            net = {
+            return {
                 "IP": ip,
                 "Gateway": gateway or "N/A",
                 "Internet": "Connected" if connected else "Disconnected"
             }
-            self.memory.add_memory(str(net), source="network")
-            if not connected:
-                msg = "🌐 Internet appears disconnected."
-                self.update_signal.emit(msg)
-            return net
         except Exception:
             return {"Internet": "Status unknown"}
 
-    def awareness_camera(self):
-        if self.camera.isOpened():
-            ret, frame = self.camera.read()
-            if ret:
-                emotion = self.awareness_mood(frame)
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(frame_rgb)
-                buffer = BytesIO()
-                img.save(buffer, format="PNG")
-                self.image_signal.emit([buffer.getvalue()])
-
-    def awareness_screenshot(self):
-        from pyautogui import screenshot
-        ss = screenshot()
+    def awareness_camera(self, frame=None):
+        if frame is None:
+            frame = self.camera_hub.read()
+        if frame is None:
+            return None
+        emotion = self.awareness_mood(frame)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        img = Image.fromarray(frame_rgb)
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        self.image_signal.emit([buffer.getvalue()])
+        return emotion
+
+    def awareness_screenshot(self, ss=None):
+        if ss is None:
+            from pyautogui import screenshot
+            ss = screenshot()
         buffer = BytesIO()
         ss.save(buffer, format="PNG")
         self.image_signal.emit([buffer.getvalue()])
@@ -112,25 +143,71 @@ class ConsciousnessWorker(QObject):
         # 👉 Add future IoT sensor awareness, app usage, activity tracking here
         pass
 
+    # ----------------- Probes ----------------- #
+    # Each probe returns a coarse signature of what it saw so the scheduler can
+    # back off while nothing changes and skip the LLM when no input moved.
+    def probe_system(self):
+        cpu = psutil.cpu_percent(interval=None)
+        mem = psutil.virtual_memory().percent
+        battery = psutil.sensors_battery()
+        signature = (
+            int(cpu // 20), int(mem // 10),
+            int(battery.percent // 10) if battery else None,
+            battery.power_plugged if battery else None,
+        )
+        if signature != self._last_system_signature:
+            self._last_system_signature = signature
+            self.awareness_system(cpu)
+        return signature
+
+    def probe_network(self):
+        net = self._network_status()
+        signature = tuple(sorted(net.items()))
+        if signature != self._last_network_signature:
+            self._last_network_signature = signature
+            self.awareness_network(net)
+        return signature
+
+    def frame_motion(self, frame):
+        """Mean absolute difference against the previous downscaled frame (0-255)."""
+        small = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (64, 48), interpolation=cv2.INTER_AREA)
+        previous, self._last_small_frame = self._last_small_frame, small
+        if previous is None:
+            return float("inf")
+        return float(np.mean(cv2.absdiff(small, previous)))
+
+    def probe_camera(self):
+        frame = self.camera_hub.read()
+        if frame is None:
+            return None
+        if self.frame_motion(frame) < self.motion_threshold:
+            # Nothing moved in front of the camera: keep the last mood, skip DeepFace.
+            return self._last_emotion
+        self._last_emotion = self.awareness_camera(frame)
+        return self._last_emotion
+
+    def probe_screenshot(self):
+        from pyautogui import screenshot
+        ss = screenshot()
+        thumbnail = np.asarray(ss.convert("L").resize((64, 36)), dtype=np.uint8) // 16
+        signature = hashlib.sha1(thumbnail.tobytes()).hexdigest()
+        if signature != self._last_screen_signature:
+            self._last_screen_signature = signature
+            self.awareness_screenshot(ss)
+        return signature
+
+    def probe_llm(self):
+        self.awareness_llm_suggestion()
+        return None
+
     # ----------------- Main Loop ----------------- #
     def run(self):
         log.info("🧠 Consciousness thread running...")
-        while not self.stop_event.is_set():
-            try:
-                system_stats = self.awareness_system()
-                network_stats = self.awareness_network()
-                self.awareness_camera()
-
-                if time() - self.last_screenshot_time > 120:
-                    self.awareness_screenshot()
-
-                self.awareness_llm_suggestion()
-                self.awareness_extendable_tasks()
-
-                sleep(60)
-            except Exception as e:
-                log.error(f"[Consciousness Thread Error] {e}")
+        try:
+            self.scheduler.run(self.stop_event)
+        except Exception as e:
+            log.error(f"[Consciousness Thread Error] {e}")
 
     def cleanup(self):
-        if self.camera.isOpened():
-            self.camera.release()
+        # The camera hub releases the device on its own once it goes idle.
+        pass
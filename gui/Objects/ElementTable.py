@@ -0,0 +1,202 @@
+import json
+import os
+import warnings
+from functools import lru_cache
+from importlib import metadata
+from config import JARVIS_DIR, loggers
+
+log = loggers['GUI']
+
+SCHEMA_VERSION = 1
+
+# Numeric and list properties served from the table instead of a mendeleev query.
+ELEMENT_PROPERTIES = ("atomic_weight", "density", "melting_point", "boiling_point", "electronegativity",
+                      "atomic_radius", "oxidation_states", "ionization_energies", "en_pauling")
+
+_main_table = [
+    (1, 1, 1), (2, 1, 18),
+    (3, 2, 1), (4, 2, 2), (5, 2, 13), (6, 2, 14), (7, 2, 15), (8, 2, 16), (9, 2, 17), (10, 2, 18),
+    (11, 3, 1), (12, 3, 2), (13, 3, 13), (14, 3, 14), (15, 3, 15), (16, 3, 16), (17, 3, 17), (18, 3, 18),
+] + [(18 + col, 4, col) for col in range(1, 19)] \
+  + [(36 + col, 5, col) for col in range(1, 19)] \
+  + [(55, 6, 1), (56, 6, 2)] + [(68 + col, 6, col) for col in range(4, 19)] \
+  + [(87, 7, 1), (88, 7, 2)] + [(100 + col, 7, col) for col in range(4, 19)]
+_f_block = [(57 + i, 8, 3 + i) for i in range(15)] + [(89 + i, 9, 3 + i) for i in range(15)]
+
+# Atomic number -> (row, column) in the displayed grid; rows 8 and 9 hold the f-block.
+PERIODIC_POSITIONS = {number: (row, col) for number, row, col in _main_table + _f_block}
+
+_group_members = {
+    "nonmetal": (1, 6, 7, 8, 15, 16, 34),
+    "noble_gas": (2, 10, 18, 36, 54, 86),
+    "alkali_metal": (3, 11, 19, 37, 55, 87),
+    "alkaline_earth": (4, 12, 20, 38, 56, 88),
+    "metalloid": (5, 14, 32, 33, 51, 52, 84),
+    "post_transition_metal": (13, 30, 31, 48, 49, 50, 81, 82, 83),
+    "halogen": (9, 17, 35, 53, 85),
+}
+_group_by_number = {number: group for group, numbers in _group_members.items() for number in numbers}
+
+SYMBOLS = (
+    "H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br Kr "
+    "Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb "
+    "Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr Rf "
+    "Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og"
+).split()
+
+
+def element_group(atomic_number):
+    if atomic_number in _group_by_number:
+        return _group_by_number[atomic_number]
+    if 57 <= atomic_number <= 71:
+        return "lanthanide"
+    if 89 <= atomic_number <= 103:
+        return "actinide"
+    return "transition_metal"
+
+
+def periodic_position(atomic_number):
+    return PERIODIC_POSITIONS.get(atomic_number, (1, 1))
+
+
+def mendeleev_version():
+    try:
+        return metadata.version("mendeleev")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _plain(value):
+    """Reduce a mendeleev attribute to something JSON can hold."""
+    if callable(value):
+        value = value()
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class ElementTable:
+    """
+    Element layout and properties, precomputed from mendeleev into a JSON file.
+
+    The file is loaded once and indexed by atomic number, symbol (and name) and
+    grid position. It is regenerated only when the installed mendeleev version
+    differs from the one recorded in it. Without mendeleev, an existing file
+    is used as-is; if there is no file either, the table holds the layout only.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(JARVIS_DIR, "data", "element_table.json")
+        self.elements = []
+        self.by_number = {}
+        self.by_symbol = {}
+        self.by_position = {}
+        self.load()
+
+    def load(self):
+        version = mendeleev_version()
+        data = self._read()
+        stale = data is None or (version is not None and data.get("mendeleev_version") != version)
+        if stale:
+            built = self.build(version) if version is not None else None
+            if built is not None:
+                self._write(built)
+                data = built
+            elif data is None:
+                data = {"mendeleev_version": None, "elements": self._layout_only()}
+        self._index(data["elements"])
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("schema") != SCHEMA_VERSION:
+            return None
+        return data
+
+    def _write(self, data):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.warning(f"Could not save element table: {e}")
+
+    @staticmethod
+    def _layout_only():
+        elements = []
+        for number, symbol in enumerate(SYMBOLS, start=1):
+            row, col = periodic_position(number)
+            elements.append({"number": number, "symbol": symbol, "row": row, "col": col,
+                             "group": element_group(number)})
+        return elements
+
+    def build(self, version):
+        """Query mendeleev once for every element; returns None if that fails."""
+        try:
+            from mendeleev import element as mendeleev_element
+        except ImportError:
+            return None
+        log.info(f"Building element table from mendeleev {version}.")
+        elements = []
+        for record in self._layout_only():
+            try:
+                elem = mendeleev_element(record["number"])
+            except Exception as e:
+                log.warning(f"mendeleev lookup failed for {record['symbol']}: {e}")
+                return None
+            record["name"] = elem.name
+            for prop in ELEMENT_PROPERTIES:
+                try:
+                    with warnings.catch_warnings():
+                        # Allotrope notices for P, S, Se and Sn.
+                        warnings.simplefilter("ignore", UserWarning)
+                        record[prop] = _plain(getattr(elem, prop, None))
+                except Exception:
+                    record[prop] = None
+            elements.append(record)
+        return {"schema": SCHEMA_VERSION, "mendeleev_version": version, "elements": elements}
+
+    def _index(self, elements):
+        self.elements = elements
+        self.by_number = {e["number"]: e for e in elements}
+        self.by_symbol = {}
+        for e in elements:
+            self.by_symbol[e["symbol"].lower()] = e
+            if e.get("name"):
+                self.by_symbol[e["name"].lower()] = e
+        self.by_position = {(e["row"], e["col"]): e for e in elements}
+
+    def get(self, key):
+        """Look an element up by atomic number, symbol or name."""
+        if isinstance(key, int) or (isinstance(key, str) and key.isdigit()):
+            return self.by_number.get(int(key))
+        return self.by_symbol.get(str(key).strip().lower())
+
+    def at(self, row, col):
+        return self.by_position.get((row, col))
+
+    def property(self, key, property_name):
+        """The precomputed value, or None when the element or property is not in the table."""
+        record = self.get(key)
+        if record is None or property_name not in record:
+            return None
+        return record[property_name]
+
+    def layout(self):
+        """(symbol, row, column, group) for every element, as the periodic table widgets expect."""
+        return [(e["symbol"], e["row"], e["col"], e["group"]) for e in self.elements]
+
+
+@lru_cache(maxsize=1)
+def get_element_table():
+    """The process-wide element table, loaded on first use."""
+    return ElementTable()
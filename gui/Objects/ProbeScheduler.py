@@ -0,0 +1,180 @@
+import re
+import shutil
+import subprocess
+import sys
+from time import monotonic, perf_counter
+from config import loggers
+
+log = loggers['AGENTS']
+
+_unset = object()
+
+
+def user_idle_seconds():
+    """
+    Seconds since the last keyboard or mouse input, or None where it can't be told.
+
+    Windows asks the OS directly and macOS reads IOKit's HIDIdleTime. On Linux this
+    needs ``xprintidle`` (X11); without it, or under Wayland, idle back-off is off.
+    """
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            class LASTINPUTINFO(ctypes.Structure):
+                _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+            info = LASTINPUTINFO()
+            info.cbSize = ctypes.sizeof(info)
+            if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+                return None
+            return (ctypes.windll.kernel32.GetTickCount() - info.dwTime) / 1000.0
+        if sys.platform == "darwin":
+            output = subprocess.run(["ioreg", "-c", "IOHIDSystem", "-d", "4"], capture_output=True,
+                                    text=True, timeout=2).stdout
+            match = re.search(r'"HIDIdleTime" = (\d+)', output)
+            return int(match.group(1)) / 1e9 if match else None
+        if shutil.which("xprintidle"):
+            output = subprocess.run(["xprintidle"], capture_output=True, text=True, timeout=2).stdout
+            return int(output.strip()) / 1000.0
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+class Probe:
+    """
+    A periodic check whose cadence adapts to how often its result changes.
+
+    ``func`` returns a signature of what it observed, or ``None`` when it skipped
+    the expensive part of its work. While the signature stays the same the
+    interval grows by ``backoff`` up to ``max_interval``; a change resets it to
+    ``interval``. ``depends_on`` names other probes: such a probe only runs when
+    at least one of them has changed since its own last run.
+    """
+
+    def __init__(self, name, func, interval, max_interval=None, backoff=2.0, depends_on=(), idle_scale=True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.max_interval = max_interval or interval * 8
+        self.backoff = backoff
+        self.depends_on = tuple(depends_on)
+        self.idle_scale = idle_scale
+        self.current_interval = interval
+        self.next_run = 0.0
+        self.last_signature = _unset
+        self.changed_at = 0
+        self.invocations = 0
+        self.skips = 0
+        self.total_cost = 0.0
+        self.last_cost = 0.0
+
+    def record(self, signature, cost, tick):
+        self.invocations += 1
+        self.total_cost += cost
+        self.last_cost = cost
+        if signature is None:
+            return
+        if signature != self.last_signature:
+            self.last_signature = signature
+            self.changed_at = tick
+            self.current_interval = self.interval
+        else:
+            self.current_interval = min(self.current_interval * self.backoff, self.max_interval)
+
+    def stats(self):
+        return {
+            "invocations": self.invocations,
+            "skips": self.skips,
+            "interval": self.current_interval,
+            "last_cost": self.last_cost,
+            "avg_cost": self.total_cost / self.invocations if self.invocations else 0.0,
+        }
+
+
+class ProbeScheduler:
+    """
+    Runs independently scheduled :class:`Probe` objects on one thread.
+
+    ``idle_seconds`` returns how long the user has been idle (or ``None`` when
+    unknown); once it passes ``idle_after`` every idle-scaled probe waits
+    ``idle_factor`` times longer. ``clock`` and ``wait`` can be replaced to drive
+    the scheduler deterministically.
+    """
+
+    def __init__(self, probes=(), idle_seconds=None, idle_after=300, idle_factor=4.0,
+                 clock=monotonic, wait=None):
+        self.probes = {}
+        self.idle_seconds = idle_seconds
+        self.idle_after = idle_after
+        self.idle_factor = idle_factor
+        self.clock = clock
+        self._wait = wait
+        self._tick = 0
+        self._last_run_tick = {}
+        for probe in probes:
+            self.add(probe)
+
+    def add(self, probe):
+        self.probes[probe.name] = probe
+        self._last_run_tick[probe.name] = -1
+        return probe
+
+    def is_idle(self):
+        if self.idle_seconds is None:
+            return False
+        try:
+            idle = self.idle_seconds()
+        except Exception:
+            return False
+        return idle is not None and idle >= self.idle_after
+
+    def _dependencies_changed(self, probe):
+        last_run = self._last_run_tick[probe.name]
+        return any(self.probes[name].changed_at > last_run for name in probe.depends_on if name in self.probes)
+
+    def run_due(self):
+        """Run every probe that is due and return the names of those that ran."""
+        now = self.clock()
+        idle = self.is_idle()
+        ran = []
+        for probe in self.probes.values():
+            if now < probe.next_run:
+                continue
+            self._tick += 1
+            interval_scale = self.idle_factor if idle and probe.idle_scale else 1.0
+            if probe.depends_on and not self._dependencies_changed(probe):
+                probe.skips += 1
+                probe.next_run = now + probe.current_interval * interval_scale
+                continue
+            started = perf_counter()
+            try:
+                signature = probe.func()
+            except Exception as e:
+                log.error(f"[{probe.name}] {e}")
+                signature = None
+            probe.record(signature, perf_counter() - started, self._tick)
+            self._last_run_tick[probe.name] = self._tick
+            probe.next_run = now + probe.current_interval * interval_scale
+            ran.append(probe.name)
+        return ran
+
+    def seconds_until_next(self):
+        if not self.probes:
+            return None
+        return max(0.0, min(p.next_run for p in self.probes.values()) - self.clock())
+
+    def run(self, stop_event, report_every=600):
+        wait = self._wait or stop_event.wait
+        last_report = self.clock()
+        while not stop_event.is_set():
+            self.run_due()
+            if self.clock() - last_report >= report_every:
+                log.info(f"🧠 Probe stats: {self.stats()}")
+                last_report = self.clock()
+            timeout = self.seconds_until_next()
+            wait(1.0 if timeout is None else timeout)
+
+    def stats(self):
+        return {name: probe.stats() for name, probe in self.probes.items()}
@@ -0,0 +1,195 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from config import loggers
+
+log = loggers['GUI']
+
+DAY = 24 * 60 * 60
+
+# Local package lookups rarely change; agent and web answers go stale sooner.
+DEFAULT_TTLS = {"normal": 30 * DAY, "think": 7 * DAY, "deepsearch": 1 * DAY}
+
+
+@lru_cache(maxsize=None)
+def get_cache_connection(db_path):
+    """One SQLite connection per cache file, shared by every window in the process."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class QueryCache:
+    """
+    Cache of query results keyed by ``(query, mode)``.
+
+    Rows are looked up through a hash of the mode and query, so the unique index
+    stays narrow however long the queries are. Each mode has its own time to
+    live; expired rows are treated as misses and purged, and :meth:`purge_if_due`
+    sweeps the whole table at most once per ``purge_interval`` seconds. Least
+    recently used rows are evicted once the cache holds more than ``max_rows``
+    rows or ``max_bytes`` bytes of results.
+    """
+
+    def __init__(self, conn, ttls=None, max_rows=20000, max_bytes=64 * 1024 * 1024, lock=None,
+                 purge_interval=60 * 60):
+        self._conn = conn
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._lock = lock or threading.RLock()
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_cache (
+                    key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_query_cache_last_access ON query_cache (last_access)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_query_cache_mode_created ON query_cache (mode, created)")
+            self._migrate_legacy()
+            self._conn.commit()
+            self._rows, self._total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM query_cache"
+            ).fetchone()
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(query, mode):
+        return hashlib.sha256(f"{mode}\0{query}".encode("utf-8")).hexdigest()
+
+    def _migrate_legacy(self):
+        """Move rows from the old unbounded ``cache`` table, once."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cache'"
+        ).fetchone()
+        if not exists:
+            return
+        rows = self._conn.execute(
+            "SELECT query, mode, result, CAST(strftime('%s', timestamp) AS REAL) FROM cache"
+        ).fetchall()
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO query_cache (key, query, mode, result, size, created, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(self.make_key(q, m), q, m, str(r), len(str(r).encode("utf-8")), created or now, created or now)
+             for q, m, r, created in rows if q is not None and r is not None],
+        )
+        self._conn.execute("DROP TABLE cache")
+        log.info(f"Moved {len(rows)} cached queries to the indexed query cache.")
+
+    def _ttl(self, mode):
+        return self.ttls.get(mode, self.ttls["normal"])
+
+    def get(self, query, mode):
+        key = self.make_key(query, mode)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created, size FROM query_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            result, created, size = row
+            if now - created > self._ttl(mode):
+                self._delete(key, size)
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE query_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return result
+
+    def put(self, query, mode, result):
+        result = str(result)
+        key = self.make_key(query, mode)
+        size = len(result.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM query_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_cache (key, query, mode, result, size, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, query, mode, result, size, now, now),
+            )
+            if previous:
+                self._total_bytes += size - previous[0]
+            else:
+                self._rows += 1
+                self._total_bytes += size
+            self._evict()
+            self._conn.commit()
+
+    def _delete(self, key, size):
+        self._conn.execute("DELETE FROM query_cache WHERE key = ?", (key,))
+        self._rows -= 1
+        self._total_bytes -= size
+
+    def _evict(self):
+        """Drop least recently used rows until the cache fits both budgets."""
+        while self._rows > self.max_rows or self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM query_cache ORDER BY last_access LIMIT 256"
+            ).fetchall()
+            if not rows:
+                self._rows, self._total_bytes = 0, 0
+                break
+            for key, size in rows:
+                if self._rows <= self.max_rows and self._total_bytes <= self.max_bytes:
+                    break
+                self._delete(key, size)
+
+    def purge_expired(self):
+        """Delete every row past its mode's time to live; returns how many were removed."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            self._next_purge = time.monotonic() + self.purge_interval
+            modes = [m for (m,) in self._conn.execute("SELECT DISTINCT mode FROM query_cache")]
+            for mode in modes:
+                cutoff = now - self._ttl(mode)
+                count, size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM query_cache WHERE mode = ? AND created < ?",
+                    (mode, cutoff),
+                ).fetchone()
+                if count:
+                    self._conn.execute("DELETE FROM query_cache WHERE mode = ? AND created < ?", (mode, cutoff))
+                    self._rows -= count
+                    self._total_bytes -= size
+                    removed += count
+            self._conn.commit()
+        if removed:
+            log.info(f"Purged {removed} expired cached queries.")
+        return removed
+
+    def purge_if_due(self):
+        """Run :meth:`purge_expired` unless it ran within the last ``purge_interval`` seconds."""
+        if time.monotonic() < self._next_purge:
+            return 0
+        return self.purge_expired()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM query_cache")
+            self._conn.commit()
+            self._rows, self._total_bytes = 0, 0
+
+    def stats(self):
+        return {"rows": self._rows, "bytes": self._total_bytes}
+
+
+@lru_cache(maxsize=None)
+def get_query_cache(db_path):
+    """One QueryCache per cache file, so every window shares its lock and row counts."""
+    return QueryCache(get_cache_connection(db_path))
@@ -17,11 +17,12 @@ class SpeechRecognitionWorker(QObject):
     transcription_signal = pyqtSignal(str)
     error_signal = pyqtSignal(str)
 
-    def __init__(self, recognizer, microphone, stop_event, sample_rate=16000, vad_mode=3):
+    def __init__(self, recognizer, microphone, stop_event, sample_rate=16000, vad_mode=3, audio_hub=None):
         super().__init__()
         self.recognizer = recognizer
         self.microphone = microphone
         self.stop_event = stop_event
+        self.audio_hub = audio_hub
         self.vad = webrtcvad.Vad()
         self.vad.set_mode(vad_mode)
         self.sample_rate = sample_rate
@@ -37,21 +38,34 @@ class SpeechRecognitionWorker(QObject):
         except Exception as e:
             self.error_signal.emit(f"⚠️ Error: {str(e)}")
 
+    def process_frame(self, frame):
+        self.ring_buffer.append(frame)
+        if self.vad.is_speech(frame, self.sample_rate):
+            if not self.is_speech_active:
+                self.is_speech_active = True
+                self.speech_start_time = time.time()
+                self.listen_signal.emit("🎙️ Listening...")
+        elif self.is_speech_active and time.time() - self.speech_start_time > 1.0:
+            self.is_speech_active = False
+            audio_data = b''.join(self.ring_buffer)
+            self.recognize(audio_data)
+
     def run(self):
+        if self.audio_hub is not None and self.audio_hub.sample_rate == self.sample_rate:
+            subscription = self.audio_hub.subscribe("speech")
+            try:
+                while not self.stop_event.is_set():
+                    frame = subscription.read(320, timeout=0.5)
+                    if frame is not None:
+                        self.process_frame(frame)
+            finally:
+                subscription.close()
+            return
         p = pyaudio.PyAudio()
         stream = p.open(format=pyaudio.paInt16, channels=1, rate=self.sample_rate, input=True, frames_per_buffer=320)
         while not self.stop_event.is_set():
             frame = stream.read(320, exception_on_overflow=False)
-            self.ring_buffer.append(frame)
-            if self.vad.is_speech(frame, self.sample_rate):
-                if not self.is_speech_active:
-                    self.is_speech_active = True
-                    self.speech_start_time = time.time()
-                    self.listen_signal.emit("🎙️ Listening...")
-            elif self.is_speech_active and time.time() - self.speech_start_time > 1.0:
-                self.is_speech_active = False
-                audio_data = b''.join(self.ring_buffer)
-                self.recognize(audio_data)
+            self.process_frame(frame)
         stream.stop_stream()
         stream.close()
-        p.terminate()
\ No newline at end of file
+        p.terminate()
@@ -1,74 +1,191 @@
 from PyQt5.QtCore import QObject, pyqtSignal
-from queue import Queue
+from queue import Queue, Empty, Full
 from config import loggers, stop_event
 from sounddevice import play, wait, stop
 from torch.cuda import is_available
+from jarvis_integration.audio.tts_providers.BaseTTS import warm_up_sentiment_pipeline
+import threading
 import re
 log = loggers['AUDIO']
 
+emoji_pattern = re.compile("["
+                           u"\U0001F600-\U0001F64F"  # emoticons
+                           u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+                           u"\U0001F680-\U0001F6FF"  # transport & map symbols
+                           u"\U0001F700-\U0001F77F"  # alchemical symbols
+                           u"\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
+                           u"\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
+                           u"\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
+                           u"\U0001FA00-\U0001FA6F"  # Chess Symbols
+                           u"\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
+                           u"\U00002702-\U000027B0"  # Dingbats
+                           u"\U000024C2-\U0001F251"  # Enclosed characters
+                           "]+", flags=re.UNICODE)
+
+
+def clean_text(text: str) -> str:
+    """Strip characters the TTS engines cannot pronounce."""
+    return emoji_pattern.sub(r'', text).strip()
 
 
 class TTSWorker(QObject):
+    """
+    Two-stage speech worker.
+
+    A synthesis thread cleans and synthesizes queued text up to ``prefetch_depth``
+    segments ahead, while ``run`` plays the synthesized audio in order. Calling
+    :meth:`interrupt` (or setting ``stop_event``) stops playback and drops
+    everything still queued.
+    """
     finished_signal = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, tts_engine=None, player=None, prefetch_depth=2):
         super().__init__()
         self.text_queue = Queue()
-        try:
-            if is_available():
-                from jarvis_integration.audio.tts_providers.indic_parler_tts import Indic_Parler_TTS,download_parlertts
-                download_parlertts()
-                self.tts_engine = Indic_Parler_TTS()
-                log.info("🔊 Using Indic Parler TTS (CUDA available).")
-                print("🔊 Using Indic Parler TTS (CUDA available).")
-        except Exception as e:
-            log.error(f"TTS initialization error: {e}")
-            self.tts_engine = None
+        self.audio_queue = Queue(maxsize=max(1, prefetch_depth))
+        self.player = player or self._play
+        self._generation = 0
+        self._playing = False
+        self._lock = threading.Lock()
+        self.tts_engine = tts_engine
+        if tts_engine is None:
+            try:
+                if is_available():
+                    from jarvis_integration.audio.tts_providers.indic_parler_tts import Indic_Parler_TTS,download_parlertts
+                    download_parlertts()
+                    self.tts_engine = Indic_Parler_TTS()
+                    self.tts_engine.prewarm()
+                    if self.tts_engine.sentiment_analysis_enabled:
+                        warm_up_sentiment_pipeline()
+                    log.info("🔊 Using Indic Parler TTS (CUDA available).")
+                    print("🔊 Using Indic Parler TTS (CUDA available).")
+            except Exception as e:
+                log.error(f"TTS initialization error: {e}")
+                self.tts_engine = None
+
     def set_text(self, text: str):
         if text:
-            self.text_queue.put(text)
+            self.text_queue.put((self._generation, text))
 
-    def run(self):
-        while not self.text_queue.empty():
-            if stop_event.is_set():
-                stop()
-                log.info("🛑 Speech interrupted.")
-                stop_event.clear()
-                break
+    def interrupt(self):
+        """Stop the current utterance and drop all queued and pre-synthesized speech."""
+        with self._lock:
+            self._generation += 1
+            for pending in (self.text_queue, self.audio_queue):
+                while True:
+                    try:
+                        pending.get_nowait()
+                    except Empty:
+                        break
+        stop()
+        log.info("🛑 Speech interrupted.")
+
+    def _is_current(self, generation):
+        return generation == self._generation
 
+    def _synthesize(self, text):
+        """
+        ``(audio, sample_rate)`` per sentence of ``text``. Engines built on
+        BaseText2Speech synthesize the next sentence while this one is queued for
+        playback; closing the iterator stops them.
+        """
+        if hasattr(self.tts_engine, "iter_synthesize"):
+            return self.tts_engine.iter_synthesize(text, max_buffered=1)
+        return iter([self.tts_engine.run(text)])
+
+    def _put_audio(self, item):
+        """Block until the player has room, giving up if the item was interrupted."""
+        while self._is_current(item[0]):
             try:
-                current_text = self.text_queue.get()
+                self.audio_queue.put(item, timeout=0.05)
+                return
+            except Full:
+                continue
+
+    def _synthesis_loop(self, done):
+        try:
+            while True:
+                try:
+                    generation, text = self.text_queue.get(timeout=0.05)
+                except Empty:
+                    if not self._playing and self.audio_queue.empty() and self.text_queue.empty():
+                        return
+                    continue
+                if not self._is_current(generation):
+                    continue
+                current_text = clean_text(text)
+                if not current_text:
+                    continue
                 log.info(f"🗣️ Speaking: {current_text}")
-                print(f"🗣️ Speaking: {current_text}")
-                emoji_pattern = re.compile("["
-                                           u"\U0001F600-\U0001F64F"  # emoticons
-                                           u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-                                           u"\U0001F680-\U0001F6FF"  # transport & map symbols
-                                           u"\U0001F700-\U0001F77F"  # alchemical symbols
-                                           u"\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
-                                           u"\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
-                                           u"\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-                                           u"\U0001FA00-\U0001FA6F"  # Chess Symbols
-                                           u"\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-                                           u"\U00002702-\U000027B0"  # Dingbats
-                                           u"\U000024C2-\U0001F251"  # Enclosed characters
-                                           "]+", flags=re.UNICODE)
-                current_text=emoji_pattern.sub(r'',current_text)
-                if is_available():
-                    from jarvis_integration.audio.tts_providers.indic_parler_tts import Indic_Parler_TTS
-                    print("Using transformers...")
-                    audio, sample_rate = self.tts_engine.run(current_text)
-                    play(audio, sample_rate)
-                    wait(ignore_errors=True)
-                    stop()
-                else:
-                    import pyttsx4
-                    self.tts_engine = pyttsx4.init()
-                    self.tts_engine.say(current_text)
-                    self.tts_engine.runAndWait()
+                if self.tts_engine is None:
+                    self._put_audio((generation, "speech", current_text))
+                    continue
+                segments = None
+                try:
+                    segments = self._synthesize(current_text)
+                    for audio, sample_rate in segments:
+                        if not self._is_current(generation):
+                            break
+                        self._put_audio((generation, "audio", (audio, sample_rate)))
+                except Exception as e:
+                    log.error(f"❌ TTS Error: {e}")
+                finally:
+                    if hasattr(segments, "close"):
+                        segments.close()
+        finally:
+            done.set()
 
-            except Exception as e:
-                log.error(f"❌ TTS Error: {e}")
-                break
+    def _play(self, audio, sample_rate):
+        play(audio, sample_rate)
+        wait(ignore_errors=True)
+        stop()
 
+    def _speak(self, text):
+        import pyttsx4
+        engine = pyttsx4.init()
+        engine.say(text)
+        engine.runAndWait()
+
+    def _start_synthesis(self):
+        done = threading.Event()
+        threading.Thread(target=self._synthesis_loop, args=(done,),
+                         name="tts-synthesis", daemon=True).start()
+        return done
+
+    def run(self):
+        self._playing = True
+        synthesis_done = self._start_synthesis()
+        try:
+            while True:
+                if stop_event.is_set():
+                    self.interrupt()
+                    stop_event.clear()
+                    break
+                try:
+                    generation, kind, payload = self.audio_queue.get(timeout=0.05)
+                except Empty:
+                    if synthesis_done.is_set() and self.audio_queue.empty():
+                        if self.text_queue.empty():
+                            break
+                        # Text arrived just as the synthesis thread wound down.
+                        synthesis_done = self._start_synthesis()
+                        continue
+                    # Let the synthesis thread finish once nothing is left to play.
+                    self._playing = not self.text_queue.empty()
+                    continue
+                if not self._is_current(generation):
+                    continue
+                self._playing = True
+                try:
+                    if kind == "speech":
+                        self._speak(payload)
+                    else:
+                        self.player(*payload)
+                except Exception as e:
+                    log.error(f"❌ TTS Error: {e}")
+                    self.interrupt()
+                    break
+        finally:
+            self._playing = False
+            synthesis_done.wait(timeout=1)
         self.finished_signal.emit()
@@ -9,17 +9,21 @@ class WakeWordWorker(QObject):
     wake_word_detected = pyqtSignal()
     error_signal = pyqtSignal(str)
 
-    def __init__(self, porcupine, audio_stream, stop_event):
+    def __init__(self, porcupine, audio_hub, stop_event):
         super().__init__()
         self.porcupine = porcupine
-        self.audio_stream = audio_stream
+        self.audio_hub = audio_hub
         self.stop_event = stop_event
+        self.subscription = None
 
     def run(self):
         try:
             log.info("Listening for wake word...")
+            self.subscription = self.audio_hub.subscribe("wakeword")
             while not self.stop_event.is_set():
-                pcm = self.audio_stream.read(self.porcupine.frame_length, exception_on_overflow=False)
+                pcm = self.subscription.read(self.porcupine.frame_length, timeout=0.5)
+                if pcm is None:
+                    continue
                 pcm = struct.unpack("h" * self.porcupine.frame_length, pcm)
                 result = self.porcupine.process(pcm)
                 if result >= 0:
@@ -30,9 +34,9 @@ class WakeWordWorker(QObject):
             self.cleanup()
 
     def cleanup(self):
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
         if self.porcupine:
             self.porcupine.delete()
-        if self.audio_stream:
-            self.audio_stream.stop_stream()
-            self.audio_stream.close()
-
+            self.porcupine = None
@@ -21,8 +21,10 @@ import requests
 import git
 import yaml
 import inspect
+import threading
 import traceback
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from PyQt5.QtWidgets import (
     QDialog, QHBoxLayout, QVBoxLayout, QListWidget, QStackedWidget,
@@ -44,6 +46,101 @@ logger = loggers['COMPONENT_HUB']
 COMPONENTS_DIR = os.path.join(JARVIS_DIR,"data", "components")
 CONFIG_FILE = os.path.join(JARVIS_DIR, "data","component_hub.json")
 UPDATE_CHECK_INTERVAL = 24 * 60 * 60 * 1000  # 24 hours in milliseconds
+UPDATE_CACHE_FILE = os.path.join(JARVIS_DIR, "data", "component_updates.json")
+# Overridable so update checks can run against a GitHub Enterprise host or a local stub.
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+UPDATE_CHECK_WORKERS = int(os.getenv("COMPONENT_UPDATE_WORKERS", "8"))
+
+
+class UpdateChecker:
+    """
+    Looks up the latest commit of many component repositories at once.
+
+    Requests run on a bounded thread pool and are conditional: the ETag and
+    Last-Modified of each repository's last answer are kept in ``cache_path``,
+    so unchanged repositories come back as 304 Not Modified (which GitHub does
+    not count against the rate limit) and reuse the cached commit.
+    """
+
+    def __init__(self, base_url=None, auth_token=None, cache_path=UPDATE_CACHE_FILE,
+                 max_workers=UPDATE_CHECK_WORKERS, timeout=5):
+        self.base_url = (base_url or GITHUB_API_URL).rstrip("/")
+        self.auth_token = auth_token if auth_token is not None else os.getenv("GITHUB_TOKEN", "")
+        self.cache_path = cache_path
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.cache = self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to save update cache: {e}")
+
+    def _session(self):
+        # requests sessions are not thread-safe; keep one per pool thread for connection reuse.
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def latest_commit(self, repo_name):
+        """Return the latest commit sha on main, or None if it could not be determined."""
+        url = f"{self.base_url}/repos/{repo_name}/commits/main"
+        headers = {}
+        if self.auth_token:
+            headers["Authorization"] = f"token {self.auth_token}"
+        with self._lock:
+            cached = dict(self.cache.get(url, {}))
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._session().get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached.get("sha"):
+            return cached["sha"]
+        if response.status_code != 200:
+            logger.warning(f"Update check for {repo_name} returned {response.status_code}")
+            return None
+        sha = response.json()["sha"]
+        with self._lock:
+            self.cache[url] = {
+                "sha": sha,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        return sha
+
+    def check(self, components):
+        """Map component name to the latest commit for every component with a repo."""
+        def lookup(component):
+            try:
+                return component["name"], self.latest_commit(component["repo"])
+            except Exception as e:
+                logger.warning(f"Failed to check update for {component['name']}: {e}")
+                return component["name"], None
+
+        components = [c for c in components if c.get("repo")]
+        if not components:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(components))) as pool:
+            results = dict(pool.map(lookup, components))
+        self._save_cache()
+        return results
 
 
 class ConfigureComponentDialog(QDialog):
@@ -163,7 +260,7 @@ class RepoDownloadDialog(QDialog):
                 headers = {}
                 if self.auth_token.text().strip():
                     headers["Authorization"] = f"token {self.auth_token.text().strip()}"
-                response = requests.get(f"https://api.github.com/repos/{repo_name}", headers=headers, timeout=5)
+                response = requests.get(f"{GITHUB_API_URL}/repos/{repo_name}", headers=headers, timeout=5)
                 if response.status_code == 200:
                     return True
                 logger.warning(f"Repository validation failed (attempt {attempt + 1}): {response.status_code}")
@@ -285,6 +382,7 @@ class RepoDownloadDialog(QDialog):
 class ComponentHub(QDialog):
     """Centralized hub for managing community-developed components in the virtual assistant."""
     update_available = pyqtSignal(list)  # Signal for update notifications
+    updates_checked = pyqtSignal(dict)  # Latest commits, delivered back on the GUI thread
     speech_provider_added = pyqtSignal(str)  # Signal for new speech providers
 
     def __init__(self, parent=None, user_id=None, alert_checker=None):
@@ -295,6 +393,9 @@ class ComponentHub(QDialog):
         self.alert_checker = alert_checker
         self.config = self.load_config()
         self.pending_updates = []
+        self.update_checker = UpdateChecker()
+        self._update_thread = None
+        self.updates_checked.connect(self.apply_update_results)
         logger.info(f"Initializing ComponentHub for user_id: {self.user_id}")
 
         self.update_timer = QTimer(self)
@@ -383,6 +484,7 @@ class ComponentHub(QDialog):
         """Scan COMPONENTS_DIR for installed components."""
         try:
             os.makedirs(COMPONENTS_DIR, exist_ok=True)
+            installed_names = {c["name"] for c in self.config["installed_components"]}
             for category in ["speech", "alert", "other"]:
                 category_dir = os.path.join(COMPONENTS_DIR, category)
                 if not os.path.exists(category_dir):
@@ -393,8 +495,8 @@ class ComponentHub(QDialog):
                             with open(os.path.join(category_dir, file), 'r') as f:
                                 data = json.load(f)
                             component_name = data.get("repo", "").split('/')[-1]
-                            if component_name and component_name not in [c["name"] for c in
-                                                                         self.config["installed_components"]]:
+                            if component_name and component_name not in installed_names:
+                                installed_names.add(component_name)
                                 self.config["installed_components"].append({
                                     "name": component_name,
                                     "type": data["type"],
@@ -412,31 +514,34 @@ class ComponentHub(QDialog):
             logger.error(f"Failed to scan components: {e}\n{traceback.format_exc()}")
 
     def check_updates(self):
-        """Check for updates to installed components."""
-        self.pending_updates = []
+        """Check for updates to installed components without blocking the UI."""
+        if self._update_thread is not None and self._update_thread.is_alive():
+            return
+        components = [dict(c) for c in self.config["installed_components"]]
+        self._update_thread = threading.Thread(target=self._fetch_updates, args=(components,),
+                                               name="component-update-check", daemon=True)
+        self._update_thread.start()
+
+    def _fetch_updates(self, components):
         try:
-            headers = {}
-            auth_token = os.getenv("GITHUB_TOKEN", "")
-            if auth_token:
-                headers["Authorization"] = f"token {auth_token}"
+            started = time.perf_counter()
+            latest = self.update_checker.check(components)
+            logger.info(f"Checked {len(latest)} components for updates in {time.perf_counter() - started:.2f}s")
+            self.updates_checked.emit(latest)
+        except Exception as e:
+            logger.error(f"Update check failed: {e}\n{traceback.format_exc()}")
 
+    def apply_update_results(self, latest):
+        """Record components whose installed commit differs from the latest one."""
+        try:
+            self.pending_updates = []
             for component in self.config["installed_components"]:
-                repo_name = component.get("repo", "")
-                if not repo_name:
-                    continue
-                try:
-                    response = requests.get(f"https://api.github.com/repos/{repo_name}/commits/main",
-                                            headers=headers, timeout=5)
-                    if response.status_code == 200:
-                        latest_commit = response.json()["sha"]
-                        current_commit = component.get("commit_hash", "")
-                        if latest_commit != current_commit:
-                            self.pending_updates.append(component["name"])
-                            logger.info(f"Update available for {component['name']}: {latest_commit}")
-                            if self.alert_checker:
-                                self.update_available.emit([f"Update available for component {component['name']}"])
-                except Exception as e:
-                    logger.warning(f"Failed to check update for {component['name']}: {e}")
+                latest_commit = latest.get(component["name"])
+                if latest_commit and latest_commit != component.get("commit_hash", ""):
+                    self.pending_updates.append(component["name"])
+                    logger.info(f"Update available for {component['name']}: {latest_commit}")
+                    if self.alert_checker:
+                        self.update_available.emit([f"Update available for component {component['name']}"])
 
             installed_item = self.sidebar.item(0)
             installed_item.setText(
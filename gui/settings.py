@@ -36,6 +36,7 @@ class ClickableLabel(QLabel):
 
 class AndroidSettingsDialog(QDialog):
     """A QDialog with multiple pages mimicking Android settings."""
+    settings_changed = pyqtSignal()  # Emitted after models, connections, memory or agents are saved
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -732,6 +733,7 @@ class AndroidSettingsDialog(QDialog):
                 setting_value=config
             )
 
+        self.settings_changed.emit()
         QMessageBox.information(self, "Saved", "Memory configuration saved successfully!")
 
     def clear_memory_action(self):
@@ -740,6 +742,7 @@ class AndroidSettingsDialog(QDialog):
             memory_settings = MemorySettings()
             memory_settings._initialize_memory()
             memory_settings.clear_memory()
+            self.settings_changed.emit()
             QMessageBox.information(self, "Memory Cleared", "All memory data has been cleared successfully!")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to clear memory: {e}")
@@ -889,6 +892,7 @@ class AndroidSettingsDialog(QDialog):
                 setting_value=model_config
             )
 
+        self.settings_changed.emit()
         QMessageBox.information(self, "LLM", "Model selected successfully!")
 
     def create_vision_model_page(self):
@@ -983,6 +987,7 @@ class AndroidSettingsDialog(QDialog):
                 setting_value=model_config
             )
 
+        self.settings_changed.emit()
         QMessageBox.information(self, "Vision LLM", "Model selected successfully!")
 
     def create_huggingface_page(self):
@@ -1051,6 +1056,7 @@ class AndroidSettingsDialog(QDialog):
                 setting_value=config
             )
 
+        self.settings_changed.emit()
         QMessageBox.information(self, "HuggingFace", "API Key saved successfully!")
 
     def fetch_url(self, url, key):
@@ -1278,6 +1284,7 @@ class AndroidSettingsDialog(QDialog):
                 if widget:
                     widget.deleteLater()
 
+            self.settings_changed.emit()
             QMessageBox.information(self, "Success", f"Connection for {base_url} removed successfully!")
         except Exception as e:
             logger.error(f"Error removing connection: {e}")
@@ -1314,6 +1321,7 @@ class AndroidSettingsDialog(QDialog):
                     setting_key="openai",
                     setting_value=connections
                 )
+            self.settings_changed.emit()
             QMessageBox.information(self, "Success", "All connections saved successfully!")
         except Exception as e:
             logger.error(f"Error saving connections: {e}")
@@ -1453,6 +1461,7 @@ class AndroidSettingsDialog(QDialog):
             Agent.insert_new_agent(id=id, name=name, description=description, file=datas)
             self.add_agent_row(name, description, editable=True, id=id)
             dialog.accept()
+            self.settings_changed.emit()
             QMessageBox.information(self, "Saved", f"Agent '{name}' has been saved successfully!")
         except Exception as e:
             logger.error(f"Error saving agent: {e}")
@@ -1466,6 +1475,7 @@ class AndroidSettingsDialog(QDialog):
             Agent.delete_agent_by_id(id)
             if os.path.exists(agent_path):
                 os.remove(agent_path)
+            self.settings_changed.emit()
             QMessageBox.information(self, "Delete Agent", "Deleted Successfully!")
             self.refresh_agents_list()
         except Exception as e:
@@ -1541,6 +1551,7 @@ class AndroidSettingsDialog(QDialog):
                 }
             )
             if success:
+                self.settings_changed.emit()
                 QMessageBox.information(self, "Success", f"Agent '{name}' has been updated successfully!")
                 dialog.accept()
                 self.refresh_agents_list()
@@ -1,12 +1,17 @@
 import asyncio
+import base64
+import binascii
+import copy
 import json
 import os
+import queue
 import shutil
 import socket
 import threading
 import time
 import traceback
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
@@ -15,8 +20,7 @@ from pydantic import BaseModel
 from starlette.websockets import WebSocketState
 
 from .core import OpenInterpreter
-
-last_start_time = 0
+from .utils.streaming_message import StreamingMessage
 
 try:
     import janus
@@ -40,15 +44,295 @@ except:
 
 complete_message = {"role": "server", "type": "status", "content": "complete"}
 
+# Streamed text chunks with nothing but these keys can be merged into one frame
+MERGEABLE_KEYS = {"role", "type", "format", "content"}
+
+
+def _mergeable(chunk):
+    return (
+        isinstance(chunk, dict)
+        and isinstance(chunk.get("content"), str)
+        and chunk.get("type") in ("message", "code", "console")
+        and chunk.get("format") != "active_line"
+        and chunk.keys() <= MERGEABLE_KEYS
+    )
+
+
+def _same_stream(chunk, next_chunk):
+    return _mergeable(next_chunk) and all(
+        chunk.get(key) == next_chunk.get(key) for key in ("role", "type", "format")
+    )
+
+
+def binary_frames(chunk):
+    """
+    A base64 image or audio chunk as a start chunk, its raw bytes and an end chunk,
+    the same shape clients use to stream audio in (format "bytes.wav" and so on).
+    Any other chunk is returned as is.
+    """
+    if not (
+        isinstance(chunk, dict)
+        and isinstance(chunk.get("content"), str)
+        and str(chunk.get("format", "")).startswith("base64")
+    ):
+        return [chunk]
+    try:
+        data = base64.b64decode(chunk["content"], validate=True)
+    except (binascii.Error, ValueError):
+        return [chunk]
+    header = {
+        key: value for key, value in chunk.items() if key not in ("content", "id")
+    }
+    header["format"] = "bytes" + chunk["format"][len("base64") :]
+    return [dict(header, start=True), data, dict(header, end=True)]
+
+
+class SessionLimitError(Exception):
+    """Raised when the server can't take on another session or response right now."""
+
+
+# Per-conversation state a new session must not inherit from the server's interpreter
+SESSION_STATE = {
+    "messages",
+    "responding",
+    "last_messages_count",
+    "conversation_filename",
+    "_conversation_journal",
+    "id",
+    "session_id",
+    "acknowledged_outputs",
+    "context_mode",
+    "last_start_time",
+    "last_active",
+    "connections",
+}
+
+
+def _settings(obj, exclude=()):
+    """
+    Copies of an object's JSON-serializable attributes, like `Computer.to_dict`.
+    """
+    settings = {}
+    for key, value in vars(obj).items():
+        if key in exclude:
+            continue
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        settings[key] = copy.deepcopy(value)
+    return settings
+
+
+class SessionManager:
+    """
+    The sessions an AsyncInterpreter serves, and the worker threads that run them.
+
+    A client that connects with a session id (a `session_id` query parameter or an
+    `X-Session-ID` header) gets its own interpreter: its own messages, LLM, computer
+    and output queue, configured like the server's interpreter when the session
+    starts. Clients without one share the server's interpreter, as before.
+
+    Responses from every session run on one bounded pool of worker threads. Past
+    `max_sessions` new sessions are refused, and past `max_pending` queued or running
+    responses new requests get a busy error rather than waiting behind the others.
+    Output queues are bounded, so a client that stops reading only holds up its own
+    session. Sessions nobody is connected to are closed after `idle_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        interpreter,
+        max_sessions=None,
+        max_workers=None,
+        max_pending=None,
+        idle_timeout=None,
+    ):
+        self.interpreter = interpreter
+        self.max_sessions = max_sessions or int(
+            os.getenv("INTERPRETER_MAX_SESSIONS", 32)
+        )
+        self.max_workers = max_workers or int(os.getenv("INTERPRETER_MAX_WORKERS", 8))
+        self.max_pending = max_pending or int(
+            os.getenv("INTERPRETER_MAX_PENDING", self.max_workers * 4)
+        )
+        self.idle_timeout = idle_timeout or float(
+            os.getenv("INTERPRETER_SESSION_TIMEOUT", 3600)
+        )
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="interpreter-worker"
+        )
+        self.sessions = {}
+        self._creating = {}  # Session id -> future of the session being built
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def connect(self, session_id=None):
+        """
+        The interpreter for a new connection: the session with this id (created the
+        first time it's seen), or the server's own interpreter if there's no id.
+
+        Sessions are built and idle ones torn down on the worker pool, so starting
+        or ending one never blocks the event loop. The lock only guards the
+        bookkeeping.
+        """
+        if not session_id:
+            return self.interpreter
+
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.connections += 1
+                session.last_active = time.time()
+                return session
+
+            self._close_idle()
+            # Connections with the same id that arrive meanwhile wait on the same build
+            creating = self._creating.get(session_id)
+            if creating is None:
+                if len(self.sessions) + len(self._creating) >= self.max_sessions:
+                    raise SessionLimitError(
+                        f"The server is at its limit of {self.max_sessions} sessions. Try again later."
+                    )
+                creating = self.executor.submit(self._create, session_id)
+                self._creating[session_id] = creating
+
+        session = await asyncio.wrap_future(creating)
+        with self._lock:
+            session.connections += 1
+            session.last_active = time.time()
+        return session
+
+    def disconnect(self, session):
+        if session is self.interpreter:
+            return
+        with self._lock:
+            session.connections -= 1
+            session.last_active = time.time()
+
+    def interpreters(self):
+        """The server's interpreter followed by every open session."""
+        with self._lock:
+            return [self.interpreter] + list(self.sessions.values())
+
+    def _create(self, session_id):
+        """
+        Build a session configured like the server's interpreter and register it.
+        Runs on the worker pool.
+        """
+        try:
+            session = AsyncInterpreter(sessions=self)
+            session.session_id = session_id
+
+            base = self.interpreter
+            for key, value in _settings(base, exclude=SESSION_STATE).items():
+                setattr(session, key, value)
+            for key, value in _settings(
+                base.llm, exclude={"_conversion_cache"}
+            ).items():
+                setattr(session.llm, key, value)
+            session.llm.completions = base.llm.completions
+            session.computer.load_dict(
+                {
+                    key: copy.deepcopy(value)
+                    for key, value in base.computer.to_dict().items()
+                    # The session's computer has its own, fresh, language processes
+                    if not key.startswith("_has_")
+                }
+            )
+        except:
+            with self._lock:
+                del self._creating[session_id]
+            raise
+        # Registered here rather than by the connection that asked for it, so the
+        # session isn't lost if that connection goes away while it's being built
+        with self._lock:
+            del self._creating[session_id]
+            self.sessions[session_id] = session
+        return session
+
+    def _close_idle(self):
+        """Drop idle sessions (call with the lock held); they're terminated on the pool."""
+        now = time.time()
+        for session_id, session in list(self.sessions.items()):
+            if (
+                session.connections == 0
+                and not session.is_responding()
+                and now - session.last_active > self.idle_timeout
+            ):
+                del self.sessions[session_id]
+                self.executor.submit(session.computer.terminate)
+
+    def close(self, session_id):
+        """End a session, stopping its response and its language processes."""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is not None:
+            session.stop_event.set()
+            session.computer.terminate()
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Run `function` on the worker pool. Raises SessionLimitError if `max_pending`
+        calls are already queued or running.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise SessionLimitError(
+                    "The server is busy with other sessions. Try again shortly."
+                )
+            self._pending += 1
+        try:
+            future = self.executor.submit(function, *args, **kwargs)
+        except:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def has_capacity(self):
+        with self._lock:
+            return self._pending < self.max_pending
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self.sessions),
+                "pending": self._pending,
+                "max_sessions": self.max_sessions,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.stop_event.set()
+            session.computer.terminate()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 
 class AsyncInterpreter(OpenInterpreter):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, sessions=None, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.respond_thread = None
+        self.respond_future = None
         self.stop_event = threading.Event()
         self.output_queue = None
+        self.output_queue_size = int(os.getenv("INTERPRETER_OUTPUT_QUEUE_SIZE", 1000))
         self.unsent_messages = deque()
+        self._held_outputs = deque()  # Taken from the queue by batching, not yet sent
+
+        # Output micro-batching, see output_batch()
+        self.batch_bytes = int(os.getenv("INTERPRETER_BATCH_BYTES", 16384))
+        self.batch_ms = float(os.getenv("INTERPRETER_BATCH_MS", 0))
         self.id = os.getenv("INTERPRETER_ID", datetime.now().timestamp())
         self.print = False  # Will print output
 
@@ -57,10 +341,20 @@ class AsyncInterpreter(OpenInterpreter):
         )
         self.acknowledged_outputs = []
 
-        self.server = Server(self)
+        # Sessions are AsyncInterpreters too, sharing the server's worker pool
+        self.session_id = None
+        self.connections = 0
+        self.last_active = time.time()
+        if sessions is None:
+            self.sessions = SessionManager(self)
+            self.server = Server(self)
+        else:
+            self.sessions = sessions
+            self.server = sessions.interpreter.server
 
         # For the 01. This lets the OAI compatible server accumulate context before responding.
         self.context_mode = False
+        self.last_start_time = 0
 
     async def input(self, chunk):
         """
@@ -70,9 +364,7 @@ class AsyncInterpreter(OpenInterpreter):
 
         if "start" in chunk:
             # If the user is starting something, the interpreter should stop.
-            if self.respond_thread is not None and self.respond_thread.is_alive():
-                self.stop_event.set()
-                self.respond_thread.join()
+            await self.stop_responding()
             self.accumulate(chunk)
         elif "content" in chunk:
             self.accumulate(chunk)
@@ -88,24 +380,141 @@ class AsyncInterpreter(OpenInterpreter):
 
                 if command == "stop":
                     # Any start flag would have stopped it a moment ago, but to be sure:
-                    self.stop_event.set()
-                    self.respond_thread.join()
+                    await self.stop_responding()
                     return
                 if command == "go":
                     # This is to approve code.
                     run_code = True
                     pass
 
+            self._get_output_queue()  # respond() writes to it from a worker thread
             self.stop_event.clear()
-            self.respond_thread = threading.Thread(
-                target=self.respond, args=(run_code,)
-            )
-            self.respond_thread.start()
+            try:
+                self.respond_future = self.sessions.submit(self.respond, run_code)
+            except SessionLimitError as e:
+                await self.output_queue.async_q.put(
+                    {"role": "server", "type": "error", "content": str(e)}
+                )
+                await self.output_queue.async_q.put(complete_message)
 
-    async def output(self):
+    def is_responding(self):
+        return self.respond_future is not None and not self.respond_future.done()
+
+    async def stop_responding(self):
+        """Stop the current response, if any, and wait for its worker to let go."""
+        future = self.respond_future
+        if future is None or future.done():
+            return
+        self.stop_event.set()
+        if future.cancel():  # It hadn't started yet
+            return
+        try:
+            await asyncio.wrap_future(future)
+        except Exception:
+            pass
+
+    def _get_output_queue(self):
         if self.output_queue == None:
-            self.output_queue = janus.Queue()
-        return await self.output_queue.async_q.get()
+            self.output_queue = janus.Queue(maxsize=self.output_queue_size)
+        return self.output_queue
+
+    def _put_output(self, chunk):
+        """
+        Queue a chunk for the client. While the queue is full this waits (back-pressure
+        on a slow client), unless the response is stopped; then it returns False.
+        """
+        while True:
+            try:
+                self.output_queue.sync_q.put(chunk, timeout=0.5)
+                return True
+            except queue.Full:
+                if self.stop_event.is_set():
+                    return False
+
+    async def output(self):
+        return await self._get_output_queue().async_q.get()
+
+    async def output_batch(self):
+        """
+        The next output, with the text chunks of the same message queued behind it
+        merged in, so a fast model's tokens go out in a few frames rather than one each.
+
+        Merging stops at `batch_bytes` characters. With `batch_ms` set, it also waits up
+        to that long for more chunks to arrive; by default it only takes what's queued.
+        """
+        if self._held_outputs:
+            output = self._held_outputs.popleft()
+        else:
+            output = await self.output()
+        if not self.batch_bytes or not _mergeable(output):
+            return output
+
+        output_queue = self._get_output_queue().async_q
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_ms / 1000
+        parts = [output["content"]]
+        size = len(output["content"])
+        while size < self.batch_bytes:
+            try:
+                next_output = output_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    next_output = await asyncio.wait_for(output_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if not _same_stream(output, next_output):
+                self._held_outputs.append(next_output)
+                break
+            parts.append(next_output["content"])
+            size += len(next_output["content"])
+
+        if len(parts) == 1:
+            return output
+        return dict(output, content="".join(parts))
+
+    async def stream_in_worker(self, generator_function, *args, **kwargs):
+        """
+        Iterate a blocking generator on the worker pool, yielding its items here,
+        so one session's response doesn't hold up the event loop for the others.
+        """
+        items = janus.Queue(maxsize=self.output_queue_size)
+        finished = threading.Event()
+        end = object()
+
+        def produce():
+            def put(item):
+                while not finished.is_set():
+                    try:
+                        items.sync_q.put(item, timeout=0.5)
+                        return True
+                    except queue.Full:
+                        pass
+                return False
+
+            try:
+                for item in generator_function(*args, **kwargs):
+                    if not put(item):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(end)
+
+        self.sessions.submit(produce)
+        try:
+            while True:
+                item = await items.async_q.get()
+                if item is end:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            finished.set()
+            items.close()
 
     def respond(self, run_code=None):
         for attempt in range(5):  # 5 attempts
@@ -156,7 +565,8 @@ class AsyncInterpreter(OpenInterpreter):
                     if self.debug:
                         print("Interpreter produced this chunk:", chunk)
 
-                    self.output_queue.sync_q.put(chunk)
+                    if not self._put_output(chunk):
+                        return
                     sent_chunks = True
 
                 if not sent_chunks:
@@ -178,7 +588,7 @@ class AsyncInterpreter(OpenInterpreter):
                     )
                     time.sleep(1)
                 else:
-                    self.output_queue.sync_q.put(complete_message)
+                    self._put_output(complete_message)
                     if self.debug:
                         print("\nServer response complete.\n")
                     return
@@ -190,8 +600,8 @@ class AsyncInterpreter(OpenInterpreter):
                     "type": "error",
                     "content": traceback.format_exc() + "\n" + str(e),
                 }
-                self.output_queue.sync_q.put(error_message)
-                self.output_queue.sync_q.put(complete_message)
+                self._put_output(error_message)
+                self._put_output(complete_message)
                 print("\n\n--- SENT ERROR: ---\n\n")
                 print(error)
                 print("\n\n--- (ERROR ABOVE WAS SENT) ---\n\n")
@@ -202,8 +612,8 @@ class AsyncInterpreter(OpenInterpreter):
             "type": "error",
             "content": "No chunks sent or unknown error.",
         }
-        self.output_queue.sync_q.put(error_message)
-        self.output_queue.sync_q.put(complete_message)
+        self._put_output(error_message)
+        self._put_output(complete_message)
         raise Exception("No chunks sent or unknown error.")
 
     def accumulate(self, chunk):
@@ -247,7 +657,7 @@ class AsyncInterpreter(OpenInterpreter):
                 if "content" not in self.messages[-1]:
                     self.messages[-1]["content"] = chunk["content"]
                 else:
-                    self.messages[-1]["content"] += chunk["content"]
+                    self._append_content(chunk["content"])
 
             # elif "content" in chunk and (len(self.messages) > 0 and self.messages[-1] == {'role': 'user', 'start': True}):
             #     # Last message was {'role': 'user', 'start': True}. Just populate that with this chunk
@@ -268,12 +678,20 @@ class AsyncInterpreter(OpenInterpreter):
                     chunk_copy.pop("start")
                 if "content" not in chunk_copy:
                     chunk_copy["content"] = ""
-                self.messages.append(chunk_copy)
+                # Collects streamed content in a list, joined when it's read
+                self.messages.append(StreamingMessage(chunk_copy))
 
         elif type(chunk) == bytes:
             if self.messages[-1]["content"] == "":  # We initialize as an empty string ^
                 self.messages[-1]["content"] = b""  # But it actually should be bytes
-            self.messages[-1]["content"] += chunk
+            self._append_content(chunk)
+
+    def _append_content(self, content):
+        message = self.messages[-1]
+        if isinstance(message, StreamingMessage):
+            message.append(content)
+        else:
+            message["content"] += content
 
 
 def authenticate_function(key):
@@ -438,6 +856,22 @@ def create_router(async_interpreter):
     async def websocket_endpoint(websocket: WebSocket):
         await websocket.accept()
 
+        # Clients that send a session id get a conversation of their own
+        session_id = websocket.query_params.get("session_id") or websocket.headers.get(
+            "x-session-id"
+        )
+        try:
+            interpreter = await async_interpreter.sessions.connect(session_id)
+        except SessionLimitError as e:
+            await websocket.send_text(
+                json.dumps({"role": "server", "type": "error", "content": str(e)})
+            )
+            await websocket.close(code=1013)  # Try again later
+            return
+
+        # Clients that can take binary frames get images as raw bytes instead of base64
+        binary_output = websocket.query_params.get("binary", "").lower() == "true"
+
         try:  # solving it ;)/ # killian super wrote this
 
             async def receive_input():
@@ -455,7 +889,7 @@ def create_router(async_interpreter):
                             if "text" in data:
                                 data = json.loads(data["text"])
                                 if "auth" in data:
-                                    if async_interpreter.server.authenticate(
+                                    if interpreter.server.authenticate(
                                         data["auth"]
                                     ):
                                         authenticated = True
@@ -470,16 +904,16 @@ def create_router(async_interpreter):
                             if "text" in data:
                                 data = json.loads(data["text"])
                                 if (
-                                    async_interpreter.require_acknowledge
+                                    interpreter.require_acknowledge
                                     and "ack" in data
                                 ):
-                                    async_interpreter.acknowledged_outputs.append(
+                                    interpreter.acknowledged_outputs.append(
                                         data["ack"]
                                     )
                                     continue
                             elif "bytes" in data:
                                 data = data["bytes"]
-                            await async_interpreter.input(data)
+                            await interpreter.input(data)
                         elif data.get("type") == "websocket.disconnect":
                             print("Client wants to disconnect, that's fine..")
                             return
@@ -511,25 +945,31 @@ def create_router(async_interpreter):
                         return
                     try:
                         # First, try to send any unsent messages
-                        while async_interpreter.unsent_messages:
-                            output = async_interpreter.unsent_messages[0]
-                            if async_interpreter.debug:
+                        while interpreter.unsent_messages:
+                            output = interpreter.unsent_messages[0]
+                            if interpreter.debug:
                                 print("This was unsent, sending it again:", output)
 
                             success = await send_message(output)
                             if success:
-                                async_interpreter.unsent_messages.popleft()
+                                interpreter.unsent_messages.popleft()
 
                         # If we've sent all unsent messages, get a new output
-                        if not async_interpreter.unsent_messages:
-                            output = await async_interpreter.output()
-                            success = await send_message(output)
-                            if not success:
-                                async_interpreter.unsent_messages.append(output)
-                                if async_interpreter.debug:
-                                    print(
-                                        f"Added message to unsent_messages queue after failed attempts: {output}"
-                                    )
+                        if not interpreter.unsent_messages:
+                            output = await interpreter.output_batch()
+                            if binary_output:
+                                outputs = binary_frames(output)
+                            else:
+                                outputs = [output]
+                            for i, output in enumerate(outputs):
+                                success = await send_message(output)
+                                if not success:
+                                    interpreter.unsent_messages.extend(outputs[i:])
+                                    if interpreter.debug:
+                                        print(
+                                            f"Added message to unsent_messages queue after failed attempts: {output}"
+                                        )
+                                    break
 
                     except Exception as e:
                         error = traceback.format_exc() + "\n" + str(e)
@@ -538,8 +978,8 @@ def create_router(async_interpreter):
                             "type": "error",
                             "content": error,
                         }
-                        async_interpreter.unsent_messages.append(error_message)
-                        async_interpreter.unsent_messages.append(complete_message)
+                        interpreter.unsent_messages.append(error_message)
+                        interpreter.unsent_messages.append(complete_message)
                         print("\n\n--- ERROR (will be sent when possible): ---\n\n")
                         print(error)
                         print(
@@ -553,7 +993,7 @@ def create_router(async_interpreter):
                     id = shortuuid.uuid()
                     if (
                         isinstance(output, dict)
-                        and async_interpreter.require_acknowledge
+                        and interpreter.require_acknowledge
                     ):
                         output["id"] = id
 
@@ -570,19 +1010,19 @@ def create_router(async_interpreter):
                             await websocket.send_bytes(output)
                             return True  # Haven't set up ack for this
                         else:
-                            if async_interpreter.require_acknowledge:
+                            if interpreter.require_acknowledge:
                                 output["id"] = id
-                            if async_interpreter.debug:
+                            if interpreter.debug:
                                 print("Sending this over the websocket:", output)
                             await websocket.send_text(json.dumps(output))
 
-                        if async_interpreter.require_acknowledge:
+                        if interpreter.require_acknowledge:
                             acknowledged = False
                             for _ in range(100):
-                                if id in async_interpreter.acknowledged_outputs:
-                                    async_interpreter.acknowledged_outputs.remove(id)
+                                if id in interpreter.acknowledged_outputs:
+                                    interpreter.acknowledged_outputs.remove(id)
                                     acknowledged = True
-                                    if async_interpreter.debug:
+                                    if interpreter.debug:
                                         print("This output was acknowledged:", output)
                                     break
                                 await asyncio.sleep(0.0001)
@@ -590,7 +1030,7 @@ def create_router(async_interpreter):
                             if acknowledged:
                                 return True
                             else:
-                                if async_interpreter.debug:
+                                if interpreter.debug:
                                     print("Acknowledgement not received for:", output)
                                 return False
                         else:
@@ -605,7 +1045,7 @@ def create_router(async_interpreter):
                         await asyncio.sleep(0.01)
 
                 # If we've reached this point, we've failed to send after 100 attempts
-                if output not in async_interpreter.unsent_messages:
+                if output not in interpreter.unsent_messages:
                     print("Failed to send message:", output)
                 else:
                     print(
@@ -615,7 +1055,12 @@ def create_router(async_interpreter):
 
                 return False
 
-            await asyncio.gather(receive_input(), send_output())
+            # Once the client is gone, stop waiting for output to send it
+            sender = asyncio.create_task(send_output())
+            try:
+                await receive_input()
+            finally:
+                sender.cancel()
 
         except Exception as e:
             error = traceback.format_exc() + "\n" + str(e)
@@ -624,11 +1069,13 @@ def create_router(async_interpreter):
                 "type": "error",
                 "content": error,
             }
-            async_interpreter.unsent_messages.append(error_message)
-            async_interpreter.unsent_messages.append(complete_message)
+            interpreter.unsent_messages.append(error_message)
+            interpreter.unsent_messages.append(complete_message)
             print("\n\n--- ERROR (will be sent when possible): ---\n\n")
             print(error)
             print("\n\n--- (ERROR ABOVE WILL BE SENT WHEN POSSIBLE) ---\n\n")
+        finally:
+            async_interpreter.sessions.disconnect(interpreter)
 
     # TODO
     @router.post("/")
@@ -639,31 +1086,42 @@ def create_router(async_interpreter):
         except Exception as e:
             return {"error": str(e)}, 500
 
-    @router.post("/settings")
-    async def set_settings(payload: Dict[str, Any]):
+    def apply_settings(interpreter, payload):
+        """Apply a /settings payload to one interpreter. Returns an error response, if any."""
         for key, value in payload.items():
-            print("Updating settings...")
-            # print(f"Updating settings: {key} = {value}")
             if key in ["llm", "computer"] and isinstance(value, dict):
                 if key == "auto_run":
                     return {
                         "error": f"The setting {key} is not modifiable through the server due to security constraints."
                     }, 403
-                if hasattr(async_interpreter, key):
+                if hasattr(interpreter, key):
                     for sub_key, sub_value in value.items():
-                        if hasattr(getattr(async_interpreter, key), sub_key):
-                            setattr(getattr(async_interpreter, key), sub_key, sub_value)
+                        if hasattr(getattr(interpreter, key), sub_key):
+                            setattr(getattr(interpreter, key), sub_key, sub_value)
                         else:
                             return {
                                 "error": f"Sub-setting {sub_key} not found in {key}"
                             }, 404
                 else:
                     return {"error": f"Setting {key} not found"}, 404
-            elif hasattr(async_interpreter, key):
-                setattr(async_interpreter, key, value)
+            elif hasattr(interpreter, key):
+                setattr(interpreter, key, value)
             else:
                 return {"error": f"Setting {key} not found"}, 404
 
+    @router.post("/settings")
+    async def set_settings(payload: Dict[str, Any]):
+        print("Updating settings...")
+        error = apply_settings(async_interpreter, payload)
+        if error is not None:
+            return error
+
+        # Open sessions get the update too, as they would if they shared one
+        # interpreter, except for their own conversation state. Sessions started
+        # later copy it from the server's interpreter.
+        shared = {k: v for k, v in payload.items() if k not in SESSION_STATE}
+        for interpreter in async_interpreter.sessions.interpreters()[1:]:
+            apply_settings(interpreter, copy.deepcopy(shared))
         return {"status": "success"}
 
     @router.get("/settings/{setting}")
@@ -723,10 +1181,14 @@ def create_router(async_interpreter):
         temperature: Optional[float] = None
         stream: Optional[bool] = False
 
-    async def openai_compatible_generator(run_code):
+    async def openai_compatible_generator(interpreter, run_code):
         if run_code:
             print("Running code.\n")
-            for i, chunk in enumerate(async_interpreter._respond_and_store()):
+            i = 0
+            async for chunk in interpreter.stream_in_worker(
+                interpreter._respond_and_store
+            ):
+                i += 1
                 if "content" in chunk:
                     print(chunk["content"], end="")  # Sorry! Shitty display for now
                 if "start" in chunk:
@@ -766,15 +1228,17 @@ def create_router(async_interpreter):
             "Can you respond?",
             "Please reply.",
         ]:
-            for i, chunk in enumerate(
-                async_interpreter.chat(message=message, stream=True, display=True)
+            i = 0
+            async for chunk in interpreter.stream_in_worker(
+                interpreter.chat, message=message, stream=True, display=True
             ):
+                i += 1
                 await asyncio.sleep(0)  # Yield control to the event loop
                 made_chunk = True
 
                 if (
                     chunk["type"] == "confirmation"
-                    and async_interpreter.auto_run == False
+                    and interpreter.auto_run == False
                 ):
                     await asyncio.sleep(0)
                     output_content = "Do you want to run this code?"
@@ -788,7 +1252,7 @@ def create_router(async_interpreter):
                     yield f"data: {json.dumps(output_chunk)}\n\n"
                     break
 
-                if async_interpreter.stop_event.is_set():
+                if interpreter.stop_event.is_set():
                     break
 
                 output_content = None
@@ -817,9 +1281,19 @@ def create_router(async_interpreter):
                 break
 
     @router.post("/openai/chat/completions")
-    async def chat_completion(request: ChatCompletionRequest):
-        global last_start_time
+    async def chat_completion(request: ChatCompletionRequest, http_request: Request):
+        try:
+            interpreter = await async_interpreter.sessions.connect(
+                http_request.headers.get("x-session-id")
+            )
+        except SessionLimitError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        try:
+            return await _chat_completion(interpreter, request)
+        finally:
+            async_interpreter.sessions.disconnect(interpreter)
 
+    async def _chat_completion(interpreter, request):
         # Convert to LMC
         last_message = request.messages[-1]
 
@@ -828,36 +1302,36 @@ def create_router(async_interpreter):
 
         if last_message.content == "{STOP}":
             # Handle special STOP token
-            async_interpreter.stop_event.set()
-            time.sleep(5)
-            async_interpreter.stop_event.clear()
+            interpreter.stop_event.set()
+            await asyncio.sleep(5)
+            interpreter.stop_event.clear()
             return
 
         if last_message.content in ["{CONTEXT_MODE_ON}", "{REQUIRE_START_ON}"]:
-            async_interpreter.context_mode = True
+            interpreter.context_mode = True
             return
 
         if last_message.content in ["{CONTEXT_MODE_OFF}", "{REQUIRE_START_OFF}"]:
-            async_interpreter.context_mode = False
+            interpreter.context_mode = False
             return
 
         if last_message.content == "{AUTO_RUN_ON}":
-            async_interpreter.auto_run = True
+            interpreter.auto_run = True
             return
 
         if last_message.content == "{AUTO_RUN_OFF}":
-            async_interpreter.auto_run = False
+            interpreter.auto_run = False
             return
 
         run_code = False
         if (
-            async_interpreter.messages
-            and async_interpreter.messages[-1]["type"] == "code"
+            interpreter.messages
+            and interpreter.messages[-1]["type"] == "code"
             and last_message.content.lower().strip(".!?").strip() == "yes"
         ):
             run_code = True
         elif type(last_message.content) == str:
-            async_interpreter.messages.append(
+            interpreter.messages.append(
                 {
                     "role": "user",
                     "type": "message",
@@ -868,7 +1342,7 @@ def create_router(async_interpreter):
         elif type(last_message.content) == list:
             for content in last_message.content:
                 if content["type"] == "text":
-                    async_interpreter.messages.append(
+                    interpreter.messages.append(
                         {"role": "user", "type": "message", "content": str(content)}
                     )
                     print(">", content)
@@ -886,7 +1360,7 @@ def create_router(async_interpreter):
 
                     data = url.split("base64,")[1]
                     format = "base64." + url.split(";")[0].split("/")[1]
-                    async_interpreter.messages.append(
+                    interpreter.messages.append(
                         {
                             "role": "user",
                             "type": "image",
@@ -896,23 +1370,23 @@ def create_router(async_interpreter):
                     )
 
         else:
-            if async_interpreter.context_mode:
+            if interpreter.context_mode:
                 # In context mode, we only respond if we recieved a {START} message
                 # Otherwise, we're just accumulating context
                 if last_message.content == "{START}":
-                    if async_interpreter.messages[-1]["content"] == "{START}":
+                    if interpreter.messages[-1]["content"] == "{START}":
                         # Remove that {START} message that would have just been added
-                        async_interpreter.messages = async_interpreter.messages[:-1]
-                    last_start_time = time.time()
+                        interpreter.messages = interpreter.messages[:-1]
+                    interpreter.last_start_time = time.time()
                     if (
-                        async_interpreter.messages
-                        and async_interpreter.messages[-1].get("role") != "user"
+                        interpreter.messages
+                        and interpreter.messages[-1].get("role") != "user"
                     ):
                         return
                 else:
                     # Check if we're within 6 seconds of last_start_time
                     current_time = time.time()
-                    if current_time - last_start_time <= 6:
+                    if current_time - interpreter.last_start_time <= 6:
                         # Continue processing
                         pass
                     else:
@@ -923,19 +1397,33 @@ def create_router(async_interpreter):
                 if last_message.content == "{START}":
                     # This just sometimes happens I guess
                     # Remove that {START} message that would have just been added
-                    async_interpreter.messages = async_interpreter.messages[:-1]
+                    interpreter.messages = interpreter.messages[:-1]
                     return
 
-        async_interpreter.stop_event.set()
-        time.sleep(0.1)
-        async_interpreter.stop_event.clear()
+        interpreter.stop_event.set()
+        await asyncio.sleep(0.1)
+        interpreter.stop_event.clear()
+
+        if not async_interpreter.sessions.has_capacity():
+            raise HTTPException(
+                status_code=503,
+                detail="The server is busy with other sessions. Try again shortly.",
+            )
 
         if request.stream:
             return StreamingResponse(
-                openai_compatible_generator(run_code), media_type="application/x-ndjson"
+                openai_compatible_generator(interpreter, run_code),
+                media_type="application/x-ndjson",
             )
         else:
-            messages = async_interpreter.chat(message=".", stream=False, display=True)
+            try:
+                messages = await asyncio.wrap_future(
+                    async_interpreter.sessions.submit(
+                        interpreter.chat, message=".", stream=False, display=True
+                    )
+                )
+            except SessionLimitError as e:
+                raise HTTPException(status_code=503, detail=str(e))
             content = messages[-1]["content"]
             return {
                 "id": "200",
@@ -0,0 +1,99 @@
+import atexit
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Embeddings of icon crops, kept on disk across sessions and keyed by crop hash.
+
+    Everything lives in a single .npz file (one per model) that's read on first use
+    and rewritten atomically by `save()`, so two processes sharing it can't leave it
+    half written. `save_soon()` does that on a background thread once no entries
+    have been added for `save_delay` seconds, and anything unsaved is written at
+    exit. Past `max_entries`, the least recently used embeddings are dropped.
+    """
+
+    def __init__(self, path, max_entries=10000, save_delay=5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.save_delay = save_delay
+        self._entries = None  # Will load upon first use
+        self._dirty = False
+        self._save_timer = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # One writer at a time
+        atexit.register(self.save)
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = OrderedDict()
+        try:
+            with np.load(self.path) as data:
+                for key, embedding in zip(data["hashes"], data["embeddings"]):
+                    self._entries[str(key)] = embedding
+        except (OSError, ValueError, KeyError):
+            # Missing or unreadable, start over
+            pass
+
+    def get(self, key):
+        with self._lock:
+            self._load()
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+            return embedding
+
+    def add(self, key, embedding):
+        with self._lock:
+            self._load()
+            self._entries[key] = np.asarray(embedding, dtype=np.float32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def save_soon(self):
+        """Save on a background thread, once no entries have been added for a while."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """Write new entries to disk. Failing to is harmless, so errors are ignored."""
+        with self._save_lock:
+            # Copy the entries, so lookups aren't held up while the file is written
+            with self._lock:
+                if not self._dirty:
+                    return
+                hashes = np.array(list(self._entries.keys()))
+                embeddings = np.stack(list(self._entries.values()))
+                self._dirty = False
+            temp_path = None
+            try:
+                directory = os.path.dirname(self.path)
+                os.makedirs(directory, exist_ok=True)
+                with tempfile.NamedTemporaryFile(
+                    dir=directory, suffix=".npz", delete=False
+                ) as file:
+                    temp_path = file.name
+                    np.savez(file, hashes=hashes, embeddings=embeddings)
+                os.replace(temp_path, self.path)
+            except OSError:
+                if temp_path and os.path.exists(temp_path):
+                    os.remove(temp_path)
+                with self._lock:
+                    self._dirty = True
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._entries)
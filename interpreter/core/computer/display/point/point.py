@@ -2,26 +2,34 @@ import hashlib
 import io
 import os
 import subprocess
+import threading
 from typing import List
 
 import cv2
-import nltk
 import numpy as np
-import torch
 from PIL import Image, ImageDraw, ImageEnhance, ImageFont
-from sentence_transformers import SentenceTransformer, util
 
 from .....terminal_interface.utils.oi_dir import oi_dir
 from ...utils.computer_vision import pytesseract_get_text_bounding_boxes
+from .embedding_cache import EmbeddingCache
 
-try:
-    nltk.corpus.words.words()
-except LookupError:
-    nltk.download("words", quiet=True)
-from nltk.corpus import words
+english_words = None  # Will load upon first use
 
-# Create a set of English words
-english_words = set(words.words())
+
+def get_english_words():
+    global english_words
+    if english_words is None:
+        import nltk
+
+        try:
+            nltk.corpus.words.words()
+        except LookupError:
+            nltk.download("words", quiet=True)
+        from nltk.corpus import words
+
+        # Create a set of English words
+        english_words = set(words.words())
+    return english_words
 
 
 def take_screenshot_to_pil(filename="temp_screenshot.png"):
@@ -160,6 +168,7 @@ def find_icon(description, screenshot=None, debug=False, hashes=None):
     ]  # icons are sometimes text, like "X"
 
     # Filter blocks so the text.lower() needs to be a real word in the English dictionary
+    english_words = get_english_words()
     filtered_blocks = []
     for b in blocks:
         words = b["text"].lower().split()
@@ -404,7 +413,10 @@ def find_icon(description, screenshot=None, debug=False, hashes=None):
         icon["width"] = w
         icon["height"] = h
 
-        icon_image_hash = hashlib.sha256(icon_image.tobytes()).hexdigest()
+        # The size is part of the hash, so same-bytes crops of different shapes differ
+        icon_image_hash = hashlib.sha256(
+            f"{icon_image.mode}{icon_image.size}".encode() + icon_image.tobytes()
+        ).hexdigest()
         icon["hash"] = icon_image_hash
 
         # Calculate the relative central xy coordinates of the bounding box
@@ -444,95 +456,161 @@ def find_icon(description, screenshot=None, debug=False, hashes=None):
 # torch.set_num_threads(4)
 
 fast_model = True
+model_name = "clip-ViT-B-32"
 
-# First, we load the respective CLIP model
-model = SentenceTransformer("clip-ViT-B-32")
+# Loading the model (and torch) takes seconds, so it waits until an icon is searched for
+model = None  # Will load upon first use
+transforms = None
+device = None
+_model_lock = threading.Lock()
 
+_embedding_cache = None
+_query_embeddings = {}
 
-import os
 
-import timm
+def load_model():
+    global model, transforms, device
 
-if fast_model == False:
-    # Check if the model file exists
-    if not os.path.isfile(model_path):
-        # If not, create and save the model
-        model = timm.create_model(
-            "vit_base_patch16_siglip_224",
-            pretrained=True,
-            num_classes=0,
-        )
-        model = model.eval()
-        torch.save(model.state_dict(), model_path)
-    else:
-        # If the model file exists, load the model from the saved state
-        model = timm.create_model(
-            "vit_base_patch16_siglip_256",
-            pretrained=False,  # Don't load pretrained weights
-            num_classes=0,
-        )
-        model.load_state_dict(torch.load(model_path))
-        model = model.eval()
+    with _model_lock:
+        if model is not None:
+            return model
+
+        import torch
+
+        if fast_model:
+            from sentence_transformers import SentenceTransformer
+
+            # First, we load the respective CLIP model
+            loaded_model = SentenceTransformer(model_name)
+        else:
+            import timm
+
+            # Check if the model file exists
+            if not os.path.isfile(model_path):
+                # If not, create and save the model
+                loaded_model = timm.create_model(
+                    "vit_base_patch16_siglip_224",
+                    pretrained=True,
+                    num_classes=0,
+                )
+                loaded_model = loaded_model.eval()
+                torch.save(loaded_model.state_dict(), model_path)
+            else:
+                # If the model file exists, load the model from the saved state
+                loaded_model = timm.create_model(
+                    "vit_base_patch16_siglip_256",
+                    pretrained=False,  # Don't load pretrained weights
+                    num_classes=0,
+                )
+                loaded_model.load_state_dict(torch.load(model_path))
+                loaded_model = loaded_model.eval()
+
+            # get model specific transforms (normalization, resize)
+            data_config = timm.data.resolve_model_data_config(loaded_model)
+            transforms = timm.data.create_transform(**data_config, is_training=False)
+
+        if torch.cuda.is_available():
+            device = torch.device("cuda")
+        elif torch.backends.mps.is_available():
+            device = torch.device("mps")
+        else:
+            device = torch.device("cpu")
 
-    # get model specific transforms (normalization, resize)
-    data_config = timm.data.resolve_model_data_config(model)
-    transforms = timm.data.create_transform(**data_config, is_training=False)
+        # Move the model to the specified device
+        model = loaded_model.to(device)
+        return model
 
-    def embed_images(images: List[Image.Image], model, transforms):
-        # Stack images along the batch dimension
-        image_batch = torch.stack([transforms(image) for image in images])
-        # Get embeddings
-        embeddings = model(image_batch)
-        return embeddings
+
+def embed_images(images: List[Image.Image], model, transforms):
+    import torch
+
+    # Stack images along the batch dimension
+    image_batch = torch.stack([transforms(image) for image in images])
+    # Get embeddings
+    embeddings = model(image_batch)
+    return embeddings
 
     # Usage:
     # images = [Image.open(io.BytesIO(image_bytes1)), Image.open(io.BytesIO(image_bytes2)), ...]
     # embeddings = embed_images(images, model, transforms)
 
 
-if torch.cuda.is_available():
-    device = torch.device("cuda")
-elif torch.backends.mps.is_available():
-    device = torch.device("mps")
-else:
-    device = torch.device("cpu")
-
-# Move the model to the specified device
-model = model.to(device)
+def get_embedding_cache():
+    """
+    Icon embeddings saved in the Open Interpreter folder, so the same crops aren't
+    embedded again in later sessions. Set OI_POINT_EMBEDDING_CACHE=False to disable.
+    """
+    global _embedding_cache
+    if not fast_model or os.getenv("OI_POINT_EMBEDDING_CACHE", "True") != "True":
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            os.path.join(oi_dir, "icon_embeddings", f"{model_name}.npz")
+        )
+    return _embedding_cache
 
 
-def image_search(query, icons, hashes, debug):
-    hashed_icons = [icon for icon in icons if icon["hash"] in hashes]
-    unhashed_icons = [icon for icon in icons if icon["hash"] not in hashes]
+def encode(items, debug=False):
+    """
+    Embeddings for a list of images (or texts), as a tensor on `device`.
 
-    # Embed the unhashed icons
+    Items go through the model in batches of OI_POINT_BATCH_SIZE (128 by default),
+    so screens with many elements don't need memory for all of them at once.
+    """
+    load_model()
     if fast_model:
-        query_and_unhashed_icons_embeds = model.encode(
-            [query] + [icon["data"] for icon in unhashed_icons],
-            batch_size=128,
+        batch_size = int(os.getenv("OI_POINT_BATCH_SIZE", 128))
+        return model.encode(
+            items,
+            batch_size=max(batch_size, 1),
             convert_to_tensor=True,
             show_progress_bar=debug,
-        )
+        ).to(device)
     else:
-        query_and_unhashed_icons_embeds = embed_images(
-            [query] + [icon["data"] for icon in unhashed_icons], model, transforms
-        )
-
-    query_embed = query_and_unhashed_icons_embeds[0]
-    unhashed_icons_embeds = query_and_unhashed_icons_embeds[1:]
-
-    # Store hashes for unhashed icons
-    for icon, emb in zip(unhashed_icons, unhashed_icons_embeds):
-        hashes[icon["hash"]] = emb
+        return embed_images(items, model, transforms).to(device)
 
-    # Move tensors to the specified device before concatenating
-    unhashed_icons_embeds = unhashed_icons_embeds.to(device)
 
-    # Include hashed icons in img_emb
-    img_emb = torch.cat(
-        [unhashed_icons_embeds]
-        + [hashes[icon["hash"]].unsqueeze(0) for icon in hashed_icons]
-    )
+def image_search(query, icons, hashes, debug):
+    import torch
+    from sentence_transformers import util
+
+    if not icons:
+        return []
+
+    load_model()
+    embedding_cache = get_embedding_cache()
+
+    # Crops we have no embedding for, in this session (`hashes`) or on disk
+    unhashed_icons = {}
+    for icon in icons:
+        if icon["hash"] in hashes or icon["hash"] in unhashed_icons:
+            continue
+        embedding = (
+            embedding_cache.get(icon["hash"]) if embedding_cache is not None else None
+        )
+        if embedding is not None:
+            hashes[icon["hash"]] = torch.from_numpy(embedding).to(device)
+        else:
+            unhashed_icons[icon["hash"]] = icon["data"]
+
+    # Embed them all at once
+    if unhashed_icons:
+        unhashed_icons_embeds = encode(list(unhashed_icons.values()), debug)
+        for icon_hash, emb in zip(unhashed_icons, unhashed_icons_embeds):
+            hashes[icon_hash] = emb
+            if embedding_cache is not None:
+                embedding_cache.add(icon_hash, emb.float().cpu().numpy())
+        if embedding_cache is not None:
+            embedding_cache.save_soon()
+
+    if query not in _query_embeddings:
+        if len(_query_embeddings) > 1000:
+            _query_embeddings.clear()
+        _query_embeddings[query] = encode([query], debug)[0]
+    query_embed = _query_embeddings[query]
+
+    # In the same order as `icons`, so hits' corpus_id indexes straight into it
+    img_emb = torch.stack([hashes[icon["hash"]].to(device) for icon in icons])
 
     # Perform semantic search
     hits = util.semantic_search(query_embed, img_emb)[0]
@@ -1,11 +1,9 @@
 import os
-import queue
 import re
 import subprocess
 import threading
-import time
 import traceback
-from .subprocess_language import SubprocessLanguage
+from .subprocess_language import END_OF_EXECUTION, SubprocessLanguage
 
 class Java(SubprocessLanguage):
     file_extension = "java"
@@ -95,21 +93,11 @@ class Java(SubprocessLanguage):
             run_process.wait()
             self.done.set()
 
-            while True:
-                if not self.output_queue.empty():
-                    yield self.output_queue.get()
-                else:
-                    time.sleep(0.1)
-                try:
-                    output = self.output_queue.get(timeout=0.3)
+            # Both readers have finished, so everything is already queued
+            while not self.output_queue.empty():
+                output = self.output_queue.get()
+                if output is not END_OF_EXECUTION:
                     yield output
-                except queue.Empty:
-                    if self.done.is_set():
-                        for _ in range(3):
-                            if not self.output_queue.empty():
-                                yield self.output_queue.get()
-                            time.sleep(0.2)
-                        break
 
         except Exception as e:
             yield {
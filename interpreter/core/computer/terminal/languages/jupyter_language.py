@@ -15,9 +15,10 @@ import traceback
 
 os.environ["LITELLM_LOCAL_MODEL_COST_MAP"] = "True"
 import litellm
-from jupyter_client import KernelManager
 
 from ..base_language import BaseLanguage
+from .kernel_pool import get_kernel_pool, kernel_memory_mb, start_kernel
+from .subprocess_language import END_OF_EXECUTION
 
 DEBUG_MODE = False
 
@@ -41,39 +42,18 @@ class JupyterLanguage(BaseLanguage):
     def __init__(self, computer):
         self.computer = computer
 
-        self.km = KernelManager(kernel_name="python3")
-        self.km.start_kernel()
-        self.kc = self.km.client()
-        self.kc.start_channels()
-        while not self.kc.is_alive():
-            time.sleep(0.1)
-        time.sleep(0.5)
+        # Take a kernel that's already running from the pool if there is one
+        # (see kernel_pool.py), otherwise boot our own. Either way it has
+        # inline matplotlib set up, which bubbles plots up to us as images.
+        self.kernel_pool = get_kernel_pool()
+        if self.kernel_pool:
+            self.km, self.kc = self.kernel_pool.checkout()
+        else:
+            self.km, self.kc = start_kernel()
 
         self.listener_thread = None
         self.finish_flag = False
 
-        # DISABLED because sometimes this bypasses sending it up to us for some reason!
-        # Give it our same matplotlib backend
-        # backend = matplotlib.get_backend()
-
-        # Use Agg, which bubbles everything up as an image.
-        # Not perfect (I want interactive!) but it works.
-        backend = "Agg"
-
-        code = f"""
-import matplotlib
-matplotlib.use('{backend}')
-        """.strip()
-
-        # Use Inline actually, it's better I think
-        code = """
-%matplotlib inline
-import matplotlib.pyplot as plt
-""".strip()
-
-        for _ in self.run(code):
-            pass
-
         # DISABLED because it doesn't work??
         # Disable color outputs in the terminal, which don't look good in OI and aren't useful
         # code = """
@@ -83,8 +63,12 @@ import matplotlib.pyplot as plt
         # self.run(code)
 
     def terminate(self):
-        self.kc.stop_channels()
-        self.km.shutdown_kernel()
+        if self.kernel_pool:
+            # Recycled: the pool shuts it down in the background and boots a fresh one
+            self.kernel_pool.discard(self.km, self.kc)
+        else:
+            self.kc.stop_channels()
+            self.km.shutdown_kernel()
 
     def run(self, code):
         while not self.kc.is_alive():
@@ -124,14 +108,49 @@ import matplotlib.pyplot as plt
             message_queue = queue.Queue()
             self._execute_code(preprocessed_code, message_queue)
             yield from self._capture_output(message_queue)
+            yield from self._recycle_if_over_memory()
         except GeneratorExit:
             raise  # gotta pass this up!
         except:
             content = traceback.format_exc()
             yield {"type": "console", "format": "output", "content": content}
 
+    def _recycle_if_over_memory(self):
+        """
+        Swap in a fresh kernel if this one has grown past INTERPRETER_KERNEL_MAX_MEMORY_MB.
+        """
+        limit = float(os.environ.get("INTERPRETER_KERNEL_MAX_MEMORY_MB", 0))
+        if limit <= 0:
+            return
+        memory = kernel_memory_mb(self.km)
+        if memory is None or memory <= limit:
+            return
+
+        self.terminate()
+        if self.kernel_pool:
+            self.km, self.kc = self.kernel_pool.checkout()
+        else:
+            self.km, self.kc = start_kernel()
+
+        # Whatever was imported into the old kernel has to be imported again
+        self.computer._has_imported_computer_api = False
+        self.computer._has_imported_skills = False
+
+        yield {
+            "type": "console",
+            "format": "output",
+            "content": f"\n\nThe Python kernel was using {memory:.0f} MB, over the {limit:.0f} MB limit, so it was restarted. Variables and imports from earlier code are gone.",
+        }
+
     def _execute_code(self, code, message_queue):
         def iopub_message_listener():
+            try:
+                listen()
+            finally:
+                # Wake up _capture_output, however listening ended
+                message_queue.put(END_OF_EXECUTION)
+
+        def listen():
             max_retries = 100
             while True:
                 # If self.finish_flag = True, and we didn't set it (we do below), we need to stop. That's our "stop"
@@ -319,8 +338,6 @@ import matplotlib.pyplot as plt
 
     def _capture_output(self, message_queue):
         while True:
-            time.sleep(0.1)
-
             # For async usage
             if (
                 hasattr(self.computer.interpreter, "stop_event")
@@ -329,26 +346,19 @@ import matplotlib.pyplot as plt
                 self.finish_flag = True
                 break
 
-            if self.listener_thread:
-                try:
-                    output = message_queue.get(timeout=0.1)
-                    if DEBUG_MODE:
-                        print(output)
-                    yield output
+            try:
+                # Time out only to check for the stop event above
+                output = message_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
 
-                except queue.Empty:
-                    if self.finish_flag:
-                        time.sleep(0.1)
-
-                        try:
-                            output = message_queue.get(timeout=0.1)
-                            if DEBUG_MODE:
-                                print(output)
-                            yield output
-                        except queue.Empty:
-                            if DEBUG_MODE:
-                                print("we're done")
-                            break
+            if output is END_OF_EXECUTION:
+                if DEBUG_MODE:
+                    print("we're done")
+                break
+            if DEBUG_MODE:
+                print(output)
+            yield output
 
     def stop(self):
         self.finish_flag = True
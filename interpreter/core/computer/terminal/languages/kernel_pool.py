@@ -0,0 +1,167 @@
+import atexit
+import os
+import queue
+import threading
+
+import psutil
+from jupyter_client import KernelManager
+
+# Run in every new kernel before it's handed to a language.
+# Inline matplotlib bubbles plots up to us as images.
+KERNEL_SETUP_CODE = """
+%matplotlib inline
+import matplotlib.pyplot as plt
+""".strip()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def start_kernel(kernel_name="python3", setup_code=KERNEL_SETUP_CODE):
+    """
+    Start a kernel, wait until it answers, and run `setup_code` in it.
+    Returns its (KernelManager, client).
+    """
+    km = KernelManager(kernel_name=kernel_name)
+    km.start_kernel()
+    kc = km.client()
+    kc.start_channels()
+    try:
+        kc.wait_for_ready(timeout=60)
+        if setup_code:
+            kc.execute_interactive(
+                setup_code, store_history=False, output_hook=lambda msg: None
+            )
+        drain_iopub(kc)
+    except:
+        stop_kernel(km, kc)
+        raise
+    return km, kc
+
+
+def stop_kernel(km, kc):
+    try:
+        kc.stop_channels()
+    finally:
+        km.shutdown_kernel(now=True)
+
+
+def drain_iopub(kc):
+    """Drop messages left on the iopub channel, so they aren't read as the next run's."""
+    while True:
+        try:
+            kc.iopub_channel.get_msg(timeout=0)
+        except queue.Empty:
+            return
+
+
+def kernel_memory_mb(km):
+    """Resident memory of the kernel process (and its children) in MB, or None."""
+    pid = getattr(km.provisioner, "pid", None)
+    if pid is None:
+        return None
+    try:
+        process = psutil.Process(pid)
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            rss += child.memory_info().rss
+    except psutil.Error:
+        return None
+    return rss / (1024 * 1024)
+
+
+class KernelPool:
+    """
+    Kernels started ahead of time, so a new Python session doesn't wait for one to boot.
+
+    `checkout()` hands out a ready kernel (or starts one if none is ready yet) and tops
+    the pool back up to `size` in the background. Used kernels are never handed out
+    again: `discard()` shuts them down off the caller's thread, since a reset or a
+    memory-heavy session should start clean.
+    """
+
+    def __init__(self, size=1, kernel_name="python3", setup_code=KERNEL_SETUP_CODE):
+        self.size = size
+        self.kernel_name = kernel_name
+        self.setup_code = setup_code
+        self._ready = []
+        self._starting = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self.started = 0  # Kernels booted by the pool
+        self.hits = 0  # Checkouts served by an already running kernel
+        self.replenish()
+
+    def replenish(self):
+        """Start kernels in the background until `size` are ready or booting."""
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.size - len(self._ready) - self._starting
+            self._starting += max(missing, 0)
+        for _ in range(missing):
+            threading.Thread(target=self._start_one, daemon=True).start()
+
+    def _start_one(self):
+        kernel = None
+        try:
+            kernel = start_kernel(self.kernel_name, self.setup_code)
+        except Exception as e:
+            print("Failed to start a pooled Jupyter kernel:", str(e))
+        with self._lock:
+            self._starting -= 1
+            if kernel is not None:
+                self.started += 1
+                if not self._closed:
+                    self._ready.append(kernel)
+                    return
+        if kernel is not None:
+            stop_kernel(*kernel)
+
+    def checkout(self):
+        """A ready (KernelManager, client), started on the spot if the pool is empty."""
+        while True:
+            with self._lock:
+                kernel = self._ready.pop(0) if self._ready else None
+            if kernel is None:
+                break
+            km, kc = kernel
+            if km.is_alive():
+                self.hits += 1
+                drain_iopub(kc)
+                self.replenish()
+                return kernel
+            self.discard(km, kc)
+
+        self.replenish()
+        return start_kernel(self.kernel_name, self.setup_code)
+
+    def discard(self, km, kc):
+        """Shut down a kernel that's done with, without waiting for it to exit."""
+        threading.Thread(target=stop_kernel, args=(km, kc), daemon=True).start()
+        self.replenish()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            kernels, self._ready = self._ready, []
+        for kernel in kernels:
+            stop_kernel(*kernel)
+
+
+def get_kernel_pool():
+    """
+    The process-wide kernel pool, or None if it's disabled.
+
+    Set INTERPRETER_KERNEL_POOL_SIZE to the number of kernels to keep ready (0, the
+    default, disables the pool).
+    """
+    global _pool
+    size = int(os.getenv("INTERPRETER_KERNEL_POOL_SIZE", 0))
+    if size <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = KernelPool(size)
+            atexit.register(_pool.close)
+        return _pool
@@ -1,6 +1,9 @@
+import codecs
+import io
 import os
 import queue
 import re
+import selectors
 import subprocess
 import threading
 import time
@@ -8,6 +11,9 @@ import traceback
 
 from ..base_language import BaseLanguage
 
+# Put on the output queue once the end-of-execution marker (or the end of the output) is seen
+END_OF_EXECUTION = object()
+
 
 class SubprocessLanguage(BaseLanguage):
     def __init__(self):
@@ -37,9 +43,11 @@ class SubprocessLanguage(BaseLanguage):
 
     def terminate(self):
         if self.process:
-            self.process.terminate()
-            self.process.stdin.close()
-            self.process.stdout.close()
+            # Detached first, so its reader threads don't end an execution of the next one
+            process, self.process = self.process, None
+            process.terminate()
+            process.stdin.close()
+            process.stdout.close()
 
     def start_process(self):
         if self.process:
@@ -59,25 +67,44 @@ class SubprocessLanguage(BaseLanguage):
             encoding="utf-8",
             errors="replace",
         )
-        threading.Thread(
-            target=self.handle_stream_output,
-            args=(self.process.stdout, False),
-            daemon=True,
-        ).start()
-        threading.Thread(
-            target=self.handle_stream_output,
-            args=(self.process.stderr, True),
-            daemon=True,
-        ).start()
+        if os.name == "nt":
+            # Pipes can't be waited on with select() on Windows, so read each in a thread
+            threading.Thread(
+                target=self.handle_stream_output,
+                args=(self.process.stdout, False, self.process),
+                daemon=True,
+            ).start()
+            threading.Thread(
+                target=self.handle_stream_output,
+                args=(self.process.stderr, True, self.process),
+                daemon=True,
+            ).start()
+        else:
+            threading.Thread(
+                target=self.handle_process_output,
+                args=(self.process,),
+                daemon=True,
+            ).start()
 
     def run(self, code):
         retry_count = 0
         max_retries = 3
 
+        # Output that arrived after the last execution finished is shown with this one
+        leftover = []
+        while True:
+            try:
+                output = self.output_queue.get_nowait()
+            except queue.Empty:
+                break
+            if output is not END_OF_EXECUTION:
+                leftover.append(output)
+        yield from leftover
+
         # Setup
         try:
             code = self.preprocess_code(code)
-            if not self.process:
+            if not self.process or self.process.poll() is not None:
                 self.start_process()
         except:
             yield {
@@ -119,75 +146,180 @@ class SubprocessLanguage(BaseLanguage):
                     }
                     return
 
+        # Output is yielded as soon as it's read, and we're done as soon as the marker is
+        process = self.process
         while True:
-            if not self.output_queue.empty():
-                yield self.output_queue.get()
-            else:
-                time.sleep(0.1)
             try:
-                output = self.output_queue.get(timeout=0.3)  # Waits for 0.3 seconds
-                yield output
+                output = self.output_queue.get(timeout=1)
             except queue.Empty:
-                if self.done.is_set():
-                    # Try to yank 3 more times from it... maybe there's something in there...
-                    # (I don't know if this actually helps. Maybe we just need to yank 1 more time)
-                    for _ in range(3):
-                        if not self.output_queue.empty():
-                            yield self.output_queue.get()
-                        time.sleep(0.2)
+                # The readers end the execution when the process exits; this is a backstop
+                # in case they can't (a pipe left open by a child process, say)
+                if process.poll() is not None or process is not self.process:
                     break
+                continue
+            if output is END_OF_EXECUTION:
+                break
+            yield output
+
+    def end_execution(self):
+        self.done.set()
+        self.output_queue.put(END_OF_EXECUTION)
+
+    def handle_process_output(self, process):
+        """
+        Read the process's stdout and stderr as data arrives, with one selector.
+
+        When a line ends the execution, whatever else is already waiting in the pipes
+        is read first, so output written just before the marker isn't left behind.
+        """
+        streams = {process.stdout.fileno(): False, process.stderr.fileno(): True}
+        decoders = {}
+        buffers = {}
+        selector = selectors.DefaultSelector()
+        for fd in streams:
+            os.set_blocking(fd, False)
+            selector.register(fd, selectors.EVENT_READ)
+            # Decodes like the text-mode pipes did: UTF-8, with universal newlines
+            decoders[fd] = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True
+            )
+            buffers[fd] = ""
+
+        def read(fd):
+            """Handle what's available on `fd`. Returns (got data, ended execution)."""
+            try:
+                data = os.read(fd, 65536)
+            except BlockingIOError:
+                return False, False
+            except OSError:
+                data = b""  # Closed by terminate()
+            ended = False
+            if data:
+                buffers[fd] += decoders[fd].decode(data)
+            else:
+                selector.unregister(fd)
+                buffers[fd] += decoders[fd].decode(b"", final=True)
+            *lines, buffers[fd] = buffers[fd].split("\n")
+            lines = [line + "\n" for line in lines]
+            if not data and buffers[fd]:
+                # The last line had no newline
+                lines.append(buffers[fd])
+                buffers[fd] = ""
+            for line in lines:
+                if self.handle_line(line, streams[fd]):
+                    ended = True
+            return bool(data), ended
+
+        try:
+            while selector.get_map():
+                try:
+                    events = selector.select(timeout=1)
+                except (OSError, ValueError):
+                    break  # A pipe was closed under us
+                if not events:
+                    if process.poll() is not None and process is not self.process:
+                        break  # Replaced by a new process
+                    continue
+
+                ended = False
+                for key, _ in events:
+                    if read(key.fd)[1]:
+                        ended = True
+
+                if ended:
+                    # Collect anything written right before the marker
+                    for fd in list(selector.get_map()):
+                        while read(fd)[0]:
+                            pass
+                    self.end_execution()
+        finally:
+            selector.close()
+            if process is self.process:
+                # The process is gone; don't leave a run() waiting for a marker. Reap it
+                # first, so the next run() sees it exited and starts a new one
+                self.wait_for_exit(process)
+                self.end_execution()
+
+    def handle_line(self, line, is_error_stream):
+        """
+        Queue the output for one line. Returns True if it ends the execution.
+        """
+        if self.verbose:
+            print(f"Received output line:\n{line}\n---")
+
+        line = self.line_postprocessor(line)
+
+        if line is None:
+            return False  # `line = None` is the postprocessor's signal to discard completely
+
+        if self.detect_active_line(line):
+            active_line = self.detect_active_line(line)
+            self.output_queue.put(
+                {
+                    "type": "console",
+                    "format": "active_line",
+                    "content": active_line,
+                }
+            )
+            # Sometimes there's a little extra on the same line, so be sure to send that out
+            line = re.sub(r"##active_line\d+##", "", line)
+            if line:
+                self.output_queue.put(
+                    {"type": "console", "format": "output", "content": line}
+                )
+        elif self.detect_end_of_execution(line):
+            # Sometimes there's a little extra on the same line, so be sure to send that out
+            line = line.replace("##end_of_execution##", "").strip()
+            if line:
+                self.output_queue.put(
+                    {"type": "console", "format": "output", "content": line}
+                )
+            return True
+        elif is_error_stream and "KeyboardInterrupt" in line:
+            self.output_queue.put(
+                {
+                    "type": "console",
+                    "format": "output",
+                    "content": "KeyboardInterrupt",
+                }
+            )
+            return True
+        else:
+            self.output_queue.put(
+                {"type": "console", "format": "output", "content": line}
+            )
+        return False
 
-    def handle_stream_output(self, stream, is_error_stream):
+    def handle_stream_output(self, stream, is_error_stream, process=None):
+        """
+        Read one stream line by line in its own thread (used where select() can't wait on pipes).
+
+        When stdout of `process` reaches its end, the process is gone, so the execution is
+        ended rather than leaving run() waiting for a marker that won't come.
+        """
         try:
             for line in iter(stream.readline, ""):
-                if self.verbose:
-                    print(f"Received output line:\n{line}\n---")
-
-                line = self.line_postprocessor(line)
-
-                if line is None:
-                    continue  # `line = None` is the postprocessor's signal to discard completely
-
-                if self.detect_active_line(line):
-                    active_line = self.detect_active_line(line)
-                    self.output_queue.put(
-                        {
-                            "type": "console",
-                            "format": "active_line",
-                            "content": active_line,
-                        }
-                    )
-                    # Sometimes there's a little extra on the same line, so be sure to send that out
-                    line = re.sub(r"##active_line\d+##", "", line)
-                    if line:
-                        self.output_queue.put(
-                            {"type": "console", "format": "output", "content": line}
-                        )
-                elif self.detect_end_of_execution(line):
-                    # Sometimes there's a little extra on the same line, so be sure to send that out
-                    line = line.replace("##end_of_execution##", "").strip()
-                    if line:
-                        self.output_queue.put(
-                            {"type": "console", "format": "output", "content": line}
-                        )
-                    self.done.set()
-                elif is_error_stream and "KeyboardInterrupt" in line:
-                    self.output_queue.put(
-                        {
-                            "type": "console",
-                            "format": "output",
-                            "content": "KeyboardInterrupt",
-                        }
-                    )
+                if self.handle_line(line, is_error_stream):
+                    # Give the other stream's thread a moment to queue what preceded this
                     time.sleep(0.1)
-                    self.done.set()
-                else:
-                    self.output_queue.put(
-                        {"type": "console", "format": "output", "content": line}
-                    )
+                    self.end_execution()
         except ValueError as e:
             if "operation on closed file" in str(e):
                 if self.verbose:
                     print("Stream closed while reading.")
             else:
                 raise e
+        if not is_error_stream and process is not None and process is self.process:
+            time.sleep(0.1)  # As above, for the stderr thread
+            self.wait_for_exit(process)
+            self.end_execution()
+
+    def wait_for_exit(self, process, timeout=1):
+        """
+        Wait briefly for a process whose output has ended. Its pipes can close a moment
+        before it exits, and until then code written to its stdin would be silently lost.
+        """
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            pass  # It closed its output but kept running
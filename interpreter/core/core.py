@@ -18,6 +18,12 @@ from .default_system_message import default_system_message
 from .llm.llm import Llm
 from .respond import respond
 
+from .utils.conversation_journal import (
+    JOURNAL_EXTENSION,
+    ConversationJournal,
+    conversation_name,
+)
+from .utils.streaming_message import StreamingMessage
 from .utils.truncate_output import truncate_output
 
 
@@ -110,6 +116,7 @@ class OpenInterpreter:
         self.conversation_history = conversation_history
         self.conversation_filename = conversation_filename
         self.conversation_history_path = conversation_history_path
+        self._conversation_journal = None
 
         # OS control mode related attributes
         self.os = os
@@ -257,26 +264,33 @@ class OpenInterpreter:
 
                     date = datetime.now().strftime("%B_%d_%Y_%H-%M-%S")
                     self.conversation_filename = (
-                        "__".join([first_few_words, date]) + ".json"
+                        "__".join([first_few_words, date]) + JOURNAL_EXTENSION
                     )
 
-                # Check if the directory exists, if not, create it
-                if not os.path.exists(self.conversation_history_path):
-                    os.makedirs(self.conversation_history_path)
-                # Write or overwrite the file
-                with open(
-                    os.path.join(
-                        self.conversation_history_path, self.conversation_filename
-                    ),
-                    "w",
-                ) as f:
-                    json.dump(self.messages, f)
+                self._save_conversation()
             return
 
         raise Exception(
             "`interpreter.chat()` requires a display. Set `display=True` or pass a message into `interpreter.chat(message)`."
         )
 
+    def _save_conversation(self):
+        """
+        Appends new or changed messages to the conversation's journal.
+        A conversation resumed from a legacy .json file moves to a journal on its first save.
+        """
+        filename = self.conversation_filename
+        legacy_path = None
+        if not filename.lower().endswith(JOURNAL_EXTENSION):
+            legacy_path = os.path.join(self.conversation_history_path, filename)
+            filename = conversation_name(filename) + JOURNAL_EXTENSION
+            self.conversation_filename = filename
+
+        path = os.path.join(self.conversation_history_path, filename)
+        if self._conversation_journal is None or self._conversation_journal.path != path:
+            self._conversation_journal = ConversationJournal(path, legacy_path=legacy_path)
+        self._conversation_journal.save(self.messages)
+
     def _respond_and_store(self):
         """
         Pulls from the respond stream, adding delimiters. Some things, like active_line, console, confirmation... these act specially.
@@ -295,6 +309,18 @@ class OpenInterpreter:
                 return True
             return False
 
+        def new_message(chunk):
+            """
+            Stored messages collect streamed content in a buffer; console output is truncated as it arrives.
+            """
+            if chunk["type"] == "console" and chunk.get("format") == "output":
+                return StreamingMessage(
+                    chunk,
+                    self.max_output,
+                    add_scrollbars=self.computer.import_computer_api,  # I consider scrollbars to be a computer API thing
+                )
+            return StreamingMessage(chunk)
+
         last_flag_base = None
 
         try:
@@ -315,12 +341,14 @@ class OpenInterpreter:
                     # If output wasn't yet produced, add an empty output
                     if self.messages[-1]["role"] != "computer":
                         self.messages.append(
-                            {
-                                "role": "computer",
-                                "type": "console",
-                                "format": "output",
-                                "content": "",
-                            }
+                            new_message(
+                                {
+                                    "role": "computer",
+                                    "type": "console",
+                                    "format": "output",
+                                    "content": "",
+                                }
+                            )
                         )
 
                 # Handle the special "confirmation" chunk, which neither triggers a flag or creates a message
@@ -373,7 +401,9 @@ class OpenInterpreter:
                                 for property in ["role", "type", "format"]
                             ]
                         ):
-                            self.messages.append(chunk)
+                            self.messages.append(new_message(chunk))
+                        elif isinstance(self.messages[-1], StreamingMessage):
+                            self.messages[-1].append(chunk["content"])
                         else:
                             self.messages[-1]["content"] += chunk["content"]
                 else:
@@ -391,13 +421,17 @@ class OpenInterpreter:
 
                     # Add the chunk as a new message
                     if not is_ephemeral(chunk):
-                        self.messages.append(chunk)
+                        self.messages.append(new_message(chunk))
 
                 # Yield the chunk itself
                 yield chunk
 
-                # Truncate output if it's console output
-                if chunk["type"] == "console" and chunk["format"] == "output":
+                # Truncate output if it's console output (StreamingMessages already did so as it arrived)
+                if (
+                    chunk["type"] == "console"
+                    and chunk["format"] == "output"
+                    and not isinstance(self.messages[-1], StreamingMessage)
+                ):
                     self.messages[-1]["content"] = truncate_output(
                         self.messages[-1]["content"],
                         self.max_output,
@@ -15,13 +15,15 @@ import time
 import uuid
 
 import requests
-import tokentrim as tt
 
 from .run_text_llm import run_text_llm
 
 # from .run_function_calling_llm import run_function_calling_llm
 from .run_tool_calling_llm import run_tool_calling_llm
 from .utils.convert_to_openai_messages import convert_to_openai_messages
+from .utils.image_cache import ImageCache
+from .utils.model_capabilities import clear_model_capabilities, get_model_capabilities
+from .utils.trim_messages import TokenCounter, trim_messages
 
 # Create or get the logger
 logger = logging.getLogger("LiteLLM")
@@ -50,6 +52,10 @@ class Llm:
         # OpenAI-compatible chat completions "endpoint"
         self.completions = fixed_litellm_completions
 
+        # Capabilities we filled in ourselves, and the (model, api_base) they're for
+        self._detected_capabilities = {}
+        self._capabilities_key = None
+
         # Settings
         self.model = "gpt-4o"
         self.temperature = 0
@@ -73,6 +79,11 @@ class Llm:
         # Budget manager powered by LiteLLM
         self.max_budget = None
 
+        # Converted messages and token counts from previous turns, reused while unchanged
+        self._conversion_cache = {}
+        self.token_counter = TokenCounter()
+        self.image_cache = ImageCache()
+
     def run(self, messages):
         """
         We're responsible for formatting the call into the llm.completions object,
@@ -123,25 +134,8 @@ class Llm:
                 self.api_base = "https://api.openinterpreter.com/v0"
                 self.interpreter.conversation_id = str(uuid.uuid4())
 
-        # Detect function support
-        if self.supports_functions == None:
-            try:
-                if litellm.supports_function_calling(model):
-                    self.supports_functions = True
-                else:
-                    self.supports_functions = False
-            except:
-                self.supports_functions = False
-
-        # Detect vision support
-        if self.supports_vision == None:
-            try:
-                if litellm.supports_vision(model):
-                    self.supports_vision = True
-                else:
-                    self.supports_vision = False
-            except:
-                self.supports_vision = False
+        # Detect function and vision support
+        self._detect_capabilities(model)
 
         # Trim image messages if they're there
         image_messages = [msg for msg in messages if msg["type"] == "image"]
@@ -177,8 +171,17 @@ class Llm:
                         postcursor = ""
 
                     try:
-                        image_description = self.vision_renderer(lmc=img_msg)
-                        ocr = self.interpreter.computer.vision.ocr(lmc=img_msg)
+                        # Described and OCR'd once per image, however many turns it stays in history
+                        image_description = self.image_cache.get(
+                            img_msg,
+                            "description",
+                            lambda: self.vision_renderer(lmc=img_msg),
+                        )
+                        ocr = self.image_cache.get(
+                            img_msg,
+                            "ocr",
+                            lambda: self.interpreter.computer.vision.ocr(lmc=img_msg),
+                        )
 
                         # It would be nice to format this as a message to the user and display it like: "I see: image_description"
 
@@ -206,6 +209,8 @@ class Llm:
             vision=self.supports_vision,
             shrink_images=self.interpreter.shrink_images,
             interpreter=self.interpreter,
+            cache=self._conversion_cache,
+            image_cache=self.image_cache,
         )
 
         system_message = messages[0]["content"]
@@ -217,22 +222,27 @@ class Llm:
                 trim_to_be_this_many_tokens = (
                     self.context_window - self.max_tokens - 25
                 )  # arbitrary buffer
-                messages = tt.trim(
+                messages = trim_messages(
                     messages,
+                    self.token_counter,
                     system_message=system_message,
                     max_tokens=trim_to_be_this_many_tokens,
                 )
             elif self.context_window and not self.max_tokens:
                 # Just trim to the context window if max_tokens not set
-                messages = tt.trim(
+                messages = trim_messages(
                     messages,
+                    self.token_counter,
                     system_message=system_message,
                     max_tokens=self.context_window,
                 )
             else:
                 try:
-                    messages = tt.trim(
-                        messages, system_message=system_message, model=model
+                    messages = trim_messages(
+                        messages,
+                        self.token_counter,
+                        system_message=system_message,
+                        model=model,
                     )
                 except:
                     if len(messages) == 1:
@@ -258,8 +268,11 @@ Also please set `self.max_tokens = {max tokens per response}`.
 Continuing...
                             """
                             )
-                    messages = tt.trim(
-                        messages, system_message=system_message, max_tokens=8000
+                    messages = trim_messages(
+                        messages,
+                        self.token_counter,
+                        system_message=system_message,
+                        max_tokens=8000,
                     )
         except:
             # If we're trimming messages, this won't work.
@@ -323,6 +336,56 @@ Continuing...
         else:
             yield from run_text_llm(self, params)
 
+    def _detect_capabilities(self, model):
+        """
+        Fill in `supports_functions` and `supports_vision` if they weren't set, from
+        litellm probes that run once per (model, api_base).
+        """
+        key = (model, self.api_base)
+        if key != self._capabilities_key:
+            # Values we detected for another model are stale. Values the user set are kept.
+            for attribute in self._detected_capabilities:
+                setattr(self, "_" + attribute, None)
+            self._detected_capabilities = {}
+            self._capabilities_key = key
+
+        if self.supports_functions is not None and self.supports_vision is not None:
+            return
+
+        capabilities = get_model_capabilities(model, self.api_base)
+        for attribute in ("supports_functions", "supports_vision"):
+            if getattr(self, attribute) is None:
+                setattr(self, "_" + attribute, capabilities[attribute])
+                self._detected_capabilities[attribute] = capabilities[attribute]
+
+    def refresh_capabilities(self):
+        """
+        Probe litellm again on the next run, replacing the capabilities we detected.
+        """
+        if self._capabilities_key is not None:
+            clear_model_capabilities(*self._capabilities_key)
+        clear_model_capabilities(self.model, self.api_base)
+        self._capabilities_key = None
+
+    # Setting these yourself overrides auto-detection, for every model
+    @property
+    def supports_functions(self):
+        return self._supports_functions
+
+    @supports_functions.setter
+    def supports_functions(self, value):
+        self._supports_functions = value
+        self._detected_capabilities.pop("supports_functions", None)
+
+    @property
+    def supports_vision(self):
+        return self._supports_vision
+
+    @supports_vision.setter
+    def supports_vision(self, value):
+        self._supports_vision = value
+        self._detected_capabilities.pop("supports_vision", None)
+
     # If you change model, set _is_loaded to false
     @property
     def model(self):
@@ -403,7 +466,9 @@ Continuing...
 
         if self.context_window == None:
             try:
-                model_info = litellm.get_model_info(model=self.model)
+                model_info = get_model_capabilities(self.model, self.api_base)[
+                    "model_info"
+                ]
                 self.context_window = model_info["max_input_tokens"]
                 if self.max_tokens == None:
                     self.max_tokens = min(
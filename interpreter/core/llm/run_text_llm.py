@@ -15,6 +15,7 @@ def run_text_llm(llm, params):
 
     inside_code_block = False
     accumulated_block = ""
+    scanned = 0  # No ``` starts before this index of accumulated_block
     language = None
 
     for chunk in llm.completions(**params):
@@ -36,13 +37,19 @@ def run_text_llm(llm, params):
             # We might be writing "```" one token at a time.
             continue
 
+        # Only look for ``` in what's new, so long messages aren't rescanned every token
+        fence = accumulated_block.find("```", scanned) != -1
+        scanned = max(0, len(accumulated_block) - 2)
+
         # Did we just enter a code block?
-        if "```" in accumulated_block and not inside_code_block:
+        if fence and not inside_code_block:
             inside_code_block = True
             accumulated_block = accumulated_block.split("```")[1]
+            scanned = max(0, len(accumulated_block) - 2)
+            fence = False  # The split leaves no ``` behind
 
         # Did we just exit a code block?
-        if inside_code_block and "```" in accumulated_block:
+        if inside_code_block and fence:
             return
 
         # If we're in a code block,
@@ -6,18 +6,141 @@ import sys
 from PIL import Image
 
 
+def _cache_key(message, options, templated):
+    """
+    Everything the converted form of a message depends on, or None if it shouldn't be cached.
+    """
+    content = message.get("content")
+    if not isinstance(content, str):
+        return None
+    if message.get("type") == "image" and message.get("format") != "description":
+        # Image files can change under the same path, and shrinking is handled separately
+        return None
+    return (
+        message.get("role"),
+        message.get("type"),
+        message.get("format"),
+        message.get("recipient"),
+        content,
+        templated,
+        options,
+    )
+
+
+def image_data_url(message, shrink_images=True):
+    """
+    An LMC image message (base64 or path) as a data URL, shrunk below 5 MB if asked.
+    """
+    if "base64" in message["format"]:
+        # Extract the extension from the format, default to 'png' if not specified
+        if "." in message["format"]:
+            extension = message["format"].split(".")[-1]
+        else:
+            extension = "png"
+
+        encoded_string = message["content"]
+
+    elif message["format"] == "path":
+        # Convert to base64
+        image_path = message["content"]
+        extension = image_path.split(".")[-1]
+
+        with open(image_path, "rb") as image_file:
+            encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
+
+    else:
+        # Probably would be better to move this to a validation pass
+        # Near core, through the whole messages object
+        if "format" not in message:
+            raise Exception("Format of the image is not specified.")
+        else:
+            raise Exception(f"Unrecognized image format: {message['format']}")
+
+    content = f"data:image/{extension};base64,{encoded_string}"
+
+    if shrink_images:
+        # Shrink to less than 5mb
+
+        # Calculate size
+        content_size_bytes = sys.getsizeof(str(content))
+
+        # Convert the size to MB
+        content_size_mb = content_size_bytes / (1024 * 1024)
+
+        # If the content size is greater than 5 MB, resize the image
+        if content_size_mb > 5:
+            # Decode the base64 image
+            img_data = base64.b64decode(encoded_string)
+            img = Image.open(io.BytesIO(img_data))
+
+            # Run in a loop to make SURE it's less than 5mb
+            for _ in range(10):
+                # Calculate the scale factor needed to reduce the image size to 4.9 MB
+                scale_factor = (4.9 / content_size_mb) ** 0.5
+
+                # Calculate the new dimensions
+                new_width = int(img.width * scale_factor)
+                new_height = int(img.height * scale_factor)
+
+                # Resize the image
+                img = img.resize((new_width, new_height))
+
+                # Convert the image back to base64
+                buffered = io.BytesIO()
+                img.save(buffered, format=extension)
+                encoded_string = base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+                # Set the content
+                content = f"data:image/{extension};base64,{encoded_string}"
+
+                # Recalculate the size of the content in bytes
+                content_size_bytes = sys.getsizeof(str(content))
+
+                # Convert the size to MB
+                content_size_mb = content_size_bytes / (1024 * 1024)
+
+                if content_size_mb < 5:
+                    break
+            else:
+                print(
+                    "Attempted to shrink the image but failed. Sending to the LLM anyway."
+                )
+
+    return content
+
+
 def convert_to_openai_messages(
     messages,
     function_calling=True,
     vision=False,
     shrink_images=True,
     interpreter=None,
+    cache=None,
+    image_cache=None,
 ):
     """
     Converts LMC messages into OpenAI messages
+
+    If a `cache` dict is passed, each message's converted form is kept in it and reused
+    on the next call until that message changes. Entries for messages no longer in the
+    conversation are dropped. An `image_cache` (ImageCache) does the same for images'
+    data URLs, so files are read and large images shrunk once.
     """
     new_messages = []
 
+    user_messages = [m for m in messages if m["role"] == "user"]
+    last_user_message = user_messages[-1] if user_messages else None
+    options = (
+        function_calling,
+        vision,
+        shrink_images,
+        getattr(interpreter, "user_message_template", None),
+        getattr(interpreter, "code_output_sender", None),
+        getattr(interpreter, "code_output_template", None),
+        getattr(interpreter, "empty_code_output_template", None),
+    )
+    used = {}
+
     # if function_calling == False:
     #     prev_message = None
     #     for message in messages:
@@ -36,6 +159,18 @@ def convert_to_openai_messages(
         if "recipient" in message and message["recipient"] != "assistant":
             continue
 
+        key = None
+        if cache is not None:
+            templated = message["role"] == "user" and (
+                message == last_user_message
+                or interpreter.always_apply_user_message_template
+            )
+            key = _cache_key(message, options, templated)
+            if key is not None and key in cache:
+                used[key] = cache[key]
+                new_messages.append(dict(cache[key]))
+                continue
+
         new_message = {}
 
         if message["type"] == "message":
@@ -44,7 +179,7 @@ def convert_to_openai_messages(
             ]  # This should never be `computer`, right?
 
             if message["role"] == "user" and (
-                message == [m for m in messages if m["role"] == "user"][-1]
+                message == last_user_message
                 or interpreter.always_apply_user_message_template
             ):
                 # Only add the template for the last message?
@@ -121,86 +256,14 @@ def convert_to_openai_messages(
                     # If no vision, we only support the format of "description"
                     continue
 
-                if "base64" in message["format"]:
-                    # Extract the extension from the format, default to 'png' if not specified
-                    if "." in message["format"]:
-                        extension = message["format"].split(".")[-1]
-                    else:
-                        extension = "png"
-
-                    encoded_string = message["content"]
-
-                elif message["format"] == "path":
-                    # Convert to base64
-                    image_path = message["content"]
-                    extension = image_path.split(".")[-1]
-
-                    with open(image_path, "rb") as image_file:
-                        encoded_string = base64.b64encode(image_file.read()).decode(
-                            "utf-8"
-                        )
-
+                if image_cache is not None:
+                    content = image_cache.get(
+                        message,
+                        ("data_url", shrink_images),
+                        lambda: image_data_url(message, shrink_images),
+                    )
                 else:
-                    # Probably would be better to move this to a validation pass
-                    # Near core, through the whole messages object
-                    if "format" not in message:
-                        raise Exception("Format of the image is not specified.")
-                    else:
-                        raise Exception(
-                            f"Unrecognized image format: {message['format']}"
-                        )
-
-                content = f"data:image/{extension};base64,{encoded_string}"
-
-                if shrink_images:
-                    # Shrink to less than 5mb
-
-                    # Calculate size
-                    content_size_bytes = sys.getsizeof(str(content))
-
-                    # Convert the size to MB
-                    content_size_mb = content_size_bytes / (1024 * 1024)
-
-                    # If the content size is greater than 5 MB, resize the image
-                    if content_size_mb > 5:
-                        # Decode the base64 image
-                        img_data = base64.b64decode(encoded_string)
-                        img = Image.open(io.BytesIO(img_data))
-
-                        # Run in a loop to make SURE it's less than 5mb
-                        for _ in range(10):
-                            # Calculate the scale factor needed to reduce the image size to 4.9 MB
-                            scale_factor = (4.9 / content_size_mb) ** 0.5
-
-                            # Calculate the new dimensions
-                            new_width = int(img.width * scale_factor)
-                            new_height = int(img.height * scale_factor)
-
-                            # Resize the image
-                            img = img.resize((new_width, new_height))
-
-                            # Convert the image back to base64
-                            buffered = io.BytesIO()
-                            img.save(buffered, format=extension)
-                            encoded_string = base64.b64encode(
-                                buffered.getvalue()
-                            ).decode("utf-8")
-
-                            # Set the content
-                            content = f"data:image/{extension};base64,{encoded_string}"
-
-                            # Recalculate the size of the content in bytes
-                            content_size_bytes = sys.getsizeof(str(content))
-
-                            # Convert the size to MB
-                            content_size_mb = content_size_bytes / (1024 * 1024)
-
-                            if content_size_mb < 5:
-                                break
-                        else:
-                            print(
-                                "Attempted to shrink the image but failed. Sending to the LLM anyway."
-                            )
+                    content = image_data_url(message, shrink_images)
 
                 new_message = {
                     "role": "user",
@@ -250,8 +313,15 @@ def convert_to_openai_messages(
         if isinstance(new_message["content"], str):
             new_message["content"] = new_message["content"].strip()
 
+        if key is not None:
+            used[key] = dict(new_message)
+
         new_messages.append(new_message)
 
+    if cache is not None:
+        cache.clear()
+        cache.update(used)
+
     if function_calling == False:
         combined_messages = []
         current_role = None
@@ -0,0 +1,91 @@
+import os
+import sys
+from collections import OrderedDict
+
+
+def image_key(message):
+    """
+    What identifies an image message's pixels, or None if it can't be identified.
+
+    Base64 images are identified by their content itself: the dict lookup hashes it
+    (once per string, Python caches str hashes) and compares it on a hit. Image files
+    are identified by path, modification time and size, so they aren't re-read to
+    find out they're unchanged.
+    """
+    image_format = message.get("format") or ""
+    content = message.get("content")
+    if not isinstance(content, str):
+        return None
+    if "base64" in image_format:
+        return ("base64", image_format, content)
+    if image_format == "path":
+        try:
+            stat = os.stat(content)
+        except OSError:
+            return None
+        return ("path", os.path.abspath(content), stat.st_mtime_ns, stat.st_size)
+    return None
+
+
+def _size(value):
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class ImageCache:
+    """
+    Things derived from images (data URLs, descriptions, OCR text), computed once per image.
+
+    Each artifact is stored under the image's key and an artifact name, so the same
+    screenshot sent twice, or an image kept in the history across turns, is only
+    processed the first time. Least recently used entries are dropped past `max_entries`
+    or once the cached values and base64 keys add up to more than `max_bytes`; a single
+    value larger than `max_bytes` is returned without being cached.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.computed = 0  # Artifacts actually computed, rather than reused
+
+    def get(self, message, artifact, compute):
+        """
+        The `artifact` for this image, calling `compute()` only if it isn't cached.
+        Errors from `compute` propagate and nothing is cached.
+        """
+        key = image_key(message)
+        if key is None:
+            self.computed += 1
+            return compute()
+
+        key = (artifact, key)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+        value = compute()
+        self.computed += 1
+        # Base64 keys hold the whole image, so they count against the budget too.
+        size = _size(value) + (_size(key[1][2]) if key[1][0] == "base64" else 0)
+        if size > self.max_bytes:
+            return value
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+        return value
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
@@ -0,0 +1,54 @@
+import threading
+
+import litellm
+
+_capabilities = {}
+_lock = threading.Lock()
+
+
+def _probe(check, model):
+    try:
+        return check(model)
+    except:
+        return None
+
+
+def _probe_capabilities(model):
+    """
+    Ask litellm what it knows about `model`. Anything litellm can't answer is None.
+    """
+    supports_functions = _probe(litellm.supports_function_calling, model)
+    supports_vision = _probe(litellm.supports_vision, model)
+    model_info = _probe(lambda model: litellm.get_model_info(model=model), model)
+    return {
+        "supports_functions": bool(supports_functions),
+        "supports_vision": bool(supports_vision),
+        "model_info": model_info,
+    }
+
+
+def get_model_capabilities(model, api_base=None, refresh=False):
+    """
+    What litellm reports `model` supports, probed once per (model, api_base) per process.
+
+    Probing walks litellm's model map, so the result is kept for the session. Pass
+    `refresh=True` (or call `clear_model_capabilities`) to probe again, e.g. after
+    updating litellm's model map.
+    """
+    key = (model, api_base)
+    with _lock:
+        if not refresh and key in _capabilities:
+            return _capabilities[key]
+    capabilities = _probe_capabilities(model)
+    with _lock:
+        _capabilities[key] = capabilities
+    return capabilities
+
+
+def clear_model_capabilities(model=None, api_base=None):
+    """Forget probed capabilities for one (model, api_base), or for every model."""
+    with _lock:
+        if model is None:
+            _capabilities.clear()
+        else:
+            _capabilities.pop((model, api_base), None)
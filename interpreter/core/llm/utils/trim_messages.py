@@ -0,0 +1,155 @@
+from collections import OrderedDict
+
+from tokentrim.model_map import MODEL_MAX_TOKENS
+
+# Not part of tokentrim's public API; requirements.txt pins tokentrim exactly for them.
+from tokentrim.tokentrim import get_encoding, shorten_message_to_fit_limit
+
+
+def _token_profile(model):
+    """
+    The model tokentrim counts as, and its (tokens_per_message, tokens_per_name).
+    """
+    if model is None:
+        return None, 4, 2
+    if model in {
+        "gpt-3.5-turbo-0613",
+        "gpt-3.5-turbo-16k-0613",
+        "gpt-4-0314",
+        "gpt-4-32k-0314",
+        "gpt-4-0613",
+        "gpt-4-32k-0613",
+    }:
+        return model, 3, 1
+    if model == "gpt-3.5-turbo-0301":
+        return model, 4, -1
+    if "gpt-3.5-turbo" in model:
+        return _token_profile("gpt-3.5-turbo-0613")
+    if "gpt-4" in model:
+        return _token_profile("gpt-4-0613")
+    return model, 4, 2
+
+
+class TokenCounter:
+    """
+    Counts tokens the way tokentrim does, remembering the count of each message.
+
+    tokentrim's total for a list of messages is the sum of a per-message count plus 3,
+    so counts can be cached per message (keyed by its content) and summed. Only messages
+    that are new or changed get tokenized.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._counts = OrderedDict()
+        self._encodings = {}
+        self.tokenized = 0  # Messages actually run through the tokenizer
+
+    def _encoding(self, model):
+        if model not in self._encodings:
+            self._encodings[model] = get_encoding(model)
+        return self._encodings[model]
+
+    def count(self, message, model=None):
+        """Tokens for one message, excluding the 3 tokentrim adds once per list."""
+        model, tokens_per_message, tokens_per_name = _token_profile(model)
+        items = tuple(
+            (key, value if isinstance(value, str) else str(value))
+            for key, value in message.items()
+        )
+        key = (model, items)
+        count = self._counts.get(key)
+        if count is not None:
+            self._counts.move_to_end(key)
+            return count
+
+        encoding = self._encoding(model)
+        count = tokens_per_message
+        for name, value in items:
+            try:
+                count += len(encoding.encode(value))
+                if name == "name":
+                    count += tokens_per_name
+            except:
+                print(f"Failed to parse '{name}'.")
+        self.tokenized += 1
+
+        self._counts[key] = count
+        if len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+        return count
+
+    def total(self, messages, model=None):
+        return sum(self.count(message, model) for message in messages) + 3
+
+
+def trim_messages(
+    messages,
+    counter,
+    model=None,
+    system_message=None,
+    trim_ratio=0.75,
+    max_tokens=None,
+):
+    """
+    Same result as `tokentrim.trim`, using `counter`'s cached per-message counts.
+
+    Keeps the most recent messages that fit in `max_tokens` (or `trim_ratio` of the
+    model's limit), shortening the oldest one that only partly fits. Messages are
+    never modified in place.
+    """
+    if max_tokens == None:
+        # Check if model is valid
+        if model not in MODEL_MAX_TOKENS:
+            raise ValueError(f"Invalid model: {model}. Specify max_tokens instead")
+
+        max_tokens = int(MODEL_MAX_TOKENS[model] * trim_ratio)
+
+    # Deduct the system message tokens from the max_tokens if system message exists
+    if system_message:
+        system_message_event = {"role": "system", "content": system_message}
+        system_message_tokens = counter.total([system_message_event], model)
+
+        if system_message_tokens > max_tokens:
+            print(
+                "`tokentrim`: Warning, system message exceeds token limit, which is probably undesired. Trimming..."
+            )
+
+            shorten_message_to_fit_limit(system_message_event, max_tokens, model)
+            system_message_tokens = counter.total([system_message_event], model)
+
+        # tokentrim deducts this twice; so do we, so the same messages survive trimming
+        max_tokens -= system_message_tokens
+        max_tokens -= system_message_tokens
+
+    # Walk from the newest message back, collecting (newest first) what fits
+    kept = []
+    kept_tokens = 3
+    for message in reversed(messages):
+        message_tokens = counter.count(message, model)
+
+        if message_tokens + kept_tokens <= max_tokens:
+            kept.append(message)
+            kept_tokens += message_tokens
+            continue
+
+        tokens_remaining = max_tokens - kept_tokens
+
+        # If adding the next message exceeds the token limit, try trimming it
+        # (This only works for non-function call messages)
+        if "function_call" not in message:
+            message = dict(message)
+            shorten_message_to_fit_limit(message, tokens_remaining, model)
+
+        # If the trimmed message can fit, add it (tokentrim counts it as its own list, so +3 again)
+        if counter.count(message, model) + 3 + kept_tokens <= max_tokens:
+            kept.append(message)
+
+        break
+
+    kept.reverse()
+
+    if system_message:
+        kept = [system_message_event] + kept
+
+    return kept
@@ -0,0 +1,157 @@
+"""
+Append-only storage for conversation history.
+
+A journal is a JSON Lines file. Each line either sets the message at an index,
+`{"i": 3, "m": {...}}` (appending when the index is the current length), or
+truncates the conversation, `{"n": 2}`. Saving writes only messages that are
+new or changed since the last save, and the file is compacted (rewritten with
+one line per message) once superseded lines outnumber live ones.
+
+Conversations saved before journals existed are single `.json` files holding
+the message list; `load_conversation` reads both.
+"""
+
+import json
+import os
+
+JOURNAL_EXTENSION = ".jsonl"
+LEGACY_EXTENSION = ".json"
+CONVERSATION_EXTENSIONS = (LEGACY_EXTENSION, JOURNAL_EXTENSION)
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+
+def is_conversation_file(filename):
+    return filename.lower().endswith(CONVERSATION_EXTENSIONS)
+
+
+def conversation_name(filename):
+    """The filename without its conversation extension."""
+    for extension in (JOURNAL_EXTENSION, LEGACY_EXTENSION):
+        if filename.lower().endswith(extension):
+            return filename[: -len(extension)]
+    return filename
+
+
+def replay_journal(lines):
+    messages = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # A line cut short by a crash mid-write; everything before it is intact.
+            break
+        if "n" in record:
+            del messages[record["n"] :]
+        elif record["i"] < len(messages):
+            messages[record["i"]] = record["m"]
+        else:
+            messages.append(record["m"])
+    return messages
+
+
+def load_conversation(path):
+    """Load a conversation from a journal or a legacy JSON file."""
+    with open(path, "r") as f:
+        if path.lower().endswith(JOURNAL_EXTENSION):
+            return replay_journal(f)
+        return json.load(f)
+
+
+class ConversationJournal:
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        # A legacy .json file this journal replaces; removed after the first save.
+        self.legacy_path = legacy_path
+        self._hashes = []
+        # Per message, its items when every value is immutable, so an unchanged
+        # message is skipped without serializing it again.
+        self._snapshots = []
+        self._records = 0
+        self._needs_compaction = False
+        self.bytes_written = 0
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                lines = f.readlines()
+            self._records = len(lines)
+            # Appending after a torn last line would corrupt the next record too.
+            self._needs_compaction = bool(lines) and not lines[-1].endswith("\n")
+            self._hashes = [
+                hash(self._serialize(message)) for message in replay_journal(lines)
+            ]
+            self._snapshots = [None] * len(self._hashes)
+
+    @staticmethod
+    def _serialize(message):
+        return json.dumps(message, separators=(",", ":"))
+
+    @staticmethod
+    def _snapshot(message):
+        items = tuple(message.items())
+        if all(isinstance(value, _IMMUTABLE) for _, value in items):
+            return items
+        return None
+
+    def save(self, messages):
+        """Append whatever changed since the last save."""
+        if self.legacy_path or self._needs_compaction or not os.path.exists(self.path):
+            self.compact(messages)
+            return
+
+        lines = []
+        if len(messages) < len(self._hashes):
+            lines.append(json.dumps({"n": len(messages)}))
+            del self._hashes[len(messages) :]
+            del self._snapshots[len(messages) :]
+        for index, message in enumerate(messages):
+            snapshot = self._snapshot(message)
+            if index < len(self._snapshots):
+                if snapshot is not None and snapshot == self._snapshots[index]:
+                    continue
+                self._snapshots[index] = snapshot
+            else:
+                self._snapshots.append(snapshot)
+            serialized = self._serialize(message)
+            digest = hash(serialized)
+            if index < len(self._hashes):
+                if self._hashes[index] == digest:
+                    continue
+                self._hashes[index] = digest
+            else:
+                self._hashes.append(digest)
+            lines.append(f'{{"i":{index},"m":{serialized}}}')
+
+        if not lines:
+            return
+        if self._records + len(lines) > 2 * len(messages) + 32:
+            self.compact(messages)
+            return
+        data = "\n".join(lines) + "\n"
+        with open(self.path, "a") as f:
+            f.write(data)
+        self._records += len(lines)
+        self.bytes_written += len(data)
+
+    def compact(self, messages):
+        """Rewrite the journal with one line per message."""
+        serialized = [self._serialize(message) for message in messages]
+        data = "".join(
+            f'{{"i":{index},"m":{message}}}\n' for index, message in enumerate(serialized)
+        )
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as f:
+            f.write(data)
+        os.replace(temporary_path, self.path)
+        self._hashes = [hash(message) for message in serialized]
+        self._snapshots = [self._snapshot(message) for message in messages]
+        self._records = len(serialized)
+        self._needs_compaction = False
+        self.bytes_written += len(data)
+
+        if self.legacy_path:
+            if os.path.exists(self.legacy_path):
+                os.remove(self.legacy_path)
+            self.legacy_path = None
@@ -0,0 +1,168 @@
+from collections import deque
+
+from .truncate_output import truncation_message
+
+
+class StreamingMessage(dict):
+    """
+    An LMC message whose `content` is assembled from streamed chunks.
+
+    Chunks are kept in a list and only joined when the content is read, so building
+    a long message costs time linear in its length rather than quadratic. With
+    `max_output` set (console output), only the tail that can survive truncation is
+    kept, and the content reads exactly as if `truncate_output` had run after every chunk.
+
+    Bytes content (audio streamed in by a client) is accumulated the same way, without
+    truncation.
+
+    It is still a dict: reading it by key, iterating, copying or serializing it all
+    see the assembled content.
+    """
+
+    def __init__(self, message, max_output=None, add_scrollbars=False):
+        super().__init__(message)
+        self.max_output = max_output
+        self._prefix = (
+            truncation_message(max_output, add_scrollbars)
+            if max_output is not None
+            else None
+        )
+        self._set_content(dict.get(self, "content", ""))
+
+    def _set_content(self, value):
+        self._dirty = False
+        if not isinstance(value, (str, bytes)):
+            # Lists, None... are stored as-is and appended to directly.
+            self._parts = None
+            return
+        self._empty = value[:0]
+        self._truncated = False
+        if self._prefix and isinstance(value, str) and value.startswith(self._prefix):
+            value = value[len(self._prefix) :]
+            self._truncated = True
+        self._parts = deque([value])
+        self._length = len(value)
+        self._trim()
+        self._dirty = self._truncated
+
+    def _trim(self):
+        if self.max_output is None or isinstance(self._empty, bytes):
+            return
+        if self._length > self.max_output:
+            self._truncated = True
+        # Drop whole chunks that fall outside the last `max_output` characters.
+        while len(self._parts) > 1 and self._length - len(self._parts[0]) >= self.max_output:
+            self._length -= len(self._parts.popleft())
+
+    def append(self, text):
+        if self._parts is None:
+            dict.__setitem__(self, "content", dict.__getitem__(self, "content") + text)
+            return
+        self._parts.append(text)
+        self._length += len(text)
+        self._dirty = True
+        self._trim()
+
+    def _materialize(self):
+        if not self._dirty:
+            return
+        data = self._empty.join(self._parts)
+        if self._truncated:
+            data = data[-self.max_output :]
+            content = self._prefix + data
+        else:
+            content = data
+        self._parts = deque([data])
+        self._length = len(data)
+        self._dirty = False
+        dict.__setitem__(self, "content", content)
+
+    def __getitem__(self, key):
+        if key == "content":
+            self._materialize()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key == "content":
+            self._materialize()
+        return dict.get(self, key, default)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        if key == "content":
+            self._set_content(value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        if key == "content":
+            self._forget_content()
+
+    def _forget_content(self):
+        # The content left the dict; a later `append` fails like `+=` on a missing key.
+        self._parts = None
+        self._dirty = False
+
+    def pop(self, key, *default):
+        if key == "content":
+            self._materialize()
+            had_content = dict.__contains__(self, key)
+            value = dict.pop(self, key, *default)
+            if had_content:
+                self._forget_content()
+            return value
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self._materialize()
+        key, value = dict.popitem(self)
+        if key == "content":
+            self._forget_content()
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if not dict.__contains__(self, key):
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        dict.clear(self)
+        self._forget_content()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __iter__(self):
+        self._materialize()
+        return dict.__iter__(self)
+
+    def items(self):
+        self._materialize()
+        return dict.items(self)
+
+    def values(self):
+        self._materialize()
+        return dict.values(self)
+
+    def copy(self):
+        self._materialize()
+        return dict(dict.items(self))
+
+    def __eq__(self, other):
+        self._materialize()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self._materialize()
+        return dict.__ne__(self, other)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Pickled and deep-copied messages come back as plain dicts.
+        self._materialize()
+        return (dict, (dict(dict.items(self)),))
+
+    def __repr__(self):
+        self._materialize()
+        return dict.__repr__(self)
@@ -1,9 +1,4 @@
-def truncate_output(data, max_output_chars=2800, add_scrollbars=False):
-    # if "@@@DO_NOT_TRUNCATE@@@" in data:
-    #     return data
-
-    needs_truncation = False
-
+def truncation_message(max_output_chars=2800, add_scrollbars=False):
     message = f"Output truncated. Showing the last {max_output_chars} characters. You should try again and use computer.ai.summarize(output) over the output, or break it down into smaller steps.\n\n"
 
     # This won't work because truncated code is stored in interpreter.messages :/
@@ -14,6 +9,16 @@ def truncate_output(data, max_output_chars=2800, add_scrollbars=False):
             + f" Run `get_last_output()[0:{max_output_chars}]` to see the first page.\n\n"
         )
     # Then we have code in `terminal.py` which makes that function work. It should be a computer tool though to just access messages IMO. Or like, self.messages.
+    return message
+
+
+def truncate_output(data, max_output_chars=2800, add_scrollbars=False):
+    # if "@@@DO_NOT_TRUNCATE@@@" in data:
+    #     return data
+
+    needs_truncation = False
+
+    message = truncation_message(max_output_chars, add_scrollbars)
 
     # Remove previous truncation message if it exists
     if data.startswith(message):
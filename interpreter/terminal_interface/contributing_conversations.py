@@ -6,6 +6,10 @@ from typing import List, TypedDict
 import pkg_resources
 import requests
 
+from interpreter.core.utils.conversation_journal import (
+    is_conversation_file,
+    load_conversation,
+)
 from interpreter.terminal_interface.profiles.profiles import write_key_to_profile
 from interpreter.terminal_interface.utils.display_markdown_message import (
     display_markdown_message,
@@ -144,8 +148,7 @@ def write_to_contribution_cache(contribution_cache: ContributionCache):
 
 def get_all_conversations(interpreter) -> List[List]:
     def is_conversation_path(path: str):
-        _, ext = os.path.splitext(path)
-        return ext == ".json"
+        return is_conversation_file(path)
 
     history_path = interpreter.conversation_history_path
     all_conversations: List[List] = []
@@ -156,9 +159,8 @@ def get_all_conversations(interpreter) -> List[List]:
         if not is_conversation_path(mpath):
             continue
         full_path = os.path.join(history_path, mpath)
-        with open(full_path, "r") as cfile:
-            conversation = json.load(cfile)
-            all_conversations.append(conversation)
+        conversation = load_conversation(full_path)
+        all_conversations.append(conversation)
     return all_conversations
 
 
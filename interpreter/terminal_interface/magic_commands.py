@@ -5,6 +5,7 @@ import sys
 import time
 from datetime import datetime
 
+from ..core.utils.conversation_journal import conversation_name
 from ..core.utils.system_debug_info import system_info
 from .utils.count_tokens import count_messages_tokens
 from .utils.export_to_markdown import export_to_markdown
@@ -305,7 +306,9 @@ def markdown(self, export_path: str):
 
     # If user doesn't specify the export path, then save the exported PDF in '~/Downloads'
     if not export_path:
-        export_path = get_downloads_path() + f"/{self.conversation_filename[:-4]}md"
+        export_path = (
+            get_downloads_path() + f"/{conversation_name(self.conversation_filename)}.md"
+        )
 
     export_to_markdown(self.messages, export_path)
 
@@ -19,11 +19,15 @@ from config import SRC_LOG_LEVELS,JARVIS_DIR
 import sqlite3
 import scipy.io.wavfile
 from datetime import datetime
+import hashlib
+import json
 import os
+import threading
+import time
+import zlib
 import logging
 import numpy as np
-from scipy.signal import butter, filtfilt, lfilter
-import librosa
+from jarvis_integration.audio.tts_providers.effects import apply_robotic_filter, lower_pitch
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["AUDIO"])
@@ -74,30 +78,126 @@ def download_bark():
         raise RuntimeError("Model download failed")
 
 
-def apply_robotic_filter(audio, sample_rate):
-    """Applies a robotic effect using a low-pass filter and pre-emphasis."""
-    # Low-pass filter (softens high frequencies for a more robotic sound)
-    cutoff = 2500  # Slightly lower cutoff for a more digital tone
-    nyquist = 0.5 * sample_rate
-    normal_cutoff = cutoff / nyquist
-    b, a = butter(6, normal_cutoff, btype='low', analog=False)
-    filtered_audio = filtfilt(b, a, audio)
+class AudioCache:
+    """
+    Persistent SQLite cache of synthesized audio.
 
-    # Pre-emphasis filter to enhance clarity
-    pre_emphasis = 0.97
-    emphasized_audio = lfilter([1, -pre_emphasis], [1], filtered_audio)
+    Rows are keyed by a hash of the normalized text, the voice, the model and the
+    post-processing options, stored zlib-compressed and evicted least recently used
+    first once the total compressed size exceeds ``max_bytes``. A single connection
+    is kept open for the lifetime of the cache.
+    """
 
-    # Normalize volume
-    emphasized_audio = emphasized_audio / np.max(np.abs(emphasized_audio))
+    def __init__(self, db_path, max_bytes=256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tts_audio_cache (
+                key TEXT PRIMARY KEY,
+                audio BLOB NOT NULL,
+                dtype TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tts_audio_cache_last_access ON tts_audio_cache (last_access)"
+        )
+        self._drop_legacy_table()
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM tts_audio_cache"
+        ).fetchone()[0]
+
+    def _drop_legacy_table(self):
+        """
+        Remove the text-keyed ``audio_cache`` table older versions wrote to this DB.
+
+        Its rows can't be carried over: they were stored as float64 and read back as
+        float32, so the audio in them is unusable. Runs once; the table is gone after.
+        """
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audio_cache'"
+        ).fetchone()
+        if exists:
+            log.info("Dropping the legacy audio_cache table.")
+            self._conn.execute("DROP TABLE audio_cache")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    @staticmethod
+    def make_key(text, voice, model, options=None):
+        """
+        Build the cache key from the text and everything that shapes the audio.
+
+        Only whitespace is normalized: Bark reads capitals as emphasis, so texts that
+        differ in case sound different and are cached separately.
+        """
+        normalized = " ".join(text.split())
+        payload = json.dumps(
+            {"text": normalized, "voice": voice, "model": model, "options": options or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT audio, dtype FROM tts_audio_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE tts_audio_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return np.frombuffer(zlib.decompress(row[0]), dtype=row[1])
 
-    return emphasized_audio
+    def put(self, key, audio):
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        blob = zlib.compress(audio.tobytes(), 6)
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM tts_audio_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tts_audio_cache (key, audio, dtype, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, blob, audio.dtype.str, len(blob), time.time()),
+            )
+            self._total_bytes += len(blob) - (previous[0] if previous else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used rows until the cache fits its byte budget."""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM tts_audio_cache ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM tts_audio_cache WHERE key = ?", (key,))
+                self._total_bytes -= size
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
 
-def lower_pitch(audio, sr, semitones=-4):
-    """Lowers the pitch of the audio by a specified number of semitones."""
-    return librosa.effects.pitch_shift(audio, sr=sr, n_steps=semitones)
 
 class BarkTTS(BaseText2Speech):
-    def __init__(self, device="cpu"):
+    def __init__(self, device="cpu", cache_max_bytes=None):
         """Initialize the BarkTTS class with a database for caching audio."""
         super().__init__()
         path = os.path.join(JARVIS_DIR, "config", "model", "bark")
@@ -112,57 +212,93 @@ class BarkTTS(BaseText2Speech):
 
         self.seed = 42  # Fixed seed for consistency
         self.db_path = os.path.join(JARVIS_DIR,"data","audio_cache.db")
+        self.prompt_cache_path = os.path.join(JARVIS_DIR, "data", "bark_voice_prompts.json")
         self.device = device
-        self._init_db()
-
-    def _init_db(self):
-        """Initialize SQLite database with a table to cache audio."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS audio_cache (
-                    text TEXT PRIMARY KEY,
-                    audio BLOB
-                )
-                """
-            )
-            conn.commit()
+        self._voice_prompts = self._load_voice_prompts()
+        if cache_max_bytes is None:
+            cache_max_bytes = int(os.getenv("TTS_AUDIO_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        self.audio_cache = AudioCache(self.db_path, max_bytes=cache_max_bytes)
+        # Everything besides text and voice that changes the cached waveform.
+        self.post_processing = {"robotic_filter": {"cutoff": 2500, "order": 6, "pre_emphasis": 0.97}}
+
+    def _model_version(self):
+        """Identify the loaded checkpoint so cached prompts are dropped when it changes."""
+        config = self.model.config
+        return getattr(config, "_commit_hash", None) or getattr(config, "_name_or_path", "bark")
+
+    def _voice_prompt_key(self, voice_description):
+        key = f"{self._model_version()}|{self.seed}|{voice_description}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _load_voice_prompts(self):
+        """Load the persisted voice prompt lengths, ignoring an unreadable file."""
+        try:
+            with open(self.prompt_cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning(f"Ignoring unreadable voice prompt cache: {e}")
+            return {}
 
-    def _get_voice_description_length(self):
-        """Generate and return length of the voice description audio in samples."""
+    def _save_voice_prompts(self):
+        try:
+            os.makedirs(os.path.dirname(self.prompt_cache_path), exist_ok=True)
+            tmp_path = self.prompt_cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._voice_prompts, f)
+            os.replace(tmp_path, self.prompt_cache_path)
+        except OSError as e:
+            log.warning(f"Could not persist voice prompt cache: {e}")
+
+    def _get_voice_description_length(self, voice_description=None):
+        """
+        Return the length in samples of the voice description audio.
+
+        The description is only synthesized the first time a voice is used with
+        a given model; the length is then kept in memory and on disk.
+        """
+        voice_description = voice_description or self.voice_description
+        key = self._voice_prompt_key(voice_description)
+        cached = self._voice_prompts.get(key)
+        if cached is not None:
+            return cached["samples"]
+
+        log.info("Generating voice description prompt...")
         torch.manual_seed(self.seed)
         inputs = self.processor(
-            text=[self.voice_description], return_tensors="pt"
+            text=[voice_description], return_tensors="pt"
         ).to(self.device)
         speech_values = self.model.generate(**inputs, do_sample=True)
-        return speech_values.shape[-1]
+        samples = int(speech_values.shape[-1])
+        self._voice_prompts[key] = {"samples": samples, "model": self._model_version()}
+        self._save_voice_prompts()
+        return samples
+
+    def _cache_key(self, text, voice_description):
+        return AudioCache.make_key(text, voice_description, self._model_version(), self.post_processing)
 
-    def _fetch_cached_audio(self, text):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT audio FROM audio_cache WHERE text = ?", (text,))
-            result = cursor.fetchone()
-            return np.frombuffer(result[0], dtype=np.float32) if result else None
+    def _fetch_cached_audio(self, text, voice_description=None):
+        return self.audio_cache.get(self._cache_key(text, voice_description or self.voice_description))
 
-    def synthesize(self, text: str):
+    def synthesize(self, text: str, voice: str = None):
         """
         Synthesize speech for the given text, retrieving from cache if available
         or generating and caching if not.
+
+        ``voice`` overrides the default voice description for this call.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT audio FROM audio_cache WHERE text = ?", (text,))
-            result = cursor.fetchone()
-            if result:
-                log.info(f"Audio for '{text}' retrieved from cache.")
-                processed_audio = np.frombuffer(result[0], dtype=np.float32)
-                return processed_audio, self.model.generation_config.sample_rate
+        voice_description = voice or self.voice_description
+        cache_key = self._cache_key(text, voice_description)
+        processed_audio = self.audio_cache.get(cache_key)
+        if processed_audio is not None:
+            log.info(f"Audio for '{text}' retrieved from cache.")
+            return processed_audio, self.model.generation_config.sample_rate
 
         # Generate new audio if not cached
         log.info(f"Generating audio for '{text}'...")
-        N = self._get_voice_description_length()
-        combined_text = self.voice_description + text
+        N = self._get_voice_description_length(voice_description)
+        combined_text = voice_description + text
         log.info(f"Generating audio for '{combined_text}'")
         torch.manual_seed(self.seed)
         inputs = self.processor(text=[combined_text], return_tensors="pt").to(self.device)
@@ -175,11 +311,8 @@ class BarkTTS(BaseText2Speech):
 
         # Apply robotic effect
         processed_audio = apply_robotic_filter(trimmed_audio, self.model.generation_config.sample_rate)
-        # Store in cache
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO audio_cache (text, audio) VALUES (?, ?)", (text, processed_audio.tobytes()))
-            conn.commit()
+        processed_audio = processed_audio.astype(np.float32)
+        self.audio_cache.put(cache_key, processed_audio)
 
         log.info(f"Audio for '{text}' generated and cached.")
         return processed_audio, self.model.generation_config.sample_rate
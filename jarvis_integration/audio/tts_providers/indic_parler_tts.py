@@ -13,13 +13,11 @@
 # limitations under the License.
 
 import os
-import torch
+import threading
 import logging
 from config import JARVIS_DIR
 from jarvis_integration.audio.tts_providers.BaseTTS import BaseText2Speech
-from transformers import AutoTokenizer
 from config import SRC_LOG_LEVELS
-from parler_tts import ParlerTTSForConditionalGeneration
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["AUDIO"])
@@ -44,20 +42,95 @@ def download_parlertts():
         log.info("Model already downloaded.")
 
 class Indic_Parler_TTS(BaseText2Speech):
-    def __init__(self):
+    """
+    Indic Parler TTS provider.
+
+    The model and tokenizers are loaded on the first synthesis (or by
+    :meth:`prewarm`) rather than at construction, and are released again after
+    ``idle_unload_seconds`` without use. ``quantize`` loads a dynamically
+    quantized int8 model when running on the CPU.
+    """
+
+    def __init__(self, device=None, idle_unload_seconds=None, quantize=None):
             super().__init__()
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            local_path = os.path.join(JARVIS_DIR, "config", "model", "parler-tts")
+            self.device = device
+            self.local_path = os.path.join(JARVIS_DIR, "config", "model", "parler-tts")
+            if idle_unload_seconds is None:
+                idle_unload_seconds = float(os.getenv("PARLER_TTS_IDLE_UNLOAD", 0))
+            self.idle_unload_seconds = idle_unload_seconds
+            if quantize is None:
+                quantize = os.getenv("PARLER_TTS_QUANTIZE", "false").lower() in ("1", "true", "yes")
+            self.quantize = quantize
+            self.model = None
+            self.tokenizer = None
+            self.desc_tokenizer = None
+            self._load_lock = threading.RLock()
+            self._unload_timer = None
+
+    @property
+    def is_loaded(self):
+        return self.model is not None
 
-            # Load model and tokenizers
-            self.model = ParlerTTSForConditionalGeneration.from_pretrained(local_path).to(self.device)
-            self.tokenizer = AutoTokenizer.from_pretrained(local_path)
+    def load(self):
+        """Load the model and tokenizers if they are not loaded yet."""
+        with self._load_lock:
+            if self.model is not None:
+                return
+            import torch
+            from transformers import AutoTokenizer
+            from parler_tts import ParlerTTSForConditionalGeneration
+
+            if self.device is None:
+                self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+            model = ParlerTTSForConditionalGeneration.from_pretrained(self.local_path)
+            if self.quantize and self.device == "cpu":
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                log.info("Indic_Parler_TTS using dynamically quantized int8 weights.")
+            self.model = model.to(self.device)
+            self.tokenizer = AutoTokenizer.from_pretrained(self.local_path)
             self.desc_tokenizer = AutoTokenizer.from_pretrained(self.model.config.text_encoder._name_or_path)
 
             log.info("Indic_Parler_TTS model loaded.")
             if self.device == "cuda":
                 log.info(f"GPU memory allocated: {torch.cuda.memory_allocated() / (1024 ** 3):.2f} GB")
 
+    def prewarm(self):
+        """Load the model on a background thread so the first utterance does not wait for it."""
+        def _load():
+            try:
+                self.load()
+                self._schedule_unload()
+            except Exception as e:
+                log.error(f"Indic_Parler_TTS pre-warm failed: {e}")
+
+        thread = threading.Thread(target=_load, name="parler-tts-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def unload(self):
+        """Free the model and tokenizers; the next synthesis loads them again."""
+        with self._load_lock:
+            if self.model is None:
+                return
+            self.model = None
+            self.tokenizer = None
+            self.desc_tokenizer = None
+            if self.device == "cuda":
+                import torch
+                torch.cuda.empty_cache()
+            log.info("Indic_Parler_TTS model unloaded after idle timeout.")
+
+    def _schedule_unload(self):
+        if not self.idle_unload_seconds:
+            return
+        with self._load_lock:
+            if self._unload_timer is not None:
+                self._unload_timer.cancel()
+            self._unload_timer = threading.Timer(self.idle_unload_seconds, self.unload)
+            self._unload_timer.daemon = True
+            self._unload_timer.start()
+
     def synthesize(self, text: str):
         """Synthesize speech from text with a fixed English description."""
         # Fixed English description for voice conditioning
@@ -65,19 +138,26 @@ class Indic_Parler_TTS(BaseText2Speech):
                     The speech is clear, authoritative, and measured, delivered with a controlled pace 
                     and even tone, resembling a highly intelligent AI assistant."""
 
-        # Tokenize with max_length to limit memory usage
-        input_ids = self.desc_tokenizer(
-            description, return_tensors="pt", truncation=True
-        ).input_ids.to(self.device)
-        prompt_input_ids = self.tokenizer(
-            text, return_tensors="pt", truncation=True
-        ).input_ids.to(self.device)
+        with self._load_lock:
+            self.load()
+            if self._unload_timer is not None:
+                self._unload_timer.cancel()
+
+            # Tokenize with max_length to limit memory usage
+            input_ids = self.desc_tokenizer(
+                description, return_tensors="pt", truncation=True
+            ).input_ids.to(self.device)
+            prompt_input_ids = self.tokenizer(
+                text, return_tensors="pt", truncation=True
+            ).input_ids.to(self.device)
 
-        # Generate audio
-        generation = self.model.generate(input_ids=input_ids, prompt_input_ids=prompt_input_ids)
-        audio_arr = generation.cpu().numpy().squeeze().astype('float32')
+            # Generate audio
+            generation = self.model.generate(input_ids=input_ids, prompt_input_ids=prompt_input_ids)
+            audio_arr = generation.cpu().numpy().squeeze().astype('float32')
+            sampling_rate = self.model.config.sampling_rate
 
-        return audio_arr, self.model.config.sampling_rate
+        self._schedule_unload()
+        return audio_arr, sampling_rate
 
     def detect_language(self, text: str) -> str:
         """Detect the language of the input text."""
@@ -0,0 +1,142 @@
+"""
+Shared test setup.
+
+torch and transformers are heavy and only needed for real models, so when they are
+not installed they are replaced by bare stand-ins before any test imports a module
+that does ``import torch`` at the top. Tests inject their own fake models.
+
+Run from the repository root with ``python -m pytest tests`` (tests/pytest.ini sets
+the root as the import path).
+"""
+import importlib.util
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import types
+
+import nltk
+import pytest
+
+
+def _stub_module(name, **attributes):
+    """Install a bare module under ``name`` if it can't be imported; returns whether it did."""
+    if name in sys.modules or importlib.util.find_spec(name) is not None:
+        return False
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return True
+
+
+class _Unavailable:
+    """Placeholder for a model class; tests patch in fakes where one is needed."""
+
+    @classmethod
+    def from_pretrained(cls, *args, **kwargs):
+        raise RuntimeError(f"{cls.__name__} is a test stand-in")
+
+
+if _stub_module(
+    "torch",
+    # scipy probes ``torch.Tensor`` whenever torch is importable
+    Tensor=type("Tensor", (), {}),
+    manual_seed=lambda seed: None,
+):
+    sys.modules["torch"].cuda = sys.modules["torch.cuda"] = types.ModuleType("torch.cuda")
+    sys.modules["torch.cuda"].is_available = lambda: False
+_stub_module(
+    "transformers",
+    AutoProcessor=type("AutoProcessor", (_Unavailable,), {}),
+    AutoModel=type("AutoModel", (_Unavailable,), {}),
+    pipeline=lambda *args, **kwargs: _Unavailable.from_pretrained(),
+)
+
+
+try:
+    import sounddevice  # noqa: F401
+except (ImportError, OSError):
+    # Not installed, or installed without the PortAudio library; tests use fake players
+    sys.modules["sounddevice"] = types.SimpleNamespace(
+        play=lambda *args, **kwargs: None,
+        wait=lambda *args, **kwargs: None,
+        stop=lambda *args, **kwargs: None,
+    )
+
+
+def _ensure_stopwords():
+    """BaseTTS reads NLTK's English stopwords at import; supply a few if they aren't downloaded."""
+    try:
+        nltk.data.find("corpora/stopwords")
+        return
+    except LookupError:
+        pass
+    root = tempfile.mkdtemp(prefix="nltk_data_")
+    corpus = os.path.join(root, "corpora", "stopwords")
+    os.makedirs(corpus)
+    with open(os.path.join(corpus, "english"), "w") as f:
+        f.write("\n".join(["a", "an", "and", "the", "is", "are", "of", "to", "in"]))
+    nltk.data.path.insert(0, root)
+
+
+_ensure_stopwords()
+
+
+@pytest.fixture(autouse=True)
+def _no_log_files():
+    """
+    Importing ``config`` sends every log record to the app's own logs/app.log. Drop
+    such handlers so test runs don't write to it; pytest still captures the records.
+    """
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, logging.FileHandler):
+            root.removeHandler(handler)
+            handler.close()
+
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _done_completions(**params):
+    yield {"choices": [{"delta": {"content": "Done."}}]}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """
+    An AsyncInterpreter serving websockets on a free local port, with a text-only fake
+    LLM. Replace ``server.llm.completions`` before connecting; sessions copy it.
+    """
+    monkeypatch.setenv("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    monkeypatch.setenv("INTERPRETER_REQUIRE_AUTH", "False")
+    from interpreter import AsyncInterpreter
+
+    interpreter = AsyncInterpreter(disable_telemetry=True, import_computer_api=False)
+    interpreter.offline = True
+    interpreter.conversation_history = False
+    interpreter.llm.supports_functions = False
+    interpreter.llm.supports_vision = False
+    interpreter.llm.context_window = 100000
+    interpreter.llm.max_tokens = 1000
+    interpreter.llm.completions = _done_completions
+    interpreter.server.host = "127.0.0.1"
+    interpreter.server.port = free_port()
+
+    thread = threading.Thread(target=interpreter.server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 30
+    while not interpreter.server.uvicorn_server.started:
+        assert time.time() < deadline, "server didn't start"
+        time.sleep(0.05)
+    yield interpreter
+    interpreter.server.uvicorn_server.should_exit = True
+    thread.join(timeout=10)
+    interpreter.sessions.shutdown()
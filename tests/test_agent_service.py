@@ -0,0 +1,153 @@
+import threading
+from queue import Full
+from types import SimpleNamespace
+
+import pytest
+from PyQt5.QtCore import Qt
+
+from gui.Objects.AgentService import AgentService
+from gui.Objects.AgentWorker import AgentWorker
+
+
+class FakeAgent:
+    """Replies "reply to <text>"; requests in ``hold`` block until ``release`` is set."""
+
+    def __init__(self, hold=()):
+        self.hold = set(hold)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.handled = []
+
+    def get_agent(self, user_input, image=None):
+        self.handled.append(user_input)
+        if user_input in self.hold:
+            self.started.set()
+            self.release.wait(5)
+        return f"reply to {user_input}"
+
+
+class Stack:
+    """Factories and config loader for an AgentService, counting rebuilds."""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.builds = 0
+        self.llm = SimpleNamespace(name="llama", type="openai", url="http://a", api_key="k")
+        self.vision = SimpleNamespace(name="llava", type="openai", url="http://a", api_key="k")
+
+    def memory(self):
+        return object()
+
+    def build(self, memory):
+        self.builds += 1
+        return self.agent
+
+    def config(self):
+        return self.llm, self.vision
+
+    def service(self, **kwargs):
+        return AgentService(memory_factory=self.memory, agent_factory=self.build,
+                            config_loader=self.config, **kwargs)
+
+
+@pytest.fixture
+def stack():
+    return Stack(FakeAgent(hold={"first"}))
+
+
+def start_worker(worker):
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    return thread
+
+
+def test_second_request_cancels_first(stack):
+    service = stack.service()
+    worker = AgentWorker(service, timeout=5)
+    emitted = []
+    # The worker runs off the main thread and no Qt event loop is running here.
+    worker.response_signal.connect(emitted.append, Qt.DirectConnection)
+    try:
+        worker.set_text("first")
+        first = start_worker(worker)
+        assert stack.agent.started.wait(5)
+
+        # What the GUI does when a new transcription arrives mid-request.
+        worker.cancel()
+        first.join(5)
+        assert not first.is_alive()
+        worker.set_text("second")
+        second = start_worker(worker)
+        stack.agent.release.set()
+        second.join(5)
+        assert not second.is_alive()
+    finally:
+        stack.agent.release.set()
+        service.stop()
+
+    assert emitted == ["reply to second"]
+
+
+def test_cancelled_pending_request_is_never_handled(stack):
+    service = stack.service()
+    try:
+        running = service.submit("first")
+        assert stack.agent.started.wait(5)
+        pending = service.submit("skipped")
+        pending.cancel()
+        latest = service.submit("latest")
+        stack.agent.release.set()
+        assert latest.wait(5) == "reply to latest"
+        assert running.wait(5) == "reply to first"
+    finally:
+        stack.agent.release.set()
+        service.stop()
+
+    assert pending.wait(0) is None
+    assert stack.agent.handled == ["first", "latest"]
+
+
+def test_stack_rebuilt_only_when_fingerprint_changes_or_invalidated():
+    stack = Stack(FakeAgent())
+    service = stack.service()
+    try:
+        for _ in range(3):
+            assert service.submit("hi").wait(5) == "reply to hi"
+        assert stack.builds == 1
+
+        stack.llm = SimpleNamespace(**{**vars(stack.llm), "name": "mistral"})
+        assert service.submit("hi").wait(5) == "reply to hi"
+        assert stack.builds == 2
+        assert service.submit("hi").wait(5) == "reply to hi"
+        assert stack.builds == 2
+
+        service.invalidate()
+        assert service.submit("hi").wait(5) == "reply to hi"
+        assert stack.builds == 3
+    finally:
+        service.stop()
+
+
+def test_queue_bound_holds(stack):
+    service = stack.service(max_pending=3)
+    try:
+        service.submit("first")
+        assert stack.agent.started.wait(5)
+        pending = [service.submit(f"queued {i}") for i in range(3)]
+        with pytest.raises(Full):
+            service.submit("one too many")
+
+        worker = AgentWorker(service, timeout=5)
+        emitted = []
+        worker.response_signal.connect(emitted.append)
+        worker.set_text("from the GUI")
+        worker.run()
+        assert len(emitted) == 1 and emitted[0].startswith("⚠️ Still working")
+
+        stack.agent.release.set()
+        assert [r.wait(5) for r in pending] == [f"reply to queued {i}" for i in range(3)]
+    finally:
+        stack.agent.release.set()
+        service.stop()
+
+    assert "one too many" not in stack.agent.handled
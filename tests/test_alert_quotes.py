@@ -0,0 +1,129 @@
+import json
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from gui.Objects.AlertChecker import AlertCheck, QuoteSource, YahooQuoteSource
+
+PRICES = {"AAPL": (190.5, "Apple Inc."), "MSFT": (410.25, "Microsoft Corporation")}
+
+
+@pytest.fixture
+def quote_server():
+    """Answers /v7/finance/quote like Yahoo does; ``server.fail`` makes it return 500."""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            symbols = parse_qs(url.query)["symbols"][0].split(",")
+            requests_seen.append(symbols)
+            if server.fail:
+                self.send_response(500)
+                self.end_headers()
+                return
+            result = [
+                {"symbol": s, "regularMarketPrice": PRICES[s][0], "longName": PRICES[s][1]}
+                for s in symbols if s in PRICES
+            ]
+            body = json.dumps({"quoteResponse": {"result": result}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.fail = False
+    server.requests_seen = requests_seen
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_all_tickers_in_one_request(quote_server):
+    source = YahooQuoteSource(quote_server.base_url)
+    quotes = source.get_quotes(["AAPL", "MSFT", "AAPL", "UNKNOWN"])
+
+    assert quote_server.requests_seen == [["AAPL", "MSFT", "UNKNOWN"]]
+    assert quotes == {
+        "AAPL": {"ticker": "AAPL", "price": 190.5},
+        "MSFT": {"ticker": "MSFT", "price": 410.25},
+    }
+    assert source.company("MSFT") == "Microsoft Corporation"
+    assert len(quote_server.requests_seen) == 1  # Names came with the quotes
+
+
+def test_quotes_are_cached_for_their_ttl(quote_server):
+    source = YahooQuoteSource(quote_server.base_url, ttl=60)
+    source.get_quotes(["AAPL"])
+    assert source.get_quotes(["AAPL"]) == {"AAPL": {"ticker": "AAPL", "price": 190.5}}
+    source.get_quotes(["AAPL", "MSFT"])
+
+    assert quote_server.requests_seen == [["AAPL"], ["MSFT"]]
+
+
+def test_failed_batch_backs_off(quote_server):
+    quote_server.fail = True
+    source = YahooQuoteSource(quote_server.base_url, backoff=0.2, max_backoff=1.0)
+
+    assert source.get_quotes(["AAPL"]) == {}
+    assert source.get_quotes(["AAPL"]) == {}
+    assert len(quote_server.requests_seen) == 1  # No request while backing off
+
+    time.sleep(0.25)
+    quote_server.fail = False
+    assert source.get_quotes(["AAPL"]) == {"AAPL": {"ticker": "AAPL", "price": 190.5}}
+    assert len(quote_server.requests_seen) == 2
+    assert source._backoff == 0.2  # Reset after a success
+
+
+def test_quote_source_requires_a_fetch():
+    with pytest.raises(TypeError):
+        QuoteSource()
+
+
+class FakeDbTool:
+    def __init__(self):
+        self.logged = []
+
+    def _run(self, action, **kwargs):
+        if action == "get_alerts":
+            return json.dumps([["AAPL", 100, "USD"]])
+        if action == "get_purchases_for_alerts":
+            return json.dumps([])
+        if action == "get_preferences":
+            return json.dumps({"currency": "USD"})
+        if action == "log_notifications":
+            self.logged.extend(kwargs["messages"])
+
+
+def test_each_alert_is_logged_once(quote_server, monkeypatch):
+    monkeypatch.setitem(
+        sys.modules,
+        "core.agents.personal_assistant",
+        types.SimpleNamespace(EXCHANGE_RATES={"USD": 1.0}),
+    )
+    db_tool = FakeDbTool()
+    checker = AlertCheck(db_tool, None, quote_source=YahooQuoteSource(quote_server.base_url))
+    monkeypatch.setattr(checker, "get_system_sensors", lambda: {"cpu": 99.0})
+    monkeypatch.setattr(checker, "get_network_status", lambda: "connected")
+
+    triggered, notifications = [], []
+    checker.check_stock_alerts(triggered, notifications)
+    checker.check_system_alerts(triggered, notifications)
+    checker.log_notifications(notifications)
+
+    assert len(triggered) == 2
+    assert len(db_tool.logged) == 2
+    assert db_tool.logged[0] == "Stock alert for AAPL at USD190.50"
+    assert db_tool.logged[1].startswith("🔥 CPU usage 99.0% exceeds 90.0% @ ")
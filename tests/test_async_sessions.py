@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import re
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest
+import requests
+import websockets
+
+COMPLETE = {"role": "server", "type": "status", "content": "complete"}
+
+
+def fake_completions(**params):
+    """Echo the token in the last user message back, a word at a time."""
+    token = re.search(r"TOKEN-\d+-\d+", params["messages"][-1]["content"]).group(0)
+    for word in f"Echo {token} done".split():
+        time.sleep(0.01)
+        yield {"choices": [{"delta": {"content": word + " "}}]}
+
+
+@pytest.fixture
+def server(server):
+    server.llm.completions = fake_completions
+    return server
+
+
+async def converse(port, n, turns=3):
+    url = f"ws://127.0.0.1:{port}/?session_id=s{n}"
+    async with websockets.connect(url) as ws:
+        for turn in range(turns):
+            token = f"TOKEN-{n}-{turn}"
+            await ws.send(json.dumps({"role": "user", "type": "message", "start": True}))
+            await ws.send(
+                json.dumps({"role": "user", "type": "message", "content": f"say {token}"})
+            )
+            await ws.send(json.dumps({"role": "user", "type": "message", "end": True}))
+            text = ""
+            while True:
+                message = json.loads(await ws.recv())
+                if message == COMPLETE:
+                    break
+                assert message.get("type") != "error", message
+                if message.get("role") == "assistant":
+                    text += str(message.get("content", ""))
+            assert set(re.findall(r"TOKEN-\d+-\d+", text)) == {token}
+
+
+def test_concurrent_sessions_do_not_cross_talk(server):
+    async def main():
+        await asyncio.wait_for(
+            asyncio.gather(*(converse(server.server.port, n) for n in range(20))),
+            timeout=120,
+        )
+
+    asyncio.run(main())
+
+    assert server.sessions.stats()["sessions"] == 20
+    for n in range(20):
+        session = server.sessions.sessions[f"s{n}"]
+        users = [m["content"] for m in session.messages if m["role"] == "user"]
+        assert users == [f"say TOKEN-{n}-{turn}" for turn in range(3)]
+    assert server.messages == []
+
+
+def test_settings_reach_open_sessions(server):
+    async def main():
+        await converse(server.server.port, 0, turns=1)
+
+    asyncio.run(main())
+    response = requests.post(
+        f"http://127.0.0.1:{server.server.port}/settings",
+        json={"llm": {"temperature": 0.5}, "messages": []},
+    )
+    assert response.json() == {"status": "success"}
+
+    session = server.sessions.sessions["s0"]
+    assert server.llm.temperature == session.llm.temperature == 0.5
+    assert len(session.messages) == 2  # Its own conversation is left alone
@@ -0,0 +1,149 @@
+import threading
+import time
+
+from gui.Objects.AudioHub import AudioCaptureHub, RingBuffer
+
+BLOCK = 512
+
+
+class FakeSource:
+    """
+    Stands in for PyAudioSource: ``blocks`` numbered 16-bit blocks, one every
+    ``interval`` seconds once ``gate`` is set, then silence (no data).
+    """
+
+    def __init__(self, blocks, interval=0.001, gate=None):
+        self.blocks = blocks
+        self.interval = interval
+        self.gate = gate or threading.Event()
+        if gate is None:
+            self.gate.set()
+        self.sent = 0
+        self.closed = False
+
+    def read(self, num_samples):
+        self.gate.wait()
+        time.sleep(self.interval)
+        if self.sent >= self.blocks:
+            return b""
+        block = bytes([self.sent % 256]) * (num_samples * 2)
+        self.sent += 1
+        return block
+
+    def close(self):
+        self.closed = True
+
+
+def expected_stream(blocks):
+    return b"".join(bytes([n % 256]) * (BLOCK * 2) for n in range(blocks))
+
+
+def read_all(subscription, num_samples, total_bytes, out):
+    data = b""
+    while len(data) < total_bytes:
+        chunk = subscription.read(num_samples, timeout=5)
+        if chunk is None:
+            break
+        data += chunk
+    out[subscription.name] = data
+
+
+def test_three_consumers_receive_identical_frames():
+    gate = threading.Event()
+    source = FakeSource(blocks=200, gate=gate)
+    hub = AudioCaptureHub(block_size=BLOCK, source_factory=lambda: source)
+    # Each consumer frames the stream its own way, like Porcupine, the VAD and the recorder
+    framings = {"wake_word": 512, "vad": 480, "recorder": 1024}
+    subscriptions = {name: hub.subscribe(name) for name in framings}
+    total = 200 * BLOCK * 2
+    usable = {name: total - total % (size * 2) for name, size in framings.items()}
+    received = {}
+    readers = [
+        threading.Thread(target=read_all, args=(subscriptions[name], size, usable[name], received))
+        for name, size in framings.items()
+    ]
+    for reader in readers:
+        reader.start()
+    gate.set()
+    for reader in readers:
+        reader.join(timeout=10)
+
+    expected = expected_stream(200)
+    for name in framings:
+        assert received[name] == expected[:usable[name]], name
+    assert all(count == 0 for count in hub.stats()["overruns"].values())
+    hub.stop()
+    assert source.closed
+
+
+def test_ring_buffer_overrun_skips_to_the_oldest_kept_data():
+    ring = RingBuffer(8)
+    ring.write(b"abcdef")
+    assert ring.read(4) == b"abcd"
+    ring.write(b"ghijklmnop")  # Laps the reader: "ef" and "gh" are overwritten
+
+    assert ring.read(8) == b"ijklmnop"
+    assert ring.overruns == 4
+    assert ring.read(1) is None
+
+
+def test_ring_buffer_write_larger_than_capacity_keeps_the_tail():
+    ring = RingBuffer(4)
+    ring.write(b"0123456789")
+
+    assert ring.read(4) == b"6789"
+    assert ring.overruns == 6
+
+
+def test_slow_consumer_drops_only_its_own_frames():
+    source = FakeSource(blocks=100)
+    hub = AudioCaptureHub(block_size=BLOCK, source_factory=lambda: source)
+    fast = hub.subscribe("fast")
+    slow = hub.subscribe("slow", buffer_seconds=0.1)  # 3200 bytes, about three blocks
+    received = {}
+    read_all(fast, BLOCK, 100 * BLOCK * 2, received)
+
+    stats = hub.stats()
+    assert received["fast"] == expected_stream(100)
+    assert stats["overruns"]["fast"] == 0
+    # The slow consumer only gets the newest audio that still fits its buffer
+    assert slow.read(BLOCK) == expected_stream(100)[-slow.ring.capacity:][:BLOCK * 2]
+    assert hub.stats()["overruns"]["slow"] == 100 * BLOCK * 2 - slow.ring.capacity
+    hub.stop()
+
+
+def test_device_is_released_with_the_last_subscriber_and_reopened():
+    sources = []
+
+    def factory():
+        sources.append(FakeSource(blocks=10**6))
+        return sources[-1]
+
+    hub = AudioCaptureHub(block_size=BLOCK, source_factory=factory)
+    first, second = hub.subscribe("first"), hub.subscribe("second")
+    assert first.read(BLOCK, timeout=5) is not None
+    first.close()
+    assert second.read(BLOCK, timeout=5) is not None
+    second.close()
+    hub._thread.join(timeout=5)
+    assert len(sources) == 1 and sources[0].closed
+    assert second.read(BLOCK, timeout=0.1) is None
+
+    third = hub.subscribe("third")
+    assert third.read(BLOCK, timeout=5) is not None
+    assert len(sources) == 2
+    hub.stop()
+
+
+def test_capture_thread_cpu_is_measured():
+    # Real-time pacing: 512 samples at 16 kHz every 32 ms
+    source = FakeSource(blocks=10**6, interval=BLOCK / 16000)
+    hub = AudioCaptureHub(block_size=BLOCK, source_factory=lambda: source)
+    subscriptions = [hub.subscribe(name) for name in ("wake_word", "vad", "recorder")]
+    time.sleep(1.0)
+    stats = hub.stats()
+    hub.stop()
+
+    print(f"Capture thread CPU with three idle consumers: {stats['cpu_percent']:.2f}%")
+    assert stats["blocks"] >= 20
+    assert 0.0 <= stats["cpu_percent"] < 25.0
@@ -0,0 +1,105 @@
+import sqlite3
+import types
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import jarvis_integration.audio.tts_providers.BarkTTS as bark
+
+
+class FakeSpeech:
+    def __init__(self, samples):
+        self.values = np.random.default_rng(samples).standard_normal((1, samples))
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class FakeInputs(dict):
+    def to(self, device):
+        return self
+
+
+class FakeProcessor:
+    def __call__(self, text, return_tensors=None):
+        return FakeInputs(text=text[0])
+
+
+class FakeModel:
+    """Counts generate() calls per text; audio length is proportional to the text."""
+
+    def __init__(self):
+        self.generated = Counter()
+        self.config = types.SimpleNamespace(_commit_hash="fake-bark")
+        self.generation_config = types.SimpleNamespace(sample_rate=24000)
+
+    def to(self, device):
+        return self
+
+    def generate(self, text, do_sample=True):
+        self.generated[text] += 1
+        return FakeSpeech(len(text) * 100)
+
+
+@pytest.fixture
+def fake_model(monkeypatch, tmp_path):
+    model = FakeModel()
+    monkeypatch.setattr(bark, "JARVIS_DIR", str(tmp_path))
+    monkeypatch.setattr(bark, "download_bark", lambda: None)
+    monkeypatch.setattr(
+        bark, "AutoProcessor", types.SimpleNamespace(from_pretrained=lambda path: FakeProcessor())
+    )
+    monkeypatch.setattr(
+        bark, "AutoModel", types.SimpleNamespace(from_pretrained=lambda path: model)
+    )
+    return model
+
+
+def test_voice_description_generated_once_per_voice(fake_model):
+    tts = bark.BarkTTS()
+    default_voice = tts.voice_description
+    other_voice = "A cheerful young narrator says: "
+
+    for text in ["Good morning.", "The build is green.", "All systems nominal."]:
+        tts.synthesize(text)
+    tts.synthesize("Good morning.", voice=other_voice)
+    tts.synthesize("The build is green.", voice=other_voice)
+
+    assert fake_model.generated[default_voice] == 1
+    assert fake_model.generated[other_voice] == 1
+
+
+def test_voice_description_length_survives_restart(fake_model):
+    bark.BarkTTS().synthesize("Good morning.")
+    restarted = bark.BarkTTS()
+    restarted.synthesize("Something new to say.")
+
+    assert fake_model.generated[restarted.voice_description] == 1
+
+
+def test_cache_key_keeps_case_and_ignores_whitespace():
+    key = bark.AudioCache.make_key("stop", "voice", "model")
+
+    assert bark.AudioCache.make_key("  stop\n", "voice", "model") == key
+    assert bark.AudioCache.make_key("STOP", "voice", "model") != key
+
+
+def test_legacy_audio_cache_table_is_dropped(tmp_path):
+    db_path = str(tmp_path / "audio_cache.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE audio_cache (text TEXT PRIMARY KEY, audio BLOB)")
+        conn.execute("INSERT INTO audio_cache VALUES ('hello', x'00')")
+
+    bark.AudioCache(db_path).close()
+
+    with sqlite3.connect(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {"tts_audio_cache"}
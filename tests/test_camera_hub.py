@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from gui.Objects.CameraHub import CameraCaptureHub, SyntheticSource
+
+
+class CountingFactory:
+    """Builds small synthetic sources and counts how many are open at once."""
+
+    def __init__(self):
+        self.created = 0
+        self.open = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        factory = self
+        with self.lock:
+            self.created += 1
+            self.open += 1
+
+        class Source(SyntheticSource):
+            def close(self):
+                with factory.lock:
+                    factory.open -= 1
+
+        return Source(width=64, height=48, fps=200)
+
+
+def wait_until(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def grab_threads():
+    return [t for t in threading.enumerate() if t.name == "camera-capture-hub" and t.is_alive()]
+
+
+@pytest.fixture
+def factory():
+    return CountingFactory()
+
+
+@pytest.fixture
+def hub(factory):
+    hub = CameraCaptureHub(source_factory=factory, idle_timeout=0.2)
+    yield hub
+    hub.stop()
+
+
+def test_leases_are_counted_and_keep_the_camera_open(hub, factory):
+    face = hub.acquire("face")
+    vision = hub.acquire("vision")
+    assert hub.read() is not None
+    assert hub.stats()["leases"] == ["face", "vision"]
+
+    face.release()
+    assert hub.stats()["leases"] == ["vision"]
+    time.sleep(hub.idle_timeout * 2)
+    assert hub.is_open()
+
+    vision.release()
+    assert hub.stats()["leases"] == []
+    assert wait_until(lambda: not hub.is_open())
+    assert factory.created == 1
+    assert factory.open == 0
+
+
+def test_idle_timeout_releases_the_device_until_the_next_read(hub, factory):
+    assert hub.read() is not None
+    assert hub.is_open()
+
+    assert wait_until(lambda: not hub.is_open())
+    assert factory.open == 0
+
+    assert hub.read() is not None
+    assert factory.created == 2
+    assert hub.stats()["opens"] == 2
+
+
+def test_reads_postpone_the_idle_release(hub, factory):
+    for _ in range(10):
+        assert hub.read() is not None
+        time.sleep(hub.idle_timeout / 4)
+    assert hub.is_open()
+    assert factory.created == 1
+
+
+def test_two_consumers_share_one_grab_thread(hub, factory):
+    frames = {"face": [], "vision": []}
+
+    def consume(name):
+        with hub.acquire(name) as lease:
+            for _ in range(20):
+                frames[name].append(lease.read(fresh=True))
+
+    consumers = [threading.Thread(target=consume, args=(name,)) for name in frames]
+    for thread in consumers:
+        thread.start()
+    assert wait_until(lambda: hub.stats()["frames"] > 0)
+    assert len(grab_threads()) == 1
+    for thread in consumers:
+        thread.join(5)
+
+    assert factory.created == 1
+    assert all(frame is not None and frame.shape == (48, 64, 3) for f in frames.values() for frame in f)
+    # Each consumer gets its own copy of the shared frame.
+    assert frames["face"][-1] is not frames["vision"][-1]
+    assert hub.stats()["reads"] == 40
@@ -0,0 +1,139 @@
+import json
+import os
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from interpreter.core.utils.conversation_journal import (
+    ConversationJournal,
+    load_conversation,
+)
+
+TURNS = 1000
+STREAM_UPDATES = 3
+
+
+def user(turn):
+    return {"role": "user", "type": "message", "content": f"Question {turn:04d}?"}
+
+
+def assistant(turn, words):
+    return {
+        "role": "assistant",
+        "type": "message",
+        "content": " ".join(f"answer-{turn:04d}" for _ in range(words)),
+    }
+
+
+def run_conversation(journal, turns=TURNS):
+    """Save after every streamed update, as the interpreter does, recording each save's bytes."""
+    messages = []
+    costs = []
+    compactions = []
+    compact = journal.compact
+
+    def counting_compact(messages):
+        compactions.append(len(messages))
+        compact(messages)
+
+    journal.compact = counting_compact
+    for turn in range(turns):
+        messages.append(user(turn))
+        for words in range(1, STREAM_UPDATES + 1):
+            if words == 1:
+                messages.append(assistant(turn, words))
+            else:
+                messages[-1] = assistant(turn, words)
+            before, compacted = journal.bytes_written, len(compactions)
+            journal.save(messages)
+            costs.append((journal.bytes_written - before, len(compactions) > compacted))
+    return messages, costs, compactions
+
+
+def test_append_cost_stays_constant_over_1000_turns(tmp_path):
+    path = str(tmp_path / "chat.jsonl")
+    messages, costs, compactions = run_conversation(ConversationJournal(path))
+
+    appends = [cost for cost, compacted in costs if not compacted]
+    early = max(appends[: 100 * STREAM_UPDATES])
+    late = max(appends[-100 * STREAM_UPDATES :])
+    assert late <= early * 1.1
+
+    # Compaction rewrites the file, but rarely enough that the average stays flat.
+    per_turn = [
+        sum(cost for cost, _ in costs[start : start + 250 * STREAM_UPDATES]) / 250
+        for start in range(0, len(costs), 250 * STREAM_UPDATES)
+    ]
+    assert max(per_turn[1:]) <= per_turn[1] * 1.5
+    assert load_conversation(path) == messages
+
+
+def test_compaction_bounds_superseded_lines(tmp_path):
+    path = str(tmp_path / "chat.jsonl")
+    messages, _, compactions = run_conversation(ConversationJournal(path), turns=200)
+
+    assert compactions
+    with open(path) as f:
+        lines = f.readlines()
+    assert len(lines) <= 2 * len(messages) + 32
+
+    ConversationJournal(path).compact(messages)
+    with open(path) as f:
+        compacted = [json.loads(line) for line in f]
+    assert compacted == [{"i": i, "m": m} for i, m in enumerate(messages)]
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_truncation_and_reopening_replay_correctly(tmp_path):
+    path = str(tmp_path / "chat.jsonl")
+    messages, _, _ = run_conversation(ConversationJournal(path), turns=20)
+
+    del messages[10:]
+    messages.append(user(99))
+    journal = ConversationJournal(path)
+    journal.save(messages)
+    assert load_conversation(path) == messages
+
+    # A save with nothing changed appends nothing.
+    before = os.path.getsize(path)
+    ConversationJournal(path).save(messages)
+    assert os.path.getsize(path) == before
+
+
+def test_torn_last_line_is_dropped_and_compacted(tmp_path):
+    path = str(tmp_path / "chat.jsonl")
+    messages, _, _ = run_conversation(ConversationJournal(path), turns=5)
+    with open(path, "a") as f:
+        f.write('{"i":10,"m":{"role":"us')
+
+    assert load_conversation(path) == messages
+    messages.append(user(5))
+    ConversationJournal(path).save(messages)
+    assert load_conversation(path) == messages
+
+
+def test_legacy_json_migrates_to_a_journal(tmp_path):
+    from interpreter import OpenInterpreter
+
+    legacy_messages, _, _ = run_conversation(
+        ConversationJournal(str(tmp_path / "scratch.jsonl")), turns=50
+    )
+    legacy_path = tmp_path / "old_chat__2025.json"
+    legacy_path.write_text(json.dumps(legacy_messages))
+
+    interpreter = OpenInterpreter(disable_telemetry=True, import_computer_api=False)
+    interpreter.conversation_history_path = str(tmp_path)
+    interpreter.conversation_filename = legacy_path.name
+    interpreter.messages = load_conversation(str(legacy_path))
+    assert interpreter.messages == legacy_messages
+
+    interpreter.messages.append(user(50))
+    interpreter._save_conversation()
+
+    journal_path = tmp_path / "old_chat__2025.jsonl"
+    assert interpreter.conversation_filename == journal_path.name
+    assert not legacy_path.exists()
+    assert load_conversation(str(journal_path)) == legacy_messages + [user(50)]
+
+    interpreter.messages.append(assistant(50, 2))
+    interpreter._save_conversation()
+    assert load_conversation(str(journal_path)) == interpreter.messages
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from scipy.signal import butter, filtfilt, lfilter
+
+from jarvis_integration.audio.tts_providers.effects import apply_robotic_filter
+
+SAMPLE_RATE = 24000
+
+
+@pytest.fixture
+def voice_like_signal():
+    rng = np.random.default_rng(0)
+    t = np.arange(SAMPLE_RATE * 3) / SAMPLE_RATE
+    signal = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 3000 * t)
+    return (signal + 0.1 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def old_robotic_filter(audio, sample_rate):
+    """The filtfilt implementation BarkTTS used before effects.py."""
+    b, a = butter(6, 2500 / (0.5 * sample_rate), btype='low', analog=False)
+    emphasized = lfilter([1, -0.97], [1], filtfilt(b, a, audio))
+    return emphasized / np.max(np.abs(emphasized))
+
+
+def relative_error(actual, expected):
+    return np.linalg.norm(actual - expected) / np.linalg.norm(expected)
+
+
+def test_robotic_filter_matches_old_filtfilt(voice_like_signal):
+    expected = old_robotic_filter(voice_like_signal, SAMPLE_RATE)
+    actual = apply_robotic_filter(voice_like_signal, SAMPLE_RATE)
+
+    assert actual.shape == expected.shape
+    assert relative_error(actual, expected) < 1e-6
@@ -0,0 +1,39 @@
+import os
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import numpy as np
+
+from interpreter.core.computer.display.point.embedding_cache import EmbeddingCache
+
+
+def test_save_soon_writes_in_the_background(tmp_path):
+    path = str(tmp_path / "icons.npz")
+    cache = EmbeddingCache(path, save_delay=0.2)
+    for n in range(3):
+        cache.add(f"hash{n}", np.full(4, n))
+        cache.save_soon()
+    assert not os.path.exists(path)  # Nothing written on the caller's thread
+
+    deadline = time.time() + 5
+    while not os.path.exists(path):
+        assert time.time() < deadline, "cache wasn't saved"
+        time.sleep(0.05)
+
+    reloaded = EmbeddingCache(path)
+    assert len(reloaded) == 3
+    assert np.array_equal(reloaded.get("hash2"), np.full(4, 2, dtype=np.float32))
+
+
+def test_least_recently_used_entries_are_dropped(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "icons.npz"), max_entries=2)
+    cache.add("a", np.zeros(2))
+    cache.add("b", np.zeros(2))
+    cache.get("a")
+    cache.add("c", np.zeros(2))
+    cache.save()
+
+    reloaded = EmbeddingCache(cache.path)
+    assert reloaded.get("b") is None
+    assert reloaded.get("a") is not None and reloaded.get("c") is not None
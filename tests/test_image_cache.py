@@ -0,0 +1,147 @@
+import base64
+import copy
+import io
+import os
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest
+from PIL import Image
+
+from interpreter import OpenInterpreter
+from interpreter.core.llm.utils.image_cache import ImageCache
+
+IMAGES = 20
+
+
+def png(index):
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), (index * 10 % 256, 0, 0)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def image(index):
+    return {"role": "user", "type": "image", "format": "base64.png", "content": png(index)}
+
+
+class StubRenderer:
+    """Describes an image by its position in IMAGES, counting calls."""
+
+    def __init__(self, contents):
+        self.contents = contents
+        self.calls = 0
+
+    def __call__(self, lmc):
+        self.calls += 1
+        return f"image {self.contents.index(lmc['content'])}"
+
+
+@pytest.fixture
+def conversation():
+    messages = [{"role": "system", "type": "message", "content": "You are a test."}]
+    for index in range(IMAGES):
+        messages.append({"role": "user", "type": "message", "content": f"Look at image {index}."})
+        messages.append(image(index))
+        messages.append({"role": "assistant", "type": "message", "content": f"I see {index}."})
+    return messages
+
+
+def make_llm(supports_vision):
+    interpreter = OpenInterpreter(disable_telemetry=True, import_computer_api=False)
+    llm = interpreter.llm
+    llm.model = "fake-model"
+    llm.supports_functions = False
+    llm.supports_vision = supports_vision
+    llm.context_window = 1_000_000
+    llm.max_tokens = 4096
+    llm.sent = []
+
+    def completions(**params):
+        llm.sent.append(params["messages"])
+        yield {"choices": [{"delta": {"content": "Done."}}]}
+
+    llm.completions = completions
+    return llm
+
+
+def run_turns(llm, conversation, turns):
+    for turn in range(turns):
+        # A client resending the history: fresh dicts every turn, same images.
+        messages = copy.deepcopy(conversation)
+        messages.append({"role": "user", "type": "message", "content": f"Turn {turn}"})
+        list(llm.run(messages))
+
+
+def test_described_images_are_processed_once_across_turns(conversation):
+    llm = make_llm(supports_vision=False)
+    contents = [png(index) for index in range(IMAGES)]
+    llm.vision_renderer = StubRenderer(contents)
+    ocr_calls = []
+    llm.interpreter.computer.vision.ocr = lambda lmc: ocr_calls.append(lmc) or "no text"
+
+    run_turns(llm, conversation, 1)
+    assert llm.vision_renderer.calls == IMAGES
+    assert len(ocr_calls) == IMAGES
+    first_turn = llm.image_cache.computed
+    assert first_turn == 2 * IMAGES
+
+    run_turns(llm, conversation, 4)
+    assert llm.image_cache.computed == first_turn
+    assert llm.vision_renderer.calls == IMAGES
+    assert len(ocr_calls) == IMAGES
+    described = [m["content"] for m in llm.sent[-1] if "contains the following" in m["content"]
+                 or "Imagine I have just shown you an image" in m["content"]]
+    assert [d.split("description: ")[1].split("\n")[0] for d in described] == [
+        f"image {index}" for index in range(IMAGES)
+    ]
+
+
+def test_data_urls_are_built_once_across_turns(conversation):
+    llm = make_llm(supports_vision=True)
+    run_turns(llm, conversation, 1)
+    first_turn = llm.image_cache.computed
+    # Only the first and last two images are sent to a vision model.
+    assert first_turn == 3
+
+    run_turns(llm, conversation, 4)
+    assert llm.image_cache.computed == first_turn
+    urls = [part["image_url"]["url"] for m in llm.sent[-1] if isinstance(m["content"], list)
+            for part in m["content"] if part["type"] == "image_url"]
+    assert urls == [f"data:image/png;base64,{png(index)}" for index in (0, IMAGES - 2, IMAGES - 1)]
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = ImageCache(max_bytes=1000)
+    images = [{"type": "image", "format": "base64.png", "content": f"{index:03d}" + "x" * 97}
+              for index in range(5)]
+    for message in images:
+        # Each entry costs its 200-character value plus the 100-character base64 key.
+        cache.get(message, "description", lambda: "d" * 200)
+    assert len(cache) == 3 and cache.bytes == 900
+
+    assert cache.get(images[2], "description", lambda: pytest.fail("evicted too early")) == "d" * 200
+    newest = {"type": "image", "format": "base64.png", "content": "new" + "y" * 97}
+    cache.get(newest, "description", lambda: "d" * 200)
+    assert len(cache) == 3 and cache.bytes == 900
+    # images[3] was the least recently used, so it went; images[2] was read and stayed.
+    assert cache.get(images[3], "description", lambda: "r" * 200) == "r" * 200
+    assert cache.get(images[2], "description", lambda: pytest.fail("evicted")) == "d" * 200
+    assert cache.computed == 7
+
+
+def test_byte_budget_bounds_the_cache_and_skips_oversized_values():
+    cache = ImageCache(max_entries=256, max_bytes=1000)
+    huge = {"type": "image", "format": "base64.png", "content": "z" * 100}
+    assert cache.get(huge, "data_url", lambda: "u" * 2000) == "u" * 2000
+    assert len(cache) == 0 and cache.bytes == 0
+    assert cache.get(huge, "data_url", lambda: "u" * 2000) == "u" * 2000
+    assert cache.computed == 2
+
+    for index in range(50):
+        message = {"type": "image", "format": "base64.png", "content": f"{index:04d}"}
+        cache.get(message, "description", lambda: "d" * 96)
+        assert cache.bytes <= 1000
+    assert len(cache) == 10
+
+    cache.clear()
+    assert len(cache) == 0 and cache.bytes == 0
@@ -0,0 +1,103 @@
+import importlib
+import sys
+import time
+import types
+
+import numpy as np
+import pytest
+
+MODULE = "jarvis_integration.audio.tts_providers.indic_parler_tts"
+
+
+class FakeTokens:
+    input_ids = types.SimpleNamespace(to=lambda device: "ids")
+
+
+class FakeTokenizer:
+    @classmethod
+    def from_pretrained(cls, path):
+        return cls()
+
+    def __call__(self, text, **kwargs):
+        return FakeTokens()
+
+
+class FakeModel:
+    loaded = 0
+
+    def __init__(self):
+        self.config = types.SimpleNamespace(
+            sampling_rate=44100,
+            text_encoder=types.SimpleNamespace(_name_or_path="fake-encoder"),
+        )
+
+    @classmethod
+    def from_pretrained(cls, path):
+        cls.loaded += 1
+        return cls()
+
+    def to(self, device):
+        return self
+
+    def generate(self, **kwargs):
+        return types.SimpleNamespace(
+            cpu=lambda: types.SimpleNamespace(numpy=lambda: np.zeros((1, 16)))
+        )
+
+
+@pytest.fixture
+def parler(monkeypatch):
+    """The module freshly imported, with fake parler_tts and tokenizer classes."""
+    import transformers
+
+    FakeModel.loaded = 0
+    monkeypatch.setitem(
+        sys.modules,
+        "parler_tts",
+        types.SimpleNamespace(ParlerTTSForConditionalGeneration=FakeModel),
+    )
+    monkeypatch.setattr(transformers, "AutoTokenizer", FakeTokenizer, raising=False)
+    # Put the original module back afterwards, in sys.modules and on its package
+    package = importlib.import_module(MODULE.rsplit(".", 1)[0])
+    monkeypatch.setattr(package, "indic_parler_tts", getattr(package, "indic_parler_tts", None), raising=False)
+    monkeypatch.delitem(sys.modules, MODULE, raising=False)
+    return importlib.import_module(MODULE)
+
+
+def test_import_and_construction_do_not_load_the_model(parler):
+    tts = parler.Indic_Parler_TTS(device="cpu")
+
+    assert FakeModel.loaded == 0
+    assert not tts.is_loaded
+
+
+def test_first_synthesis_loads_the_model_once(parler):
+    tts = parler.Indic_Parler_TTS(device="cpu")
+    for _ in range(3):
+        audio, sample_rate = tts.synthesize("Hello")
+
+    assert FakeModel.loaded == 1
+    assert sample_rate == 44100 and audio.dtype == np.float32
+
+
+def test_idle_timer_unloads_and_next_synthesis_reloads(parler):
+    tts = parler.Indic_Parler_TTS(device="cpu", idle_unload_seconds=0.1)
+    tts.synthesize("Hello")
+    assert tts.is_loaded
+
+    deadline = time.time() + 5
+    while tts.is_loaded:
+        assert time.time() < deadline, "model wasn't unloaded"
+        time.sleep(0.02)
+
+    tts.synthesize("Hello again")
+    assert FakeModel.loaded == 2
+
+
+def test_synthesis_postpones_the_idle_unload(parler):
+    tts = parler.Indic_Parler_TTS(device="cpu", idle_unload_seconds=0.3)
+    for _ in range(5):
+        tts.synthesize("Still talking")
+        time.sleep(0.1)
+    assert tts.is_loaded
+    assert FakeModel.loaded == 1
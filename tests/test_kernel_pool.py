@@ -0,0 +1,55 @@
+import os
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest
+
+from interpreter import OpenInterpreter
+from interpreter.core.computer.terminal.languages import kernel_pool
+
+
+def timed_runs(interpreter):
+    """Latency of the first Python run (including getting a kernel) and of the next."""
+    timings = []
+    for n in (1, 2):
+        start = time.perf_counter()
+        output = interpreter.computer.run("python", f"print({n})")
+        timings.append(time.perf_counter() - start)
+        assert str(n) in "".join(str(o.get("content", "")) for o in output)
+    return timings
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("INTERPRETER_KERNEL_POOL_SIZE", "1")
+    monkeypatch.setattr(kernel_pool, "_pool", None)
+    pool = kernel_pool.get_kernel_pool()
+    deadline = time.time() + 60
+    while not pool._ready:
+        assert time.time() < deadline, "pooled kernel didn't start"
+        time.sleep(0.05)
+    yield pool
+    pool.close()
+
+
+def test_first_run_without_pool_waits_for_a_kernel(monkeypatch):
+    monkeypatch.setenv("INTERPRETER_KERNEL_POOL_SIZE", "0")
+    interpreter = OpenInterpreter(disable_telemetry=True, import_computer_api=False)
+    try:
+        first, warm = timed_runs(interpreter)
+    finally:
+        interpreter.computer.terminate()
+    # Booting a kernel costs far more than running in one
+    assert first > 5 * warm
+
+
+def test_first_run_with_pool_is_close_to_a_warm_kernel(pool):
+    interpreter = OpenInterpreter(disable_telemetry=True, import_computer_api=False)
+    try:
+        first, warm = timed_runs(interpreter)
+    finally:
+        interpreter.computer.terminate()
+    assert pool.hits == 1
+    # A checked-out kernel is already booted, so only checkout and draining remain
+    assert first < warm + 0.5
@@ -0,0 +1,137 @@
+import os
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest
+
+from interpreter import OpenInterpreter
+
+WORDS = " ".join(f"word{i}" for i in range(40))
+
+
+class RecordingLLM:
+    """Stands in for the completions endpoint and keeps the messages it was sent."""
+
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, **params):
+        self.sent.append(params["messages"])
+        yield {"choices": [{"delta": {"content": "Done."}}]}
+
+
+def make_llm():
+    interpreter = OpenInterpreter(disable_telemetry=True, import_computer_api=False)
+    llm = interpreter.llm
+    llm.model = "fake-model"
+    llm.supports_functions = False
+    llm.supports_vision = False
+    llm.context_window = 1_000_000
+    llm.max_tokens = 4096
+    llm.completions = RecordingLLM()
+    return llm
+
+
+@pytest.fixture
+def llm():
+    return make_llm()
+
+
+def turn(index):
+    """One exchange: a question, a code block, its output and an answer."""
+    return [
+        {"role": "user", "type": "message", "content": f"Question {index}: {WORDS}"},
+        {"role": "assistant", "type": "code", "format": "python", "content": f"print({index})"},
+        {"role": "computer", "type": "console", "format": "output", "content": f"{index}\n"},
+        {"role": "assistant", "type": "message", "content": f"Answer {index}: {WORDS}"},
+    ]
+
+
+def history(messages_count):
+    messages = [{"role": "system", "type": "message", "content": "You are a test."}]
+    index = 0
+    while len(messages) - 1 < messages_count:
+        messages += turn(index)
+        index += 1
+    return messages[: messages_count + 1]
+
+
+def run(llm, messages):
+    list(llm.run(messages))
+    return llm.completions.sent[-1]
+
+
+def timed_turn(llm, messages, index):
+    """Add a user message to the history, run one request and return how long it took."""
+    messages.append({"role": "user", "type": "message", "content": f"Follow-up {index}: {WORDS}"})
+    start = time.perf_counter()
+    run(llm, messages)
+    return time.perf_counter() - start
+
+
+def test_preprocessing_stays_roughly_constant_up_to_500_messages(llm):
+    warm = {}
+    tokenized = {}
+    for size in (50, 100, 250, 500):
+        messages = history(size)
+        run(llm, messages)
+        before = llm.token_counter.tokenized
+        warm[size] = min(timed_turn(llm, messages, f"{size}-{i}") for i in range(10))
+        tokenized[size] = (llm.token_counter.tokenized - before) / 10
+
+    cold = make_llm()
+    start = time.perf_counter()
+    run(cold, history(500))
+    cold_500 = time.perf_counter() - start
+
+    # Only the new message and the previous one (which loses the user template) are
+    # re-tokenized, however long the history.
+    assert all(count <= 2 for count in tokenized.values()), tokenized
+    # Walking the cached history is still linear, but cheap next to converting it;
+    # the margins leave room for a busy test machine.
+    assert warm[500] < cold_500 / 2, (warm, cold_500)
+    assert warm[500] < warm[50] * 10 + 0.01, warm
+
+
+def test_changed_content_is_converted_again(llm):
+    messages = history(20)
+    first = run(llm, messages)
+    assert any(m["content"].startswith("Answer 1:") for m in first)
+
+    messages[8]["content"] = "Answer 1 rewritten."
+    second = run(llm, messages)
+
+    assert any(m["content"] == "Answer 1 rewritten." for m in second)
+    assert not any(m["content"].startswith("Answer 1:") for m in second)
+    assert len(second) == len(first)
+
+
+def test_changed_options_invalidate_cached_conversions(llm):
+    messages = history(20)
+    first = run(llm, messages)
+    assert any(m["content"].startswith("Code output: 1") for m in first)
+
+    llm.interpreter.code_output_template = "OUTPUT >> {content}"
+    second = run(llm, messages)
+    assert any(m["content"] == "OUTPUT >> 1" for m in second)
+    assert not any(m["content"].startswith("Code output:") for m in second)
+
+    llm.interpreter.user_message_template = "USER SAYS {content}"
+    third = run(llm, messages)
+    assert [m["content"][:20] for m in third if m["content"].startswith("USER SAYS")] == [
+        "USER SAYS Question 4"
+    ]
+
+
+def test_token_counts_follow_content_changes(llm):
+    messages = history(20)
+    llm.context_window = 2000
+    llm.max_tokens = 100
+    kept_before = len(run(llm, messages))
+
+    # Make an old message huge; trimming must see the new count, not the cached one.
+    messages[-2]["content"] = WORDS * 40
+    kept_after = len(run(llm, messages))
+
+    assert kept_after < kept_before
@@ -0,0 +1,73 @@
+import os
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest
+
+from interpreter import OpenInterpreter
+from interpreter.core.llm.utils import model_capabilities
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    calls = {"functions": 0, "vision": 0, "model_info": 0}
+
+    def supports_function_calling(model):
+        calls["functions"] += 1
+        return False
+
+    def supports_vision(model):
+        calls["vision"] += 1
+        return False
+
+    def get_model_info(model):
+        calls["model_info"] += 1
+        return {"max_input_tokens": 128000, "max_output_tokens": 4096}
+
+    litellm = model_capabilities.litellm
+    monkeypatch.setattr(litellm, "supports_function_calling", supports_function_calling)
+    monkeypatch.setattr(litellm, "supports_vision", supports_vision)
+    monkeypatch.setattr(litellm, "get_model_info", get_model_info)
+    model_capabilities.clear_model_capabilities()
+    yield calls
+    model_capabilities.clear_model_capabilities()
+
+
+def fake_completions(**params):
+    for token in ["Hello", " there", "."]:
+        yield {"choices": [{"delta": {"content": token}}]}
+
+
+def make_interpreter(model):
+    interpreter = OpenInterpreter(disable_telemetry=True, import_computer_api=False)
+    interpreter.llm.model = model
+    interpreter.llm.completions = fake_completions
+    return interpreter
+
+
+def test_capabilities_probed_once_across_turns(probes):
+    interpreter = make_interpreter("fake-model")
+    for turn in range(50):
+        interpreter.chat(f"Message {turn}", display=False, stream=False)
+
+    assert probes == {"functions": 1, "vision": 1, "model_info": 1}
+    assert interpreter.llm.supports_functions is False
+    assert interpreter.llm.context_window == 128000
+
+    # A new session on the same model reuses the process-wide probe.
+    make_interpreter("fake-model").chat("Hi", display=False, stream=False)
+    assert probes == {"functions": 1, "vision": 1, "model_info": 1}
+
+
+def test_model_switch_probes_again_and_keeps_user_settings(probes):
+    interpreter = make_interpreter("fake-model")
+    interpreter.chat("Hi", display=False, stream=False)
+
+    interpreter.llm.model = "other-model"
+    interpreter.llm.supports_vision = True
+    for turn in range(5):
+        interpreter.chat(f"Message {turn}", display=False, stream=False)
+
+    assert probes["functions"] == 2
+    assert interpreter.llm.supports_functions is False
+    assert interpreter.llm.supports_vision is True
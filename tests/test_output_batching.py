@@ -0,0 +1,260 @@
+import asyncio
+import base64
+import json
+import os
+import random
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest
+import websockets
+
+from interpreter import AsyncInterpreter
+from interpreter.core.async_core import binary_frames
+from interpreter.core.llm.run_text_llm import run_text_llm
+
+COMPLETE = {"role": "server", "type": "status", "content": "complete"}
+TOKENS = [f"w{i} " for i in range(4000)]
+
+
+def fast_completions(**params):
+    """A model that streams a long reply as fast as the server takes it."""
+    for token in TOKENS:
+        yield {"choices": [{"delta": {"content": token}}]}
+
+
+async def receive_frames(ws, last):
+    """Frames (dicts, or bytes for binary ones) up to and including the one `last` accepts."""
+    frames = []
+    while True:
+        frame = await asyncio.wait_for(ws.recv(), 60)
+        frames.append(frame if isinstance(frame, bytes) else json.loads(frame))
+        if last(frames[-1]):
+            return frames
+
+
+def url(port, session_id, binary=False):
+    return f"ws://127.0.0.1:{port}/?session_id={session_id}" + ("&binary=true" if binary else "")
+
+
+async def ask(port, session_id):
+    """Send one message; return the frames before "complete" and the seconds they took."""
+    async with websockets.connect(url(port, session_id), max_size=None) as ws:
+        start = time.perf_counter()
+        await ws.send(json.dumps({"role": "user", "type": "message", "start": True}))
+        await ws.send(json.dumps({"role": "user", "type": "message", "content": "go"}))
+        await ws.send(json.dumps({"role": "user", "type": "message", "end": True}))
+        frames = await receive_frames(ws, lambda frame: frame == COMPLETE)
+        return frames[:-1], time.perf_counter() - start
+
+
+def assistant_text(frames):
+    return "".join(
+        f["content"]
+        for f in frames
+        if isinstance(f, dict) and f.get("role") == "assistant" and "content" in f
+    )
+
+
+def test_batching_sends_fewer_frames_and_more_messages_per_second(server):
+    server.llm.completions = fast_completions
+
+    batched, batched_seconds = asyncio.run(ask(server.server.port, "batched"))
+    server.batch_bytes = 0  # New sessions copy the server's settings
+    single, single_seconds = asyncio.run(ask(server.server.port, "single"))
+
+    expected = "".join(TOKENS)
+    assert assistant_text(batched) == assistant_text(single) == expected
+    batched_frames = [f for f in batched if f.get("role") == "assistant" and "content" in f]
+    single_frames = [f for f in single if f.get("role") == "assistant" and "content" in f]
+    assert len(single_frames) >= len(TOKENS) - 1
+    assert len(batched_frames) * 20 < len(single_frames)
+
+    batched_rate = len(TOKENS) / batched_seconds
+    single_rate = len(TOKENS) / single_seconds
+    print(f"\n{batched_rate:,.0f} tokens/s batched, {single_rate:,.0f} tokens/s one per frame")
+    assert batched_rate > single_rate * 1.5
+
+
+def drain(chunks, batch_bytes=16384):
+    """Queue `chunks` on a bare AsyncInterpreter and return what output_batch hands out."""
+
+    async def main():
+        interpreter = AsyncInterpreter(disable_telemetry=True, import_computer_api=False)
+        interpreter.batch_bytes = batch_bytes
+        output_queue = interpreter._get_output_queue()
+        for chunk in chunks:
+            output_queue.async_q.put_nowait(chunk)
+        batches = []
+        while output_queue.async_q.qsize() or interpreter._held_outputs:
+            batches.append(await interpreter.output_batch())
+        output_queue.close()
+        return batches
+
+    return asyncio.run(main())
+
+
+def test_flags_and_active_lines_are_never_merged():
+    message = {"role": "assistant", "type": "message"}
+    line = {"role": "computer", "type": "console", "format": "active_line"}
+    output = {"role": "computer", "type": "console", "format": "output"}
+    chunks = [
+        dict(message, start=True),
+        dict(message, content="Hel"),
+        dict(message, content="lo"),
+        dict(message, end=True),
+        dict(line, content="1"),
+        dict(line, content="2"),
+        dict(output, content="a\n"),
+        dict(output, content="b\n"),
+        dict(line, content=None),
+        dict(output, content="c\n"),
+        dict(output, content="d\n", id="kept-alone"),
+        dict(message, start=True),
+        dict(message, content="Bye"),
+        COMPLETE,
+    ]
+
+    assert drain(chunks) == [
+        dict(message, start=True),
+        dict(message, content="Hello"),
+        dict(message, end=True),
+        dict(line, content="1"),
+        dict(line, content="2"),
+        dict(output, content="a\nb\n"),
+        dict(line, content=None),
+        dict(output, content="c\n"),
+        dict(output, content="d\n", id="kept-alone"),
+        dict(message, start=True),
+        dict(message, content="Bye"),
+        COMPLETE,
+    ]
+
+
+def test_merged_frames_concatenate_to_the_same_text():
+    rng = random.Random(0)
+    message = {"role": "assistant", "type": "message"}
+    code = {"role": "assistant", "type": "code", "format": "python"}
+    chunks = []
+    for _ in range(200):
+        kind = rng.choice([message, code])
+        chunks.append(dict(kind, content="".join(rng.choice("ab\n`") for _ in range(rng.randint(0, 12)))))
+
+    for batch_bytes in (0, 7, 50, 16384):
+        batches = drain(chunks, batch_bytes)
+        assert "".join(b["content"] for b in batches) == "".join(c["content"] for c in chunks)
+        for kind in (message, code):
+            assert "".join(b["content"] for b in batches if b["type"] == kind["type"]) == "".join(
+                c["content"] for c in chunks if c["type"] == kind["type"]
+            )
+        if batch_bytes:
+            # A batch only grows while it is under the limit.
+            assert all(len(b["content"]) < batch_bytes + 12 for b in batches)
+        else:
+            assert batches == chunks
+
+
+def test_binary_clients_get_raw_image_bytes(server):
+    raw = bytes(range(256)) * 4
+    image = {"role": "computer", "type": "image", "format": "base64.png", "content": base64.b64encode(raw).decode()}
+
+    async def main(binary):
+        session_id = f"image-{binary}"
+        async with websockets.connect(url(server.server.port, session_id, binary), max_size=None) as ws:
+            deadline = time.time() + 10
+            # Wait for the connection to start reading the session's output, then emit the image.
+            while getattr(server.sessions.sessions.get(session_id), "output_queue", None) is None:
+                assert time.time() < deadline, "session never started reading output"
+                await asyncio.sleep(0.02)
+            server.sessions.sessions[session_id].output_queue.sync_q.put(dict(image))
+            return await receive_frames(ws, lambda f: not isinstance(f, bytes) and f.get("type") == "image" and "start" not in f)
+
+    frames = asyncio.run(main(binary=True))
+    header = {"role": "computer", "type": "image", "format": "bytes.png"}
+    assert [f if isinstance(f, bytes) else {k: v for k, v in f.items() if k != "id"} for f in frames] == [
+        dict(header, start=True),
+        raw,
+        dict(header, end=True),
+    ]
+
+    # Clients that didn't ask for binary frames still get base64 JSON.
+    frames = asyncio.run(main(binary=False))
+    assert [{k: v for k, v in f.items() if k != "id"} for f in frames] == [image]
+    assert binary_frames({"role": "assistant", "type": "message", "content": "hi"}) == [
+        {"role": "assistant", "type": "message", "content": "hi"}
+    ]
+
+
+class ScriptedLLM:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.execution_instructions = None
+        self.interpreter = type("Interpreter", (), {"verbose": False, "os": False})()
+
+    def completions(self, **params):
+        for token in self.tokens:
+            yield {"choices": [{"delta": {"content": token}}]}
+
+
+def reference_run_text_llm(llm, params):
+    """run_text_llm as it was before the fence scan only looked at new text."""
+    inside_code_block = False
+    accumulated_block = ""
+    language = None
+    for chunk in llm.completions(**params):
+        content = chunk["choices"][0]["delta"].get("content", "")
+        if content == None:
+            continue
+        accumulated_block += content
+        if accumulated_block.endswith("`"):
+            continue
+        if "```" in accumulated_block and not inside_code_block:
+            inside_code_block = True
+            accumulated_block = accumulated_block.split("```")[1]
+        if inside_code_block and "```" in accumulated_block:
+            return
+        if inside_code_block:
+            if language is None and "\n" in accumulated_block:
+                language = accumulated_block.split("\n")[0]
+                if language == "":
+                    if llm.interpreter.os == False:
+                        language = "python"
+                    elif llm.interpreter.os == False:
+                        language = "text"
+                else:
+                    language = "".join(char for char in language if char.isalpha())
+            if language:
+                yield {"type": "code", "format": language, "content": content.replace(language, "")}
+        if not inside_code_block:
+            yield {"type": "message", "content": content}
+
+
+REPLIES = [
+    "Sure, let me check.\n```python\nprint('hi')\n```\nDone.",
+    "No code here, just `inline` and ``double`` ticks.",
+    "```\nls -la\n```",
+    "Text ```shell\necho `date`\n``` after",
+    "Two blocks:\n```js\nconsole.log(1)\n```\n```py\nx = 1\n```",
+    "Unclosed\n```python\nfor i in range(3):\n    print(i)\n",
+]
+
+
+def tokenize(text, rng):
+    tokens, i = [], 0
+    while i < len(text):
+        step = rng.randint(1, 6)
+        tokens.append(text[i : i + step])
+        i += step
+    return tokens
+
+
+@pytest.mark.parametrize("reply", REPLIES)
+def test_fence_scan_matches_the_full_rescan(reply):
+    rng = random.Random(reply)
+    for _ in range(200):
+        tokens = tokenize(reply, rng)
+        params = {"messages": [{"role": "system", "content": ""}]}
+        assert list(run_text_llm(ScriptedLLM(tokens), params)) == list(
+            reference_run_text_llm(ScriptedLLM(tokens), params)
+        ), tokens
@@ -0,0 +1,112 @@
+from gui.Objects.ProbeScheduler import Probe, ProbeScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProbe:
+    """Returns whatever ``value`` is set to and counts its calls."""
+
+    def __init__(self, value="same"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def run_for(scheduler, clock, seconds, step=1.0, each_step=None):
+    end = clock.now + seconds
+    while clock.now < end:
+        if each_step:
+            each_step()
+        scheduler.run_due()
+        clock.now += step
+
+
+def test_stable_input_backs_off_and_changing_input_does_not():
+    clock = FakeClock()
+    stable, changing = FakeProbe(), FakeProbe(0)
+    scheduler = ProbeScheduler(
+        [Probe("stable", stable, interval=60, max_interval=600),
+         Probe("changing", changing, interval=60, max_interval=600)],
+        clock=clock,
+    )
+
+    def tick():
+        changing.value += 1
+
+    run_for(scheduler, clock, 3600, each_step=tick)
+
+    assert changing.calls == 60  # Every 60 s for an hour
+    # 60, 120, 240, 480 then 600 s apart: 0, 60, 180, 420, 900, 1500, 2100, 2700, 3300
+    assert stable.calls == 9
+    assert scheduler.probes["stable"].current_interval == 600
+    assert scheduler.probes["changing"].current_interval == 60
+
+
+def test_dependent_probe_only_runs_when_an_input_changed():
+    clock = FakeClock()
+    camera, llm = FakeProbe("calm"), FakeProbe(None)
+    scheduler = ProbeScheduler(
+        [Probe("camera", camera, interval=60, max_interval=60),
+         Probe("llm", llm, interval=60, depends_on=("camera",))],
+        clock=clock,
+    )
+
+    run_for(scheduler, clock, 600)
+    assert camera.calls == 10
+    assert llm.calls == 1  # Only after the first observation
+    assert scheduler.probes["llm"].skips == 9
+
+    camera.value = "smiling"
+    run_for(scheduler, clock, 60)
+    assert llm.calls == 2
+
+
+def test_idle_user_scales_intervals():
+    clock = FakeClock()
+    idle = {"seconds": 0}
+    scaled, unscaled = FakeProbe(0), FakeProbe(0)
+    scheduler = ProbeScheduler(
+        [Probe("scaled", scaled, interval=60),
+         Probe("unscaled", unscaled, interval=60, idle_scale=False)],
+        idle_seconds=lambda: idle["seconds"], idle_after=300, idle_factor=4.0, clock=clock,
+    )
+
+    def tick():
+        scaled.value += 1
+        unscaled.value += 1
+
+    idle["seconds"] = 1000
+    run_for(scheduler, clock, 2400, each_step=tick)
+    assert unscaled.calls == 40
+    assert scaled.calls == 10
+
+
+def test_costs_and_failures_are_recorded():
+    clock = FakeClock()
+
+    def broken():
+        raise RuntimeError("camera unplugged")
+
+    scheduler = ProbeScheduler([Probe("broken", broken, interval=60)], clock=clock)
+    assert scheduler.run_due() == ["broken"]
+    stats = scheduler.stats()["broken"]
+    assert stats["invocations"] == 1
+    assert stats["avg_cost"] >= 0.0
+
+
+def test_idle_time_is_unknown_without_a_way_to_read_it(monkeypatch):
+    from gui.Objects import ProbeScheduler as scheduler_module
+
+    monkeypatch.setattr(scheduler_module.sys, "platform", "linux")
+    monkeypatch.setattr(scheduler_module.shutil, "which", lambda name: None)
+    assert scheduler_module.user_idle_seconds() is None
+    assert not ProbeScheduler(idle_seconds=scheduler_module.user_idle_seconds).is_idle()
@@ -0,0 +1,134 @@
+import sqlite3
+import time
+
+import pytest
+
+import gui.Objects.QueryCache as query_cache_module
+from gui.Objects.QueryCache import DAY, QueryCache
+
+
+class FakeClock:
+    """Stands in for the ``time`` module so TTLs and access order are deterministic."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache_module, "time", clock)
+    return clock
+
+
+def new_cache(tmp_path, **kwargs):
+    return QueryCache(sqlite3.connect(str(tmp_path / "cache.db"), check_same_thread=False), **kwargs)
+
+
+def fill(cache_path, count):
+    """Insert ``count`` rows directly, much faster than ``put`` with a commit each."""
+    conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+    QueryCache(conn)
+    now = time.time()
+    conn.executemany(
+        "INSERT INTO query_cache (key, query, mode, result, size, created, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(QueryCache.make_key(f"query {i}", "normal"), f"query {i}", "normal", f"result {i}", 8, now, now)
+         for i in range(count)],
+    )
+    conn.commit()
+    return QueryCache(conn, max_rows=count)
+
+
+def mean_lookup_seconds(cache, count, lookups=300):
+    start = time.perf_counter()
+    for i in range(lookups):
+        assert cache.get(f"query {(i * 7919) % count}", "normal") == f"result {(i * 7919) % count}"
+    return (time.perf_counter() - start) / lookups
+
+
+def test_lookup_time_stays_flat_at_50k_rows(tmp_path):
+    (tmp_path / "small").mkdir()
+    (tmp_path / "large").mkdir()
+    small = fill(tmp_path / "small" / "cache.db", 1_000)
+    large = fill(tmp_path / "large" / "cache.db", 50_000)
+    assert large.stats()["rows"] == 50_000
+
+    # Best of several rounds, so a busy machine does not fail the comparison.
+    small_time = min(mean_lookup_seconds(small, 1_000) for _ in range(5))
+    large_time = min(mean_lookup_seconds(large, 50_000) for _ in range(5))
+
+    assert large_time < small_time * 3
+
+
+def test_expired_rows_are_misses_and_purged(tmp_path, clock):
+    cache = new_cache(tmp_path, ttls={"normal": DAY, "deepsearch": 60})
+    cache.put("benzene", "normal", "C6H6")
+    cache.put("latest news", "deepsearch", "old answer")
+
+    clock.advance(120)
+    assert cache.get("latest news", "deepsearch") is None
+    assert cache.get("benzene", "normal") == "C6H6"
+    assert cache.stats()["rows"] == 1
+
+    cache.put("water", "normal", "H2O")
+    clock.advance(DAY + 1)
+    assert cache.purge_expired() == 2
+    assert cache.stats() == {"rows": 0, "bytes": 0}
+
+
+def test_purge_if_due_runs_at_most_once_per_interval(tmp_path, clock):
+    cache = new_cache(tmp_path, ttls={"normal": 60}, purge_interval=600)
+    cache.put("a", "normal", "1")
+    clock.advance(120)
+
+    # The constructor just purged, so the sweep is not due yet.
+    assert cache.purge_if_due() == 0
+    assert cache.stats()["rows"] == 1
+
+    clock.advance(600)
+    assert cache.purge_if_due() == 1
+    cache.put("b", "normal", "2")
+    clock.advance(120)
+    assert cache.purge_if_due() == 0
+    assert cache.stats()["rows"] == 1
+
+
+def test_least_recently_used_row_evicted_over_row_budget(tmp_path, clock):
+    cache = new_cache(tmp_path, max_rows=3)
+    for query in "abc":
+        cache.put(query, "normal", query.upper())
+        clock.advance(1)
+    assert cache.get("a", "normal") == "A"
+    clock.advance(1)
+
+    cache.put("d", "normal", "D")
+
+    assert cache.stats()["rows"] == 3
+    assert cache.get("b", "normal") is None
+    assert [cache.get(q, "normal") for q in "acd"] == ["A", "C", "D"]
+
+
+def test_least_recently_used_rows_evicted_over_byte_budget(tmp_path, clock):
+    cache = new_cache(tmp_path, max_bytes=30)
+    for query in "abc":
+        cache.put(query, "normal", query * 10)
+        clock.advance(1)
+    assert cache.get("a", "normal") == "a" * 10
+    clock.advance(1)
+
+    cache.put("big", "normal", "x" * 20)
+
+    assert cache.stats() == {"rows": 2, "bytes": 30}
+    assert cache.get("b", "normal") is None
+    assert cache.get("c", "normal") is None
+    assert cache.get("a", "normal") == "a" * 10
+    assert cache.get("big", "normal") == "x" * 20
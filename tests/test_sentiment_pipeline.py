@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+import jarvis_integration.audio.tts_providers.BaseTTS as base_tts
+
+
+class EchoTTS(base_tts.BaseText2Speech):
+    def synthesize(self, text):
+        return text
+
+
+@pytest.fixture
+def pipeline_factory(monkeypatch):
+    constructed = []
+
+    def factory():
+        constructed.append(1)
+        return lambda text: [{"label": "POSITIVE" if "good" in text else "NEGATIVE"}]
+
+    monkeypatch.setattr(base_tts, "sentiment_pipeline_factory", factory)
+    base_tts.reset_sentiment_pipeline()
+    yield constructed
+    base_tts.reset_sentiment_pipeline()
+
+
+def test_one_pipeline_across_100_calls(pipeline_factory):
+    tts = EchoTTS()
+    results = [tts.apply_sentiment_analysis(f"good news {i % 20}") for i in range(100)]
+
+    assert len(pipeline_factory) == 1
+    assert all(result == {"tone": "positive", "pitch": 1.5} for result in results)
+
+
+def test_one_pipeline_across_providers_and_threads(pipeline_factory):
+    providers = [EchoTTS(), EchoTTS()]
+    threads = [
+        threading.Thread(target=providers[i % 2].apply_sentiment_analysis, args=(f"bad day {i}",))
+        for i in range(100)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(pipeline_factory) == 1
+
+
+def test_tts_worker_warms_up_the_pipeline_at_startup(pipeline_factory, monkeypatch):
+    import gui.Objects.TTSWorker as tts_worker
+    import jarvis_integration.audio.tts_providers.indic_parler_tts as indic
+
+    class FakeParler(EchoTTS):
+        def prewarm(self):
+            pass
+
+    monkeypatch.setattr(tts_worker, "is_available", lambda: True)
+    monkeypatch.setattr(indic, "download_parlertts", lambda: None)
+    monkeypatch.setattr(indic, "Indic_Parler_TTS", FakeParler)
+    warm_ups = []
+    monkeypatch.setattr(
+        tts_worker, "warm_up_sentiment_pipeline",
+        lambda: warm_ups.append(base_tts.warm_up_sentiment_pipeline()),
+    )
+
+    worker = tts_worker.TTSWorker()
+    warm_ups[0].join(timeout=5)
+
+    assert isinstance(worker.tts_engine, FakeParler)
+    assert len(pipeline_factory) == 1
+    worker.tts_engine.apply_sentiment_analysis("good morning")
+    assert len(pipeline_factory) == 1
@@ -0,0 +1,108 @@
+import copy
+import json
+import random
+
+import pytest
+
+from interpreter.core.utils.streaming_message import StreamingMessage
+from interpreter.core.utils.truncate_output import truncate_output, truncation_message
+
+
+def chunks(seed, count=300):
+    rng = random.Random(seed)
+    alphabet = "abcdefghij\n "
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+
+
+def console(content=""):
+    return {"role": "computer", "type": "console", "format": "output", "content": content}
+
+
+@pytest.mark.parametrize("max_output", [1, 25, 500, 100_000])
+@pytest.mark.parametrize("add_scrollbars", [False, True])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_reads_like_truncate_output_after_every_chunk(max_output, add_scrollbars, seed):
+    message = StreamingMessage(console(), max_output, add_scrollbars=add_scrollbars)
+    expected = ""
+    for index, chunk in enumerate(chunks(seed)):
+        message.append(chunk)
+        expected = truncate_output(expected + chunk, max_output, add_scrollbars)
+        # Read only now and then, so trimming between reads is exercised too.
+        if index % 7 == 0:
+            assert message["content"] == expected
+    assert message["content"] == expected
+    assert message == dict(console(expected))
+
+
+def test_starting_from_truncated_content():
+    prefix = truncation_message(20)
+    message = StreamingMessage(console(prefix + "x" * 20), 20)
+    expected = prefix + "x" * 20
+    for chunk in ["abc", "", "defghijklmnopqrstuvwxyz"]:
+        message.append(chunk)
+        expected = truncate_output(expected + chunk, 20)
+        assert message["content"] == expected
+
+
+def test_bytes_content_is_concatenated_without_truncation():
+    # The async server swaps in b"" and appends audio bytes as they arrive.
+    message = StreamingMessage(
+        {"role": "user", "type": "audio", "format": "bytes.wav", "content": ""}
+    )
+    message["content"] = b""
+    frames = [bytes([i % 256]) * (i % 17) for i in range(500)]
+    expected = b""
+    for frame in frames:
+        message.append(frame)
+        expected += frame
+    assert message["content"] == expected
+
+    bounded = StreamingMessage(console(b""), max_output=10)
+    for frame in frames:
+        bounded.append(frame)
+    assert bounded["content"] == expected
+
+
+def test_every_way_of_reading_sees_the_joined_content():
+    message = StreamingMessage(console(), 30)
+    for chunk in chunks(2, 50):
+        message.append(chunk)
+    expected = dict(message)
+
+    assert message.get("content") == expected["content"]
+    assert dict(message.items()) == expected
+    assert list(message.values())[-1] == expected["content"]
+    assert message.copy() == expected
+    assert copy.deepcopy(message) == expected
+    assert json.loads(json.dumps(message)) == expected
+    assert repr(message) == repr(expected)
+
+
+def test_pop_setdefault_and_popitem_materialize_the_content():
+    message = StreamingMessage(console(), 40)
+    expected = ""
+    for chunk in chunks(3, 100):
+        message.append(chunk)
+        expected = truncate_output(expected + chunk, 40)
+
+    message.append("tail")
+    expected = truncate_output(expected + "tail", 40)
+    assert message.setdefault("content", "ignored") == expected
+
+    message.append("more")
+    expected = truncate_output(expected + "more", 40)
+    assert message.popitem() == ("content", expected)
+    assert "content" not in message
+
+    assert message.setdefault("content", "fresh") == "fresh"
+    message.append(" start")
+    assert message.pop("content") == "fresh start"
+    assert message.pop("content", None) is None
+    with pytest.raises(KeyError):
+        message.append("after pop")
+
+    message["content"] = "again"
+    message.append(" and again")
+    del message["content"]
+    assert message.setdefault("role") == "computer"
+    assert message == {"role": "computer", "type": "console", "format": "output"}
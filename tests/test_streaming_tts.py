@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from jarvis_integration.audio.tts_providers.BaseTTS import BaseText2Speech
+
+DELAY = 0.05  # Synthesis time per sentence
+REPLY = " ".join(f"This is sentence number {n} of the reply." for n in range(10))
+
+
+class SlowTTS(BaseText2Speech):
+    """Takes a fixed time per sentence and records what it synthesized."""
+
+    def __init__(self):
+        super().__init__()
+        self.synthesized = []
+
+    def synthesize(self, text):
+        time.sleep(DELAY)
+        self.synthesized.append(text)
+        return np.zeros(16, dtype=np.float32), 16000
+
+
+def test_first_audio_after_one_sentence():
+    tts = SlowTTS()
+    start = time.perf_counter()
+    stream = tts.iter_synthesize(REPLY)
+    next(stream)
+    first_audio = time.perf_counter() - start
+    assert len(list(stream)) == 9
+    total = time.perf_counter() - start
+
+    assert tts.synthesized == tts.process_text_in_batches(REPLY)
+    assert len(tts.synthesized) == 10
+    assert first_audio < 2 * DELAY
+    assert total >= 10 * DELAY
+
+
+def test_closing_the_stream_stops_synthesis():
+    tts = SlowTTS()
+    stream = tts.iter_synthesize(REPLY, max_buffered=1)
+    next(stream)
+    stream.close()
+    time.sleep(5 * DELAY)
+    assert len(tts.synthesized) <= 3
+
+
+def test_async_stream_first_audio_and_no_leaked_task():
+    tts = SlowTTS()
+
+    async def main():
+        start = time.perf_counter()
+        stream = tts.real_time_stream(REPLY, max_buffered=1)
+        async for audio in stream:
+            first_audio = time.perf_counter() - start
+            await asyncio.sleep(3 * DELAY)  # Let the producer fill the queue and block
+            break
+        await stream.aclose()
+        await asyncio.sleep(3 * DELAY)
+        others = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        return first_audio, others
+
+    first_audio, others = asyncio.run(main())
+    assert first_audio < 2 * DELAY
+    assert others == []  # The producer ended instead of blocking on a full queue
+
+
+def test_worker_starts_playing_after_one_sentence():
+    from gui.Objects.TTSWorker import TTSWorker
+
+    played = []
+    start = time.perf_counter()
+    worker = TTSWorker(
+        tts_engine=SlowTTS(),
+        player=lambda audio, sample_rate: played.append(time.perf_counter() - start),
+    )
+    worker.set_text(REPLY)
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert len(played) == 10
+    assert played[0] < 3 * DELAY
@@ -0,0 +1,117 @@
+import os
+import shutil
+import statistics
+import threading
+import time
+import types
+
+import pytest
+
+from interpreter.core.computer.terminal.languages import subprocess_language
+from interpreter.core.computer.terminal.languages.shell import Shell
+
+pytestmark = pytest.mark.skipif(
+    os.name == "nt" or shutil.which(os.environ.get("SHELL", "bash")) is None,
+    reason="needs a POSIX shell",
+)
+
+
+@pytest.fixture
+def shell():
+    shell = Shell()
+    yield shell
+    shell.terminate()
+
+
+def output_of(chunks):
+    return "".join(c["content"] for c in chunks if c.get("format") == "output")
+
+
+def finish_within(seconds, function):
+    """Call `function` in a thread; fail if it hasn't returned after `seconds`."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=function()), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), f"still waiting after {seconds}s"
+    return result["value"]
+
+
+def timed_run(shell, code):
+    """Run `code`; return its output chunks and how long run() took to return."""
+    start = time.perf_counter()
+    chunks = list(shell.run(code))
+    return chunks, time.perf_counter() - start
+
+
+def run_with_deadline(shell, code, seconds):
+    return finish_within(seconds, lambda: timed_run(shell, code))
+
+
+def test_echo_latency_after_warm_up(shell):
+    for _ in range(3):
+        list(shell.run("echo warm"))
+
+    timings = []
+    for i in range(20):
+        start = time.perf_counter()
+        chunks = list(shell.run(f"echo hi {i}"))
+        timings.append(time.perf_counter() - start)
+        assert output_of(chunks).strip() == f"hi {i}"
+
+    assert statistics.median(timings) < 0.05, timings
+
+
+def test_run_returns_when_the_process_dies_mid_run(shell):
+    list(shell.run("echo warm"))
+
+    def kill_and_rerun():
+        killed = timed_run(shell, "echo before\nkill -9 $$\necho never")
+        # The next run starts a fresh process, straight away like a client would
+        return killed, timed_run(shell, "echo again")
+
+    # Repeated, as the pipes of a dying process can close a moment before it exits
+    for _ in range(100):
+        (chunks, seconds), (again, again_seconds) = finish_within(10, kill_and_rerun)
+        assert "before" in output_of(chunks)
+        assert "never" not in output_of(chunks)
+        assert seconds < 1
+        assert output_of(again).strip() == "again"
+        assert again_seconds < 1
+
+
+def test_run_returns_when_a_child_keeps_the_pipes_open(shell):
+    # The shell dies, but a background child still holds stdout, so no reader sees EOF.
+    chunks, seconds = run_with_deadline(shell, "(sleep 3 &)\nkill -9 $$", 5)
+    assert seconds < 2.5
+
+
+@pytest.fixture
+def threaded_readers(monkeypatch):
+    """Make start_process take the Windows path: one blocking reader thread per pipe."""
+    fake_os = types.SimpleNamespace(
+        **{name: getattr(os, name) for name in dir(os) if not name.startswith("__")}
+    )
+    fake_os.name = "nt"
+    monkeypatch.setattr(subprocess_language, "os", fake_os)
+
+
+def test_threaded_readers_end_the_execution_at_eof(shell, threaded_readers):
+    chunks, _ = run_with_deadline(shell, "echo hello", 10)
+    assert output_of(chunks).strip() == "hello"
+
+    chunks, seconds = run_with_deadline(shell, "echo before\nkill -9 $$", 5)
+    assert "before" in output_of(chunks)
+    # Well before run()'s one-second backstop: the stdout reader ended it at EOF.
+    assert seconds < 0.8
+
+    chunks, _ = run_with_deadline(shell, "echo again", 10)
+    assert output_of(chunks).strip() == "again"
+
+
+def test_terminated_process_does_not_end_the_next_execution(shell):
+    list(shell.run("echo warm"))
+    shell.terminate()
+
+    chunks, _ = run_with_deadline(shell, "sleep 0.3\necho done", 10)
+    assert output_of(chunks).strip() == "done"
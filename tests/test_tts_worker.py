@@ -0,0 +1,66 @@
+import threading
+import time
+
+from gui.Objects.TTSWorker import TTSWorker
+
+DELAY = 0.05
+
+
+class FakeEngine:
+    """Takes DELAY to synthesize; the "audio" is the text itself."""
+
+    def run(self, text):
+        time.sleep(DELAY)
+        return text, 16000
+
+
+class FakePlayer:
+    """Takes DELAY to play and records when each item started and ended."""
+
+    def __init__(self, on_play=None):
+        self.played = []
+        self.on_play = on_play
+
+    def __call__(self, audio, sample_rate):
+        start = time.perf_counter()
+        if self.on_play:
+            self.on_play(audio)
+        time.sleep(DELAY)
+        self.played.append((audio, start, time.perf_counter()))
+
+
+def run_worker(worker):
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+
+
+def test_synthesis_overlaps_playback():
+    player = FakePlayer()
+    worker = TTSWorker(tts_engine=FakeEngine(), player=player)
+    for n in range(5):
+        worker.set_text(f"Utterance {n}")
+    run_worker(worker)
+
+    assert [audio for audio, _, _ in player.played] == [f"Utterance {n}" for n in range(5)]
+    gaps = [start - previous_end for (_, _, previous_end), (_, start, _) in zip(player.played, player.played[1:])]
+    # Played back to back: the next utterance was synthesized during the current one
+    assert max(gaps) < DELAY / 2
+
+
+def test_interrupt_drops_stale_speech():
+    worker = TTSWorker(tts_engine=FakeEngine(), prefetch_depth=2)
+
+    def on_play(audio):
+        if audio == "Old 0":
+            worker.interrupt()
+            worker.set_text("New")
+
+    player = FakePlayer(on_play)
+    worker.player = player
+    for n in range(5):
+        worker.set_text(f"Old {n}")
+    run_worker(worker)
+
+    assert [audio for audio, _, _ in player.played] == ["Old 0", "New"]
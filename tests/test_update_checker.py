@@ -0,0 +1,117 @@
+import importlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import gui.home.ComponentHub as component_hub
+from gui.home.ComponentHub import UpdateChecker
+
+LAST_MODIFIED = "Mon, 01 Sep 2025 10:00:00 GMT"
+
+
+@pytest.fixture
+def github():
+    """Answers /repos/<owner>/<repo>/commits/main like GitHub, honouring conditional requests."""
+    shas = {"alice/weather": "a" * 40, "bob/stocks": "b" * 40}
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            repo = "/".join(parts[1:3])
+            seen.append((repo, self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")))
+            if parts[0] != "repos" or parts[3:] != ["commits", "main"] or repo not in shas:
+                self.send_response(404)
+                self.end_headers()
+                return
+            etag = f'"{shas[repo]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps({"sha": shas[repo]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.shas = shas
+    server.seen = seen
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+COMPONENTS = [
+    {"name": "Weather", "repo": "alice/weather"},
+    {"name": "Stocks", "repo": "bob/stocks"},
+    {"name": "Missing", "repo": "carol/gone"},
+    {"name": "Local only"},
+]
+
+
+def test_unchanged_repositories_come_back_as_304(github, tmp_path):
+    cache_path = str(tmp_path / "updates.json")
+    first = UpdateChecker(base_url=github.base_url, auth_token="", cache_path=cache_path).check(COMPONENTS)
+
+    assert first == {"Weather": "a" * 40, "Stocks": "b" * 40, "Missing": None}
+    assert all(etag is None for _, etag, _ in github.seen)
+
+    github.seen.clear()
+    # A fresh checker, as on the next start, reads the validators from the cache file.
+    second = UpdateChecker(base_url=github.base_url, auth_token="", cache_path=cache_path).check(COMPONENTS)
+
+    assert second == first
+    sent = {repo: (etag, modified) for repo, etag, modified in github.seen}
+    assert sent["alice/weather"] == (f'"{"a" * 40}"', LAST_MODIFIED)
+    assert sent["bob/stocks"] == (f'"{"b" * 40}"', LAST_MODIFIED)
+    assert sent["carol/gone"] == (None, None)
+
+
+def test_cache_file_records_sha_and_validators(github, tmp_path):
+    cache_path = tmp_path / "data" / "updates.json"
+    UpdateChecker(base_url=github.base_url, auth_token="", cache_path=str(cache_path)).check(COMPONENTS)
+
+    cache = json.loads(cache_path.read_text())
+    assert cache == {
+        f"{github.base_url}/repos/alice/weather/commits/main":
+            {"sha": "a" * 40, "etag": f'"{"a" * 40}"', "last_modified": LAST_MODIFIED},
+        f"{github.base_url}/repos/bob/stocks/commits/main":
+            {"sha": "b" * 40, "etag": f'"{"b" * 40}"', "last_modified": LAST_MODIFIED},
+    }
+    assert not (tmp_path / "data" / "updates.json.tmp").exists()
+
+
+def test_new_commit_replaces_the_cached_sha(github, tmp_path):
+    cache_path = str(tmp_path / "updates.json")
+    checker = UpdateChecker(base_url=github.base_url, auth_token="", cache_path=cache_path)
+    checker.check(COMPONENTS)
+
+    github.shas["alice/weather"] = "c" * 40
+    assert checker.check(COMPONENTS)["Weather"] == "c" * 40
+    assert json.loads(open(cache_path).read())[
+        f"{github.base_url}/repos/alice/weather/commits/main"]["sha"] == "c" * 40
+
+
+def test_github_api_url_points_checks_at_another_host(github, tmp_path, monkeypatch):
+    monkeypatch.setenv("GITHUB_API_URL", github.base_url + "/")
+    try:
+        module = importlib.reload(component_hub)
+        checker = module.UpdateChecker(auth_token="", cache_path=str(tmp_path / "updates.json"))
+        assert checker.base_url == github.base_url
+        assert checker.check(COMPONENTS[:1]) == {"Weather": "a" * 40}
+        assert github.seen == [("alice/weather", None, None)]
+    finally:
+        monkeypatch.delenv("GITHUB_API_URL")
+        importlib.reload(component_hub)